@@ -0,0 +1,100 @@
+import logging
+
+import torch
+
+from algorithms.RawDistanceEmbedder import RawDistanceEmbedder
+
+
+class BatchPositionEmbedder:
+    """
+    Embeds position vectors with the distance to the nearest entity for a whole batch at once.
+    Unlike the PositionEmbedder, this works on the (batch, seq_len) index tensor directly and stays on the device of the input
+    """
+
+    def __init__(self, embeddings=None, pad_token_id=None):
+        self.pad_token_id = pad_token_id
+        self.embeddings = embeddings if embeddings is not None else RawDistanceEmbedder()()
+        self._device_embeddings = None
+
+    @staticmethod
+    def from_position_embedder(position_embedder):
+        """
+        Creates a batch embedder from a PositionEmbedder, e.g. when loading a model that was pickled with a PositionEmbedder
+        :param position_embedder: PositionEmbedder
+        """
+        return BatchPositionEmbedder(embeddings=position_embedder.embeddings,
+                                     pad_token_id=position_embedder.pad_token_id)
+
+    @property
+    def logger(self):
+        return logging.getLogger(__name__)
+
+    def distances(self, tokens, entity):
+        """
+        Returns the distance of each token to the nearest occurrence of the entity, clipped to the max distance
+        :param tokens: Long tensor of shape (batch, seq_len)
+        :param entity: The entity token id, either a scalar that applies to all rows or a tensor of shape (batch,)
+        :return: Long tensor of shape (batch, seq_len)
+        """
+        max_distance = self.embeddings.shape[0] - 1
+
+        entity = torch.as_tensor(entity, dtype=tokens.dtype, device=tokens.device)
+        if entity.dim() > 0:
+            entity = entity.view(-1, 1)
+
+        reached = tokens.eq(entity)
+        token_distance = torch.full_like(tokens, max_distance)
+
+        # Grow the entity positions by one token on either side per step, so the first step at which a token is
+        # reached is its distance to the nearest entity. Tokens not reached within max_distance steps are clipped.
+        for d in range(max_distance):
+            token_distance[reached & token_distance.eq(max_distance)] = d
+
+            grown = reached.clone()
+            grown[:, 1:] |= reached[:, :-1]
+            grown[:, :-1] |= reached[:, 1:]
+            reached = grown
+
+        return token_distance
+
+    def __call__(self, tokens, entity, pad_mask=None):
+        """
+        Returns the position embedding for each token in the batch
+        :param tokens: Long tensor of shape (batch, seq_len)
+        :param entity: The entity token id, either a scalar that applies to all rows or a tensor of shape (batch,)
+        :param pad_mask: Optional bool tensor of shape (batch, seq_len), the positions set to True are zeroed
+        :return: Float tensor of shape (batch, seq_len, pos_dim)
+        """
+        return self.embed(self.distances(tokens, entity), pad_mask=pad_mask, tokens=tokens)
+
+    def embed(self, token_distance, pad_mask=None, tokens=None):
+        """
+        Returns the position embedding for distances that have already been computed, see distances
+        :param token_distance: Long tensor of shape (batch, seq_len)
+        :param pad_mask: Optional bool tensor of shape (batch, seq_len), the positions set to True are zeroed
+        :param tokens: The long tensor (batch, seq_len) the distances are of, required when pad_token_id is set
+        :return: Float tensor of shape (batch, seq_len, pos_dim)
+        """
+        # Replace all pad token positions to zero
+        if self.pad_token_id is not None:
+            assert tokens is not None, "The tokens are required to zero the positions of pad_token_id"
+            pad_mask = tokens.eq(self.pad_token_id) if pad_mask is None else pad_mask | tokens.eq(self.pad_token_id)
+
+        result = torch.nn.functional.embedding(token_distance, self._get_embeddings(token_distance.device))
+
+        if pad_mask is not None:
+            result = result.masked_fill(pad_mask.unsqueeze(-1), 0.0)
+
+        return result
+
+    def _get_embeddings(self, device):
+        # Keep a copy of the embeddings on the device of the input so it is not copied on every forward pass
+        if self._device_embeddings is None or self._device_embeddings.device != torch.device(device):
+            self._device_embeddings = torch.as_tensor(self.embeddings, dtype=torch.float).to(device=device)
+        return self._device_embeddings
+
+    def __getstate__(self):
+        # Do not pickle the device copy, so a model saved on gpu can be loaded on cpu
+        state = self.__dict__.copy()
+        state["_device_embeddings"] = None
+        return state
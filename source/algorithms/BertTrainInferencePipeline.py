@@ -9,6 +9,8 @@ from torch.utils.data import DataLoader
 
 from algorithms.Collator import Collator
 from algorithms.Predictor import Predictor
+from algorithms.bucket_batch_sampler import BucketBatchSampler
+from algorithms.feature_cache import FeatureCache
 
 
 class BertTrainInferencePipeline:
@@ -48,13 +50,14 @@ class BertTrainInferencePipeline:
 
     def __call__(self, train, validation):
         self.logger.info("Train set has {} records, val has {}".format(len(train), len(validation)))
-        train_loader = DataLoader(train, shuffle=True, batch_size=self.batch_size, num_workers=self.num_workers,
-                                  collate_fn=Collator())
+        train_loader = self._get_train_loader(train)
         val_loader = DataLoader(validation, shuffle=False, batch_size=self.batch_size, num_workers=self.num_workers,
                                 collate_fn=Collator())
 
-        transformed_train_x = self.data_pipeline.fit_transform(train_loader)
-        transformed_val_x = self.data_pipeline.transform(val_loader)
+        self.data_pipeline.fit(train_loader)
+        # The batches of the shuffled train loader differ between runs, so only the validation features are cached
+        transformed_train_x = self.data_pipeline.transform(train_loader)
+        transformed_val_x = self._transform_features(validation, val_loader)
 
         transformed_train_x = self.label_pipeline.fit_transform(transformed_train_x)
         transformed_val_x = self.label_pipeline.transform(transformed_val_x)
@@ -88,6 +91,26 @@ class BertTrainInferencePipeline:
 
         return val_results, val_actuals, val_predicted
 
+    def _get_train_loader(self, train):
+        # Group sentences of similar length into the same batch, so that less of each batch is padding
+        length_bucketing = bool(int(self._get_value(self.additional_args, "length_bucketing", "0")))
+        if not length_bucketing:
+            return DataLoader(train, shuffle=True, batch_size=self.batch_size, num_workers=self.num_workers,
+                              collate_fn=Collator())
+
+        batch_sampler = BucketBatchSampler.from_dataset(train, train.text_column_index, self.batch_size)
+        return DataLoader(train, batch_sampler=batch_sampler, num_workers=self.num_workers, collate_fn=Collator())
+
+    def _transform_features(self, dataset, dataloader):
+        # Reuse the features of an earlier run over the same file with the same pipeline, when a cache dir is set. The
+        # dataloader must batch the records in the same order on every run
+        feature_cache_dir = self._get_value(self.additional_args, "feature_cache_dir", None)
+        if feature_cache_dir is None:
+            return self.data_pipeline.transform(dataloader)
+
+        return FeatureCache(feature_cache_dir)(dataset, self.data_pipeline,
+                                               lambda: self.data_pipeline.transform(dataloader))
+
     def sum(self, x):
         return sum([len(getattr(x, c)) for c in x.__dict__ if c != 'label'])
 
@@ -99,7 +122,7 @@ class BertTrainInferencePipeline:
             pickle.dump(self.label_pipeline, f)
 
     @staticmethod
-    def load(artifacts_dir):
+    def load(artifacts_dir, feature_cache_dir=None):
         model_file = BertTrainInferencePipeline._find_artifact("{}/*model.pt".format(artifacts_dir))
 
         data_pipeline = BertTrainInferencePipeline._load_artifact("{}/*picked_datapipeline.pb".format(artifacts_dir))
@@ -107,7 +130,8 @@ class BertTrainInferencePipeline:
 
         model = torch.load(model_file)
 
-        return lambda x: BertTrainInferencePipeline.predict(x, model, data_pipeline, label_pipeline)
+        return lambda x: BertTrainInferencePipeline.predict(x, model, data_pipeline, label_pipeline,
+                                                            feature_cache_dir=feature_cache_dir)
 
     @staticmethod
     def _load_artifact(pickled_file_search_filter):
@@ -126,15 +150,22 @@ class BertTrainInferencePipeline:
         return matched_file
 
     @staticmethod
-    def predict(dataset, model, data_pipeline, label_pipeline):
+    def predict(dataset, model, data_pipeline, label_pipeline, feature_cache_dir=None):
         dataloader = DataLoader(dataset, shuffle=False, batch_size=32, num_workers=1,
                                 collate_fn=Collator())
 
-        val_examples = data_pipeline.transform(dataloader)
+        if feature_cache_dir is None:
+            # Transform lazily, so that large datasets are not held in memory after each step of the pipeline
+            val_examples = data_pipeline.iter_transform(dataloader)
+        else:
+            val_examples = FeatureCache(feature_cache_dir)(dataset, data_pipeline,
+                                                           lambda: data_pipeline.transform(dataloader))
 
         predictor = Predictor()
 
         predictions, confidence_scores = predictor.predict(model, val_examples)
+        predictions = [b.tolist() for b in predictions]
+        confidence_scores = [b.tolist() for b in confidence_scores]
 
         transformed_predictions = label_pipeline.label_reverse_encoder_func(predictions)
 
@@ -11,6 +11,25 @@ class DataPipeline:
             transformed_x = p.transform(transformed_x)
         return transformed_x
 
+    def iter_transform(self, dataloader):
+        """
+        Lazily transforms the dataloader. The steps are chained as generators, so each batch is read and passed
+        through all the steps before the next one is read, and only a few batches are held in memory at any time.
+        The result can only be iterated once.
+        """
+        transformed_x = iter(dataloader)
+        for name, p in self.feature_pipeline:
+            transformed_x = self._iter_transform_step(p, transformed_x)
+        return transformed_x
+
+    @staticmethod
+    def _iter_transform_step(step, batches):
+        if hasattr(step, "iter_transform"):
+            return step.iter_transform(batches)
+
+        # Steps that can only transform a whole dataset are run one batch at a time
+        return (transformed_b for b in batches for transformed_b in step.transform([b]))
+
     def update_vocab_dict(self, vocab_dict):
         self.text_to_index.vocab_dict = vocab_dict
 
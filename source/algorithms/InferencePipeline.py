@@ -3,13 +3,15 @@ import logging
 import os
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
 from algorithms.TrainInferencePipeline import TrainInferencePipeline
 
 
 class InferencePipeline:
-    def run(self, dataset, data_file, artifactsdir, out_dir, postives_filter_threshold=0.0):
+    def run(self, dataset, data_file, artifactsdir, out_dir, postives_filter_threshold=0.0, feature_cache_dir=None,
+            cpu_workers=1, length_bucketing=False, group_by_abstract=False):
         logger = logging.getLogger(__name__)
 
         predicted_confidence_field = "predicted_confidence"
@@ -17,7 +19,9 @@ class InferencePipeline:
 
         final_df = self.run_prediction(dataset, artifactsdir, data_file, out_dir,
                                        predicted_confidence_field=predicted_confidence_field,
-                                       predicted_field=predicted_output_field)
+                                       predicted_field=predicted_output_field,
+                                       feature_cache_dir=feature_cache_dir, cpu_workers=cpu_workers,
+                                       length_bucketing=length_bucketing, group_by_abstract=group_by_abstract)
 
         logger.info("Completed {}, {}".format(final_df.shape, final_df.columns.values))
 
@@ -33,6 +37,55 @@ class InferencePipeline:
             logger.info("No results after filter.. and not saving the dataframe ")
         return final_df
 
+    def run_interaction_types(self, dataset, data_file, artifactsdir, out_dir, postives_filter_threshold=0.0,
+                              feature_cache_dir=None, length_bucketing=False, group_by_abstract=False):
+        """
+Predicts the confidence score of every interaction type of each abstract and gene pair in data_file, with the models
+that have a head per interaction type, and writes a record per pair with a column per interaction type.
+        :param dataset: The dataset of data_file with a record per abstract and gene pair, see all_types in
+        PpiMultiTypeDatasetFactory
+        :param postives_filter_threshold: Only write the pairs whose highest interaction type score is above this
+        :return: The dataframe of the pairs with the scores
+        """
+        logger = logging.getLogger(__name__)
+
+        if not os.path.exists(out_dir) or not os.path.isdir(out_dir):
+            raise FileNotFoundError("The path {} should exist and must be a directory".format(out_dir))
+
+        # The records of the dataset, the interaction type and label of a record do not apply to the pair
+        df = dataset.unique_pairs(pd.read_json(data_file)).drop(columns=["interactionType", "isValid"],
+                                                                  errors="ignore")
+        assert df.shape[0] == len(dataset), "Expecting a dataset record for each of the {} pairs, found {}".format(
+            df.shape[0], len(dataset))
+
+        ensemble_artefacts_dir = [d for d in glob.glob("{}{}*".format(artifactsdir, os.path.sep)) if os.path.isdir(d)]
+        predictor = TrainInferencePipeline.load_interaction_types_ensemble(ensemble_artefacts_dir,
+                                                                           feature_cache_dir=feature_cache_dir,
+                                                                           length_bucketing=length_bucketing,
+                                                                           group_by_abstract=group_by_abstract)
+
+        score_matrix, interaction_types = predictor(dataset)
+
+        predicted_confidence_field = "predicted_confidence"
+        predicted_field = "predicted"
+        df = df.copy()
+        df["confidence_scores"] = TrainInferencePipeline.get_confidence_score_dict(interaction_types, score_matrix)
+        df[interaction_types] = pd.DataFrame(score_matrix, index=df.index, columns=interaction_types)
+        df[predicted_field] = np.asarray(interaction_types)[score_matrix.argmax(axis=1)]
+        df[predicted_confidence_field] = score_matrix.max(axis=1)
+
+        logger.info("Completed {}, {}".format(df.shape, df.columns.values))
+
+        df = self._filter_threshold(df, postives_filter_threshold, lambda x: True,
+                                    confidence_score_field=predicted_confidence_field, predicted_field=predicted_field)
+
+        predictions_file = os.path.join(out_dir, "{}_interaction_types_predicted.json".format(Path(data_file).stem))
+        if df.shape[0] > 0:
+            df.to_json(predictions_file, orient="records", lines=True)
+        else:
+            logger.info("No results after filter.. and not saving the dataframe ")
+        return df
+
     def _filter_threshold(self, final_df, postives_filter_threshold, filter_lambda,
                           confidence_score_field="predicted_confidence", predicted_field="predicted_field"):
         logger = logging.getLogger(__name__)
@@ -44,9 +97,12 @@ class InferencePipeline:
             "Filtering True Positives with threshold > {}, currently {} records".format(postives_filter_threshold,
                                                                                         final_df.shape))
 
-        final_df = final_df[final_df.apply(
-            lambda x: filter_lambda(x[predicted_field]) and x[confidence_score_field] > postives_filter_threshold,
-            axis=1)]
+        # The filter only depends on the predicted value, so evaluate it once per distinct value
+        predicted_values = final_df[predicted_field]
+        positive_values = [v for v in predicted_values.unique() if filter_lambda(v)]
+
+        final_df = final_df[predicted_values.isin(positive_values).values &
+                            (final_df[confidence_score_field] > postives_filter_threshold).values]
 
         logger.info("Post filter shape {}".format(final_df.shape))
         return final_df
@@ -54,7 +110,8 @@ class InferencePipeline:
     def run_prediction(self, dataset, artifactsdir, data_file, out_dir,
                        confidence_scores_dict_field="confidence_scores",
                        predicted_confidence_field="predicted_confidence",
-                       predicted_field="predicted"):
+                       predicted_field="predicted", feature_cache_dir=None, cpu_workers=1, length_bucketing=False,
+                       group_by_abstract=False):
         logger = logging.getLogger(__name__)
 
         if not os.path.exists(out_dir) or not os.path.isdir(out_dir):
@@ -66,20 +123,92 @@ class InferencePipeline:
 
         ensemble_artefacts_dir = [d for d in glob.glob("{}{}*".format(artifactsdir, os.path.sep)) if os.path.isdir(d)]
 
-        predictor = TrainInferencePipeline.load_ensemble(ensemble_artefacts_dir)
+        predictor = TrainInferencePipeline.load_ensemble(ensemble_artefacts_dir,
+                                                         feature_cache_dir=feature_cache_dir, cpu_workers=cpu_workers,
+                                                         return_score_matrix=True, length_bucketing=length_bucketing,
+                                                         group_by_abstract=group_by_abstract)
 
         # Run prediction
-        results, confidence_scores = predictor(dataset)
+        results, score_matrix, label_names = predictor(dataset)
+
+        return self._add_predictions(df, results, score_matrix, label_names,
+                                     confidence_scores_dict_field=confidence_scores_dict_field,
+                                     predicted_confidence_field=predicted_confidence_field,
+                                     predicted_field=predicted_field)
+
+    def run_streaming(self, dataset_factory, data_file, artifactsdir, out_dir, postives_filter_threshold=0.0,
+                      chunk_size=10000, cpu_workers=1, length_bucketing=False, group_by_abstract=False):
+        """
+Predicts a json lines file a chunk of records at a time and appends the results of each chunk to the predictions
+file, so the memory used does not depend on the size of the file.
+        :param dataset_factory: The dataset factory used to read the dataframe of each chunk
+        :param chunk_size: The number of records in a chunk
+        :param length_bucketing: Batch the records of similar length in a chunk together
+        :param group_by_abstract: Index each abstract of a chunk once for all its gene pairs, the dataset factory must
+        not materialise the rows
+        :return: The number of records written to the predictions file
+        """
+        logger = logging.getLogger(__name__)
+
+        if not os.path.exists(out_dir) or not os.path.isdir(out_dir):
+            raise FileNotFoundError("The path {} should exist and must be a directory".format(out_dir))
+
+        predicted_confidence_field = "predicted_confidence"
+        predicted_output_field = "predicted"
+
+        ensemble_artefacts_dir = [d for d in glob.glob("{}{}*".format(artifactsdir, os.path.sep)) if os.path.isdir(d)]
+
+        # Load the models once for all the chunks
+        predictor = TrainInferencePipeline.load_ensemble(ensemble_artefacts_dir, cpu_workers=cpu_workers,
+                                                         return_score_matrix=True, length_bucketing=length_bucketing,
+                                                         group_by_abstract=group_by_abstract)
+
+        predictions_file = os.path.join(out_dir, "{}_predicted.json".format(Path(data_file).stem))
+        if os.path.exists(predictions_file):
+            os.remove(predictions_file)
+
+        total_records = 0
+        total_written = 0
+        for chunk_df in pd.read_json(data_file, lines=True, chunksize=chunk_size):
+            dataset = dataset_factory.get_dataset(chunk_df)
+
+            results, score_matrix, label_names = predictor(dataset)
+            chunk_df = self._add_predictions(chunk_df, results, score_matrix, label_names,
+                                             predicted_confidence_field=predicted_confidence_field,
+                                             predicted_field=predicted_output_field)
+
+            chunk_df = self._filter_threshold(chunk_df, postives_filter_threshold,
+                                              dataset.lambda_postive_field_filter,
+                                              confidence_score_field=predicted_confidence_field,
+                                              predicted_field=predicted_output_field)
+
+            total_records += len(dataset)
+            if chunk_df.shape[0] > 0:
+                with open(predictions_file, "a") as f:
+                    f.write(chunk_df.to_json(orient="records", lines=True).rstrip("\n"))
+                    f.write("\n")
+                total_written += chunk_df.shape[0]
+
+            logger.info("Completed {} records, {} written to {}".format(total_records, total_written,
+                                                                         predictions_file))
+
+        if total_written == 0:
+            logger.info("No results after filter.. and not saving the dataframe ")
+
+        return total_written
+
+    @staticmethod
+    def _add_predictions(df, results, score_matrix, label_names, confidence_scores_dict_field="confidence_scores",
+                         predicted_confidence_field="predicted_confidence",
+                         predicted_field="predicted"):
         df[predicted_field] = results
-        df[confidence_scores_dict_field] = confidence_scores
+        df[confidence_scores_dict_field] = TrainInferencePipeline.get_confidence_score_dict(label_names, score_matrix)
 
-        label_names = list(df[confidence_scores_dict_field].iloc[0].keys())
+        # One column per label with its confidence score, set from the score matrix at once
         col_names = [str(l) for l in label_names]
+        df[col_names] = pd.DataFrame(score_matrix, index=df.index, columns=col_names)
 
-        for k in label_names:
-            df[str(k)] = df.apply(lambda x: x[confidence_scores_dict_field][k], axis=1)
-
-        df[predicted_field] = df.apply(lambda r: col_names[list(r[col_names]).index(max(r[col_names]))], axis=1)
-        df[predicted_confidence_field] = df.apply(lambda r: max(r[col_names]), axis=1)
+        df[predicted_field] = np.asarray(col_names)[score_matrix.argmax(axis=1)]
+        df[predicted_confidence_field] = score_matrix.max(axis=1)
 
         return df
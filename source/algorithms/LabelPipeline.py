@@ -16,6 +16,15 @@ class LabelPipeline:
         # Unbatch Y
         return self._label_pipeline.transform(data_loader)
 
+    def iter_transform(self, data_loader):
+        """
+        Lazily transforms the batches, see DataPipeline.iter_transform
+        """
+        transformed = iter(data_loader)
+        for name, p in self._label_pipeline.steps:
+            transformed = p.iter_transform(transformed)
+        return transformed
+
     def fit_transform(self, data_loader):
         self.fit(data_loader)
         return self.transform(data_loader)
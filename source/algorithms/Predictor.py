@@ -10,16 +10,19 @@ class Predictor:
         return logging.getLogger(__name__)
 
     def predict(self, model_network, dataloader, device=None):
+        """
+        Returns a tuple (predicted, scores), a list with the tensor of predicted class indices and a list with the
+        tensor of softmax scores of shape (batch, classes), for each batch in the dataloader
+        """
         device = device or ('cuda:0' if torch.cuda.is_available() else 'cpu')
 
-        self.logger.info("Using device {}".format(device))
+        self.logger.debug("Using device {}".format(device))
         model_network.to(device)
         # switch model to evaluation mode
         model_network.eval()
         predicted = []
         scores = []
-        self.logger.info("Running inference {}".format(device))
-
+        self.logger.debug("Running inference {}".format(device))
 
         with torch.no_grad():
             softmax = torch.nn.Softmax(dim=1)
@@ -33,15 +36,34 @@ class Predictor:
 
                 pred_batch_y = model_network(val_batch_idx)
                 # Soft max the predictions
-                pred_batch_y = softmax(pred_batch_y)
+                pred_batch_y = softmax(pred_batch_y).cpu()
                 scores.append(pred_batch_y)
-                pred_binary = torch.max(pred_batch_y, 1)[1]
-                pred_flat = pred_binary.view(pred_binary.size())
+                predicted.append(pred_batch_y.argmax(dim=1))
 
-                predicted.append(pred_flat.cpu().numpy().tolist())
+        self.logger.debug("Completed inference {}".format(device))
 
-        scores = [r.cpu().numpy().tolist() for r in scores]
+        return predicted, scores
 
-        self.logger.info("Completed inference {}".format(device))
+    def predict_all_types(self, model_network, dataloader, device=None):
+        """
+        Returns a list with the tensor of softmax scores of shape (batch, interaction types, classes) for each batch in
+        the dataloader, see RelationExtractorMultiTypeBiLstmNetwork.forward_all_types. Each row is encoded once for all
+        the interaction types.
+        """
+        device = device or ('cuda:0' if torch.cuda.is_available() else 'cpu')
 
-        return predicted, scores
+        model_network.to(device)
+        model_network.eval()
+        scores = []
+
+        with torch.no_grad():
+            softmax = torch.nn.Softmax(dim=2)
+            for _, (batch_x, batch_y) in enumerate(dataloader):
+                if isinstance(batch_x, list):
+                    val_batch_idx = [t.to(device=device) for t in batch_x]
+                else:
+                    val_batch_idx = batch_x.to(device=device)
+
+                scores.append(softmax(model_network.forward_all_types(val_batch_idx)).cpu())
+
+        return scores
@@ -2,6 +2,9 @@ import logging
 
 import numpy as np
 
+from algorithms.embedding_store import EmbeddingStore
+from algorithms.word2vec_binary_reader import Word2VecBinaryReader
+
 
 class PretrainedEmbedderLoader:
 
@@ -22,7 +25,7 @@ zsombor -0.75898 -0.47426 0.4737 0.7725 -0.78064 0.23233 0.046114 0.84014 0.2437
 sandberger 0.072617 -0.51393 0.4728 -0.52202 -0.35534 0.34629 0.23211 0.23096 0.26694 .41028
         :param words_index_dict: The index of words so the correct embedding is assigned
         :return: a tuple (word_index_dict, embeddings_array)
-        :param handle: handle containing the embedding
+        :param handle: handle containing the embedding, a word2vec .bin file or the .vocab file of an EmbeddingStore
         """
         initial_words_index_dict = initial_words_index_dict or {}
 
@@ -37,19 +40,23 @@ sandberger 0.072617 -0.51393 0.4728 -0.52202 -0.35534 0.34629 0.23211 0.23096 0.
                 max(initial_words_index_dict.values()))
             assert min(initial_words_index_dict.values()) == 0, "The word index dict must be zero indexed values"
 
+        embedding_store = EmbeddingStore.find(handle)
+        if embedding_store is not None:
+            return self._load_from_store(embedding_store, initial_words_index_dict)
+
         embeddings_array = [[]] * len(initial_words_index_dict)
 
+        binary_reader = Word2VecBinaryReader.find(handle)
+        if binary_reader is not None:
+            self.logger.info("Loading embeddings from word2vec binary format")
+            word_embeddings = binary_reader.iter_vectors()
+        else:
+            word_embeddings = self._iter_text_embeddings(handle)
+
         result_words_index_dict = {}
         total_embed_words = 0
         # Load embeddings from file
-        for i, line in enumerate(handle):
-            # skip first line as it contains just the dim
-            if i == 0: continue
-            values = line.split(" ")
-            word = values[0]
-
-            # Not ignored word
-            embeddings = [float(v) for v in values[1:]]
+        for i, (word, embeddings) in enumerate(word_embeddings, start=1):
             embedding_dim = len(embeddings)
             if word not in initial_words_index_dict:
                 result_words_index_dict[word] = len(embeddings_array)
@@ -65,7 +72,7 @@ sandberger 0.072617 -0.51393 0.4728 -0.52202 -0.35534 0.34629 0.23211 0.23096 0.
         words_not_in_embedding = []
         for word in initial_words_index_dict:
             # Word not found in embedding, init with random
-            if embeddings_array[initial_words_index_dict[word]] == []:
+            if len(embeddings_array[initial_words_index_dict[word]]) == 0:
                 result_words_index_dict[word] = initial_words_index_dict[word]
                 words_not_in_embedding.append(word)
                 if word == self.pad_token:
@@ -86,3 +93,43 @@ sandberger 0.072617 -0.51393 0.4728 -0.52202 -0.35534 0.34629 0.23211 0.23096 0.
         embeddings_array = np.array(embeddings_array)
 
         return result_words_index_dict, embeddings_array
+
+    @staticmethod
+    def _iter_text_embeddings(handle):
+        for i, line in enumerate(handle):
+            # skip first line as it contains just the dim
+            if i == 0: continue
+            values = line.split(" ")
+
+            yield values[0], [float(v) for v in values[1:]]
+
+    def _load_from_store(self, embedding_store, initial_words_index_dict):
+        self.logger.info("Loading embeddings from store {}".format(embedding_store.prefix))
+
+        result_words_index_dict = initial_words_index_dict.copy()
+        for word in embedding_store.words:
+            if word not in result_words_index_dict:
+                result_words_index_dict[word] = len(result_words_index_dict)
+
+        self.logger.info("Total words in embedding is {}".format(len(embedding_store.words)))
+
+        embeddings_array = np.zeros((len(result_words_index_dict), embedding_store.dim), dtype=np.float32)
+        rows, indices = embedding_store.word_rows(result_words_index_dict)
+        embeddings_array[indices] = embedding_store.embeddings[rows]
+
+        found = np.zeros(len(result_words_index_dict), dtype=bool)
+        found[indices] = True
+
+        words_not_in_embedding = []
+        for word, index in initial_words_index_dict.items():
+            # Word not found in embedding, init with random, the pad is left as zeros
+            if not found[index]:
+                words_not_in_embedding.append(word)
+                if word != self.pad_token:
+                    embeddings_array[index] = np.random.uniform(low=-0.001, high=0.001, size=embedding_store.dim)
+
+        self.logger.info("The number of words intialised without embbeder is {}".format(len(words_not_in_embedding)))
+        self.logger.info("Total words {}".format(len(result_words_index_dict)))
+        self.logger.debug("The words intialised without embbeder is \n {}".format(words_not_in_embedding))
+
+        return result_words_index_dict, embeddings_array
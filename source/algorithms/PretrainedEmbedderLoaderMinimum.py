@@ -1,14 +1,24 @@
 import logging
+import os
+from multiprocessing import Pool
 
 import numpy as np
 
+from algorithms.embedding_store import EmbeddingStore
+from algorithms.word2vec_binary_reader import Word2VecBinaryReader
+
 
 class PretrainedEmbedderLoaderMinimum:
     """
     Only uses words in  vocab
     """
 
-    def __init__(self, pad_token, dim, seed=None):
+    def __init__(self, pad_token, dim, seed=None, num_workers=1):
+        """
+        :param num_workers: When more than 1 and the handle is a file, the file is split into byte ranges that are
+        scanned in parallel by a process pool
+        """
+        self.num_workers = num_workers
         self.seed = seed
         self.dim = dim
         self.pad_token = pad_token
@@ -26,7 +36,7 @@ zsombor -0.75898 -0.47426 0.4737 0.7725 -0.78064 0.23233 0.046114 0.84014 0.2437
 sandberger 0.072617 -0.51393 0.4728 -0.52202 -0.35534 0.34629 0.23211 0.23096 0.26694 .41028
         :param words_index_dict: The index of words to filter out
         :return: a tuple (word_index_dict, embeddings_array)
-        :param handle: handle containing the embedding
+        :param handle: handle containing the embedding, a word2vec .bin file or the .vocab file of an EmbeddingStore
         """
 
         np.random.seed(self.seed)
@@ -47,24 +57,34 @@ sandberger 0.072617 -0.51393 0.4728 -0.52202 -0.35534 0.34629 0.23211 0.23096 0.
         embeddings_array[initial_words_index_dict[self.pad_token]] = 0.
 
         result_words_index_dict = initial_words_index_dict.copy()
+
+        embedding_store = EmbeddingStore.find(handle)
+        if embedding_store is not None:
+            return self._load_from_store(embedding_store, result_words_index_dict, embeddings_array)
+
+        binary_reader = Word2VecBinaryReader.find(handle)
+        if binary_reader is not None:
+            return self._load_binary(binary_reader, result_words_index_dict, embeddings_array)
+
+        file_path = getattr(handle, "name", None)
+        if self.num_workers > 1 and isinstance(file_path, str) and os.path.isfile(file_path):
+            return self._load_parallel(file_path, result_words_index_dict, embeddings_array)
+
         total_embed_words = 0
         total_random_init_word = len(result_words_index_dict)
         # Load embeddings from file
         for i, line in enumerate(handle):
             # skip first line as it contains just the dim
             if i == 0: continue
-            values = line.split(" ")
-            word = values[0]
+            total_embed_words = i
 
-            # Not ignored word
-            embeddings = [float(v) for v in values[1:]]
+            word, _, values = line.partition(" ")
 
+            # Only parse the embedding of words in vocab
             if word in result_words_index_dict:
-                embeddings_array[result_words_index_dict[word]] = embeddings
+                embeddings_array[result_words_index_dict[word]] = [float(v) for v in values.split(" ")]
                 total_random_init_word -= 1
 
-            total_embed_words = i
-
         self.logger.info("Total words in original embedding handle is {}".format(total_embed_words))
         self.logger.info("Total words in final embedding is {}".format(len(result_words_index_dict)))
         self.logger.info("Total words randomly initialized is {}".format(total_random_init_word))
@@ -73,3 +93,93 @@ sandberger 0.072617 -0.51393 0.4728 -0.52202 -0.35534 0.34629 0.23211 0.23096 0.
         embeddings_array = np.array(embeddings_array)
 
         return result_words_index_dict, embeddings_array
+
+    def _load_from_store(self, embedding_store, result_words_index_dict, embeddings_array):
+        self.logger.info("Loading embeddings from store {}".format(embedding_store.prefix))
+        assert embedding_store.dim == self.dim, "Expected embedding dim {}, but the store has dim {}".format(
+            self.dim, embedding_store.dim)
+
+        # Only read the rows of the words in vocab from the memory mapped matrix
+        rows, indices = embedding_store.word_rows(result_words_index_dict)
+        embeddings_array[indices] = embedding_store.embeddings[rows]
+
+        self.logger.info("Total words in original embedding handle is {}".format(len(embedding_store.words)))
+        self.logger.info("Total words in final embedding is {}".format(len(result_words_index_dict)))
+        self.logger.info("Total words randomly initialized is {}".format(len(result_words_index_dict) - len(indices)))
+
+        return result_words_index_dict, embeddings_array
+
+    def _load_binary(self, binary_reader, result_words_index_dict, embeddings_array):
+        self.logger.info("Loading embeddings from word2vec binary format")
+        assert binary_reader.dim == self.dim, "Expected embedding dim {}, but the binary file has dim {}".format(
+            self.dim, binary_reader.dim)
+
+        # Only the vectors of words in vocab are copied out of the byte buffer
+        words = set(w.encode("utf-8") for w in result_words_index_dict)
+        found_words = set()
+        for word, embeddings in binary_reader.iter_vectors(words):
+            embeddings_array[result_words_index_dict[word]] = embeddings
+            found_words.add(word)
+
+        self.logger.info("Total words in original embedding handle is {}".format(binary_reader.num_words))
+        self.logger.info("Total words in final embedding is {}".format(len(result_words_index_dict)))
+        self.logger.info(
+            "Total words randomly initialized is {}".format(len(result_words_index_dict) - len(found_words)))
+
+        return result_words_index_dict, embeddings_array
+
+    def _load_parallel(self, file_path, result_words_index_dict, embeddings_array):
+        file_size = os.path.getsize(file_path)
+        range_size = file_size // self.num_workers + 1
+        byte_ranges = [(s, min(s + range_size, file_size)) for s in range(0, file_size, range_size)]
+
+        self.logger.info("Loading embeddings from {} with {} workers".format(file_path, self.num_workers))
+
+        words = set(w.encode("utf-8") for w in result_words_index_dict)
+        with Pool(self.num_workers) as pool:
+            range_results = pool.starmap(_scan_embedding_range, [(file_path, s, e, words) for s, e in byte_ranges])
+
+        # Merge in file order, so that the last occurrence of a word wins as in the sequential load
+        total_embed_words = 0
+        found_words = set()
+        for total_lines, matches in range_results:
+            total_embed_words += total_lines
+            for word, embeddings in matches:
+                embeddings_array[result_words_index_dict[word]] = embeddings
+                found_words.add(word)
+
+        self.logger.info("Total words in original embedding handle is {}".format(total_embed_words))
+        self.logger.info("Total words in final embedding is {}".format(len(result_words_index_dict)))
+        self.logger.info(
+            "Total words randomly initialized is {}".format(len(result_words_index_dict) - len(found_words)))
+
+        return result_words_index_dict, embeddings_array
+
+
+def _scan_embedding_range(file_path, start, end, words):
+    """
+    Returns the number of embedding lines and the parsed (word, embedding) of the words in vocab, for the lines
+    that start within the byte range [start, end)
+    """
+    matches = []
+    total_lines = 0
+    with open(file_path, "rb") as f:
+        if start == 0:
+            # skip first line as it contains just the dim
+            f.readline()
+        else:
+            # Skip to the start of the first line that starts in this range
+            f.seek(start - 1)
+            f.readline()
+
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            total_lines += 1
+
+            word, _, values = line.partition(b" ")
+            if word in words:
+                matches.append((word.decode("utf-8"), np.array(values.split(), dtype=np.float64)))
+
+    return total_lines, matches
@@ -4,6 +4,7 @@ import math
 import torch
 import torch.nn as nn
 
+from algorithms.BatchPositionEmbedder import BatchPositionEmbedder
 from algorithms.PositionEmbedder import PositionEmbedder
 
 
@@ -93,7 +94,10 @@ class RelationExtractorStackedCnnPosNetwork(nn.Module):
 
     @property
     def pos_embedder(self):
-        self.__pos_embedder__ = self.__pos_embedder__ or PositionEmbedder()
+        self.__pos_embedder__ = self.__pos_embedder__ or BatchPositionEmbedder()
+        # Models pickled with the per sentence PositionEmbedder
+        if isinstance(self.__pos_embedder__, PositionEmbedder):
+            self.__pos_embedder__ = BatchPositionEmbedder.from_position_embedder(self.__pos_embedder__)
         return self.__pos_embedder__
 
     def forward(self, feature_tuples):
@@ -115,14 +119,10 @@ class RelationExtractorStackedCnnPosNetwork(nn.Module):
         for f in range(len(feature_tuples)):
             if f == self.text_column_index: continue
 
-            entity = feature_tuples[f]  # .transpose(0, 1)
+            # The entity id is the first token of the entity column
+            entity = feature_tuples[f][:, 0]
 
-            # TODO: avoid this loop, use builtin
-            pos_embedding = []
-            for t, e in zip(text_transposed, entity):
-                pos_embedding.append(self.pos_embedder(t, e[0]))
-
-            pos_embedding_tensor = torch.stack(pos_embedding).to(device=merged_pos_embed.device)
+            pos_embedding_tensor = self.pos_embedder(text_transposed, entity)
 
             merged_pos_embed = torch.cat([merged_pos_embed, pos_embedding_tensor], dim=2)
 
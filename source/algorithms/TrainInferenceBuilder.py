@@ -11,6 +11,7 @@ from algorithms.TrainInferencePipeline import TrainInferencePipeline
 from algorithms.loss_function_factory_locator import LossFunctionFactoryLocator
 from algorithms.network_factory_locator import NetworkFactoryLocator
 from algorithms.transform_label_encoder import TransformLabelEncoder
+from algorithms.transform_entity_distance import TransformEntityDistance
 from algorithms.transform_label_rehaper import TransformLabelReshaper
 from algorithms.transform_sentence_tokeniser import TransformSentenceTokenisor
 from algorithms.transform_text_index import TransformTextToIndex
@@ -53,24 +54,35 @@ class TrainInferenceBuilder:
         # TODO clean this up
         use_min_dict = bool(int(self._get_value(self.additional_args, "use_min_dict", "1")))
         if use_min_dict:
-            embedder_loader = PretrainedEmbedderLoaderMinimum(TransformTextToIndex.pad_token(), dim=self.embedding_dim)
+            embedding_loader_workers = int(self._get_value(self.additional_args, "embedding_loader_workers", "1"))
+            embedder_loader = PretrainedEmbedderLoaderMinimum(TransformTextToIndex.pad_token(), dim=self.embedding_dim,
+                                                              num_workers=embedding_loader_workers)
         else:
             embedder_loader = PretrainedEmbedderLoader(TransformTextToIndex.pad_token())
 
         # preprocess steps TransformProteinMask
         preprocess_steps = []
         special_words = self.dataset.entity_markers
+        # Interaction types have a fixed index, so that each can be mapped to its network head
+        interaction_types = self.dataset.interaction_types
+        special_words = special_words + [t for t in interaction_types if t not in special_words]
 
         # Add sentence tokenisor
+        sentence_splitter = self._get_value(self.additional_args, "sentence_splitter", "spacy")
+        sentence_tokenisor_workers = int(self._get_value(self.additional_args, "sentence_tokenisor_workers", "1"))
         sentence_tokenisor = TransformSentenceTokenisor(text_column_index=self.dataset.text_column_index,
-                                                        eos_token=TransformTextToIndex.eos_token())
+                                                        eos_token=TransformTextToIndex.eos_token(),
+                                                        n_process=sentence_tokenisor_workers,
+                                                        splitter=sentence_splitter)
         preprocess_steps.append(("Sentence_tokenisor", sentence_tokenisor))
 
         # Create data and label pipeline
         min_word_doc_frequency = int(self._get_value(self.additional_args, "min_word_doc_frequency", "5"))
+        vocab_workers = int(self._get_value(self.additional_args, "vocab_workers", "1"))
+        text_to_index_workers = int(self._get_value(self.additional_args, "text_to_index_workers", "1"))
         text_to_index = TransformTextToIndex(max_feature_lens=self.dataset.feature_lens, special_words=special_words,
-                                             min_vocab_doc_frequency=min_word_doc_frequency)
-        data_pipeline = DataPipeline(preprocess_steps=preprocess_steps, text_to_index=text_to_index)
+                                             min_vocab_doc_frequency=min_word_doc_frequency,
+                                             vocab_workers=vocab_workers, index_workers=text_to_index_workers)
 
         # Label pipeline
         class_size = self.dataset.class_size
@@ -82,12 +94,26 @@ class TrainInferenceBuilder:
 
         special_words_dict = text_to_index.get_specialwords_dict()
         self.additional_args["entity_markers_indices"] = [special_words_dict[e] for e in self.dataset.entity_markers]
+        if len(interaction_types) > 0:
+            self.additional_args["interaction_type_indices"] = [special_words_dict[t] for t in interaction_types]
+            self.additional_args["interaction_type_column_index"] = self.dataset.interaction_type_column_index
         model_factory = NetworkFactoryLocator().get_factory(self.network_factory_name)
         model = model_factory.get_network(class_size, self.embedding_dim, np_feature_lens, **self.additional_args)
 
         self.logger.info("Using model {}".format(type(model)))
         self.logger.info("\n{}".format(model))
 
+        processing_steps = [("text_to_index", text_to_index)]
+
+        # Compute the entity distances once in the data pipeline rather than in every forward pass
+        precompute_entity_distance = bool(int(self._get_value(self.additional_args, "precompute_entity_distance", "1")))
+        entity_distance = self._get_entity_distance_transformer(model, np_feature_lens)
+        if precompute_entity_distance and entity_distance is not None:
+            processing_steps.append(("entity_distance", entity_distance))
+
+        data_pipeline = DataPipeline(preprocess_steps=preprocess_steps, text_to_index=text_to_index,
+                                     processing_steps=processing_steps)
+
         # Loss function
         loss_func_factory_name = self._get_value(self.additional_args, "loss_func_factory_name",
                                                  "algorithms.cross_entropy_loss_factory.CrossEntropyLossFactory")
@@ -115,3 +141,24 @@ class TrainInferenceBuilder:
                                           merge_train_val_vocab=merge_vocab_train_val)
 
         return pipeline
+
+    @staticmethod
+    def _get_entity_distance_transformer(model, feature_lens):
+        """
+        Returns the TransformEntityDistance that matches the position embedding of the model, None if the model does not use position embeddings
+        """
+        pos_embedder = getattr(model, "pos_embedder", None)
+        if pos_embedder is None:
+            return None
+
+        max_distance = pos_embedder.embeddings.shape[0] - 1
+
+        # Networks either use fixed entity markers or the entity in each of the non text columns
+        entity_markers = getattr(model, "entity_markers", None)
+        if entity_markers is not None:
+            return TransformEntityDistance(text_column_index=model.text_column_index, max_distance=max_distance,
+                                           entity_markers=entity_markers)
+
+        entity_column_indices = [c for c in range(len(feature_lens)) if c != model.text_column_index]
+        return TransformEntityDistance(text_column_index=model.text_column_index, max_distance=max_distance,
+                                       entity_column_indices=entity_column_indices)
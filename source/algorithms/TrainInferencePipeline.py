@@ -3,13 +3,18 @@ import logging
 import os
 import pickle
 
+import numpy as np
 import torch
 from torch.optim import Adam
 from torch.utils.data import DataLoader
 
 from algorithms.Collator import Collator
+from algorithms.Predictor import Predictor
 from algorithms.VocabMerge import VocabMerger
+from algorithms.abstract_pair_indexer import AbstractPairIndexer
+from algorithms.bucket_batch_sampler import BucketBatchSampler
 from algorithms.ensemble_predictor import EnsemblePredictor
+from algorithms.feature_cache import FeatureCache
 
 
 class TrainInferencePipeline:
@@ -55,8 +60,7 @@ class TrainInferencePipeline:
 
     def __call__(self, train, validation):
         self.logger.info("Train set has {} records, val has {}".format(len(train), len(validation)))
-        train_loader = DataLoader(train, shuffle=True, batch_size=self.batch_size, num_workers=self.num_workers,
-                                  collate_fn=Collator())
+        train_loader = self._get_train_loader(train)
         val_loader = DataLoader(validation, shuffle=False, batch_size=self.batch_size, num_workers=self.num_workers,
                                 collate_fn=Collator())
 
@@ -72,8 +76,10 @@ class TrainInferencePipeline:
         full_vocab_dict, embedding_array = self.embedder_loader(self.embedding_handle, train_vocab_dict)
         self.data_pipeline.update_vocab_dict(full_vocab_dict)
 
-        transformed_train_x = self.data_pipeline.fit_transform(train_loader)
-        transformed_val_x = self.data_pipeline.transform(val_loader)
+        self.data_pipeline.fit(train_loader)
+        # The batches of the shuffled train loader differ between runs, so only the validation features are cached
+        transformed_train_x = self.data_pipeline.transform(train_loader)
+        transformed_val_x = self._transform_features(validation, val_loader)
 
         transformed_train_x = self.label_pipeline.fit_transform(transformed_train_x)
         transformed_val_x = self.label_pipeline.transform(transformed_val_x)
@@ -121,6 +127,26 @@ class TrainInferencePipeline:
 
         return val_results, val_actuals, val_predicted
 
+    def _get_train_loader(self, train):
+        # Group sentences of similar length into the same batch, so that the lstm runs over less padding
+        length_bucketing = bool(int(self._get_value(self.additional_args, "length_bucketing", "0")))
+        if not length_bucketing:
+            return DataLoader(train, shuffle=True, batch_size=self.batch_size, num_workers=self.num_workers,
+                              collate_fn=Collator())
+
+        batch_sampler = BucketBatchSampler.from_dataset(train, train.text_column_index, self.batch_size)
+        return DataLoader(train, batch_sampler=batch_sampler, num_workers=self.num_workers, collate_fn=Collator())
+
+    def _transform_features(self, dataset, dataloader):
+        # Reuse the features of an earlier run over the same file with the same pipeline, when a cache dir is set. The
+        # dataloader must batch the records in the same order on every run
+        feature_cache_dir = self._get_value(self.additional_args, "feature_cache_dir", None)
+        if feature_cache_dir is None:
+            return self.data_pipeline.transform(dataloader)
+
+        return FeatureCache(feature_cache_dir)(dataset, self.data_pipeline,
+                                               lambda: self.data_pipeline.transform(dataloader))
+
     def sum(self, x):
         return sum([len(getattr(x, c)) for c in x.__dict__ if c != 'label'])
 
@@ -132,13 +158,24 @@ class TrainInferencePipeline:
             pickle.dump(self.label_pipeline, f)
 
     @staticmethod
-    def load(artifacts_dir):
+    def load(artifacts_dir, feature_cache_dir=None, length_bucketing=False, group_by_abstract=False):
         data_pipeline, label_pipeline, model = TrainInferencePipeline._load_single_model(artifacts_dir)
 
-        return lambda x: TrainInferencePipeline.predict(x, model, data_pipeline, label_pipeline)
+        return lambda x: TrainInferencePipeline.predict(x, model, data_pipeline, label_pipeline,
+                                                        feature_cache_dir=feature_cache_dir,
+                                                        length_bucketing=length_bucketing,
+                                                        group_by_abstract=group_by_abstract)
 
     @staticmethod
-    def load_ensemble(artifacts_dirs_list):
+    def load_ensemble(artifacts_dirs_list, feature_cache_dir=None, cpu_workers=1, return_score_matrix=False,
+                      length_bucketing=False, group_by_abstract=False):
+        """
+        Returns a function that predicts a dataset with the ensemble of models
+        :param return_score_matrix: Return the confidence scores as a matrix, see predict_score_matrix, instead of a
+        confidence score dict per record
+        :param length_bucketing: Batch records of similar length together, see predict_score_matrix
+        :param group_by_abstract: Index each abstract once for all its gene pairs, see predict_score_matrix
+        """
         assert len(artifacts_dirs_list) > 0, "Expecting at least one dir"
 
         models = []
@@ -147,7 +184,12 @@ class TrainInferencePipeline:
             data_pipeline, label_pipeline, model = TrainInferencePipeline._load_single_model(artifacts_dir)
             models.append(model)
 
-        return lambda x: TrainInferencePipeline.predict(x, models, data_pipeline, label_pipeline)
+        predict_func = TrainInferencePipeline.predict_score_matrix if return_score_matrix \
+            else TrainInferencePipeline.predict
+
+        return lambda x: predict_func(x, models, data_pipeline, label_pipeline,
+                                      feature_cache_dir=feature_cache_dir, cpu_workers=cpu_workers,
+                                      length_bucketing=length_bucketing, group_by_abstract=group_by_abstract)
 
     @staticmethod
     def _load_single_model(artifacts_dir):
@@ -176,30 +218,158 @@ class TrainInferencePipeline:
         return matched_file
 
     @staticmethod
-    def predict(dataset, model, data_pipeline, label_pipeline):
-        dataloader = DataLoader(dataset, shuffle=False, batch_size=32, num_workers=1,
-                                collate_fn=Collator())
+    def predict(dataset, model, data_pipeline, label_pipeline, feature_cache_dir=None, cpu_workers=1,
+                length_bucketing=False, group_by_abstract=False):
+        transformed_predictions, score_matrix, labels = TrainInferencePipeline.predict_score_matrix(
+            dataset, model, data_pipeline, label_pipeline, feature_cache_dir=feature_cache_dir,
+            cpu_workers=cpu_workers, length_bucketing=length_bucketing, group_by_abstract=group_by_abstract)
 
-        val_examples = data_pipeline.transform(dataloader)
+        transformed_conf_scores = TrainInferencePipeline.get_confidence_score_dict(labels, score_matrix)
 
-        predictor = EnsemblePredictor()
+        return transformed_predictions, transformed_conf_scores
+
+    @staticmethod
+    def predict_score_matrix(dataset, model, data_pipeline, label_pipeline, feature_cache_dir=None, cpu_workers=1,
+                             length_bucketing=False, group_by_abstract=False):
+        """
+        Predicts the dataset and returns a tuple (predictions, score_matrix, labels), where score_matrix is an array of
+        shape (records, classes) with the confidence score of the label in the same position in labels
+        :param length_bucketing: Batch records of similar length together, the results are returned in the dataset order
+        :param group_by_abstract: For a dataset with a record per gene pair of an abstract, whose rows are not
+        materialised, split and index each abstract once for all its pairs, see AbstractPairIndexer. Other datasets are
+        transformed by the data pipeline
+        """
+        val_examples, order = TrainInferencePipeline._get_predict_features(dataset, data_pipeline,
+                                                                           feature_cache_dir=feature_cache_dir,
+                                                                           length_bucketing=length_bucketing,
+                                                                           group_by_abstract=group_by_abstract)
+
+        predictor = EnsemblePredictor(cpu_workers=cpu_workers)
 
         predictions, confidence_scores = predictor.predict(model, val_examples)
 
+        score_matrix = TrainInferencePipeline._get_confidence_score_matrix(confidence_scores)
+
+        if order is not None:
+            # Restore the dataset order of the results
+            inverse_order = np.argsort(order, kind="mergesort")
+            predictions = [np.concatenate(predictions)[inverse_order]] if len(predictions) > 0 else []
+            score_matrix = score_matrix[inverse_order]
+
         transformed_predictions = label_pipeline.label_reverse_encoder_func(predictions)
 
-        transformed_conf_scores = TrainInferencePipeline._get_confidence_score_dict(label_pipeline, confidence_scores)
+        # Decode the label of each column once
+        labels = list(label_pipeline.label_reverse_encoder_func(list(range(score_matrix.shape[1]))))
 
-        return transformed_predictions, transformed_conf_scores
+        return transformed_predictions, score_matrix, labels
+
+    @staticmethod
+    def _get_predict_features(dataset, data_pipeline, feature_cache_dir=None, length_bucketing=False,
+                              group_by_abstract=False, batch_size=32):
+        """
+        Returns a tuple (batches, order) of the transformed batches of the dataset to predict, and the dataset index of
+        each record in the order of the batches, None when the batches are in the dataset order
+        """
+        if length_bucketing:
+            batch_sampler = BucketBatchSampler.from_dataset(dataset, dataset.text_column_index, batch_size=batch_size,
+                                                            shuffle=False)
+            dataloader = DataLoader(dataset, batch_sampler=batch_sampler, num_workers=1, collate_fn=Collator())
+            order = np.asarray([i for b in batch_sampler for i in b], dtype=np.int64)
+        else:
+            batch_sampler = None
+            dataloader = DataLoader(dataset, shuffle=False, batch_size=batch_size, num_workers=1,
+                                    collate_fn=Collator())
+            order = None
+
+        abstract_indexer = AbstractPairIndexer.from_dataset(dataset, data_pipeline, batch_size=batch_size) \
+            if group_by_abstract else None
+        if abstract_indexer is not None:
+            iter_transform = lambda: abstract_indexer.iter_transform(dataset, batch_sampler)
+        else:
+            iter_transform = lambda: data_pipeline.iter_transform(dataloader)
+
+        if feature_cache_dir is None:
+            # Transform lazily, so that large datasets are not held in memory after each step of the pipeline
+            return iter_transform(), order
+
+        return FeatureCache(feature_cache_dir)(dataset, data_pipeline, lambda: list(iter_transform()),
+                                               order=order), order
+
+    @staticmethod
+    def load_interaction_types_ensemble(artifacts_dirs_list, feature_cache_dir=None, length_bucketing=False,
+                                        group_by_abstract=False):
+        """
+        Returns a function that predicts the confidence score of every interaction type of each record of a dataset,
+        with the ensemble of models, see predict_interaction_type_matrix
+        """
+        assert len(artifacts_dirs_list) > 0, "Expecting at least one dir"
+
+        models = []
+        for artifacts_dir in artifacts_dirs_list:
+            data_pipeline, label_pipeline, model = TrainInferencePipeline._load_single_model(artifacts_dir)
+            models.append(model)
+
+        return lambda x: TrainInferencePipeline.predict_interaction_type_matrix(
+            x, models, data_pipeline, label_pipeline, feature_cache_dir=feature_cache_dir,
+            length_bucketing=length_bucketing, group_by_abstract=group_by_abstract)
+
+    @staticmethod
+    def predict_interaction_types(dataset, model, data_pipeline, label_pipeline, feature_cache_dir=None,
+                                  length_bucketing=False, group_by_abstract=False):
+        """
+        Returns, for each record, a dict of the confidence score of the positive label of every interaction type, see
+        predict_interaction_type_matrix
+        """
+        score_matrix, interaction_types = TrainInferencePipeline.predict_interaction_type_matrix(
+            dataset, model, data_pipeline, label_pipeline, feature_cache_dir=feature_cache_dir,
+            length_bucketing=length_bucketing, group_by_abstract=group_by_abstract)
+
+        return [dict(zip(interaction_types, r)) for r in score_matrix.tolist()]
+
+    @staticmethod
+    def predict_interaction_type_matrix(dataset, model, data_pipeline, label_pipeline, feature_cache_dir=None,
+                                        length_bucketing=False, group_by_abstract=False):
+        """
+        Returns a tuple (score_matrix, interaction_types), where score_matrix is an array of shape (records, types) with
+        the confidence score of the positive label of the interaction type in the same position in interaction_types.
+        The model has a head per interaction type, see RelationExtractorMultiTypeBiLstmNetwork, so each record is
+        encoded once rather than once per interaction type. The scores of an ensemble of models are averaged. Use a
+        dataset with a record per abstract and gene pair, e.g. PpiMultiTypeDatasetFactory with all_types.
+        :param length_bucketing: Batch records of similar length together, see predict_score_matrix
+        :param group_by_abstract: Index each abstract once for all its gene pairs, see predict_score_matrix
+        """
+        models = model if isinstance(model, list) else [model]
+        positive_index = int(label_pipeline.transform(dataset.positive_label))
+
+        val_examples, order = TrainInferencePipeline._get_predict_features(dataset, data_pipeline,
+                                                                           feature_cache_dir=feature_cache_dir,
+                                                                           length_bucketing=length_bucketing,
+                                                                           group_by_abstract=group_by_abstract)
+        if len(models) > 1:
+            # Each model reads all the batches
+            val_examples = list(val_examples)
+
+        score_matrix = None
+        for m in models:
+            scores = [b[:, :, positive_index].numpy().astype(np.float64)
+                      for b in Predictor().predict_all_types(m, val_examples)]
+            scores = np.concatenate(scores) if len(scores) > 0 else np.zeros((0, len(dataset.interaction_types)))
+            score_matrix = scores if score_matrix is None else score_matrix + scores
+        score_matrix = score_matrix / len(models)
+
+        if order is not None:
+            # Restore the dataset order of the results
+            score_matrix = score_matrix[np.argsort(order, kind="mergesort")]
+
+        return score_matrix, list(dataset.interaction_types)
+
+    @staticmethod
+    def _get_confidence_score_matrix(confidence_scores):
+        # The ensemble predictor returns a float64 array of shape (batch, classes) for each batch
+        if len(confidence_scores) == 0:
+            return np.zeros((0, 0))
+        return np.concatenate(confidence_scores)
 
     @staticmethod
-    def _get_confidence_score_dict(label_pipeline, confidence_scores):
-        transformed_conf_scores = []
-        for b in confidence_scores:
-            for r in b:
-                conf_score = {}
-                for i, s in enumerate(r):
-                    conf_score[label_pipeline.label_reverse_encoder_func(i)] = s
-                transformed_conf_scores.append(conf_score)
-
-        return transformed_conf_scores
+    def get_confidence_score_dict(labels, score_matrix):
+        return [dict(zip(labels, r)) for r in score_matrix.tolist()]
@@ -29,7 +29,9 @@ class TrainWorkflow:
         return logging.getLogger(__name__)
 
     def __call__(self, train_file, val_file, test_file=None):
-        dataset_factory = DatasetFactory().get_datasetfactory(self.dataset_factory_name)
+        preprocess_workers = int((self.additionalargs or {}).get("preprocess_workers", "1"))
+        dataset_factory = DatasetFactory().get_datasetfactory(self.dataset_factory_name,
+                                                              preprocess_workers=preprocess_workers)
         scorer_factory = dataset_factory.get_metric_factory()
         scorer = scorer_factory.get()
 
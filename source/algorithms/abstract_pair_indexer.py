@@ -0,0 +1,245 @@
+import logging
+import re
+from collections import OrderedDict
+
+import numpy as np
+import torch
+
+from algorithms.DataPipeline import DataPipeline
+from algorithms.rule_sentence_splitter import RuleSentenceSplitter
+from algorithms.transform_sentence_tokeniser import TransformSentenceTokenisor
+from algorithms.transform_text_index import TransformTextToIndex, _index_batch, _token_pattern
+from preprocessor.Preprocessor import Preprocessor
+from preprocessor.ProteinMasker import ProteinMasker
+
+"""
+Indexes the gene pairs of an abstract from a single sentence split and tokenisation of the abstract
+"""
+
+# The first word after, and the last word before, a sentence end. Masking such a word can move a sentence boundary
+_sentence_start_word = re.compile(r"[.?!][\"')\]]*\s+(\w+)")
+_sentence_end_word = re.compile(r"(\w+)[.?!]")
+
+# The first character of a sentence, as in RuleSentenceSplitter
+_sentence_start_char = re.compile(r"[A-Z0-9(\[\"']")
+
+
+class AbstractPairIndexer:
+    """
+    Transforms a dataset with a row per gene pair of an abstract, such as the PubTator inference records, into the same
+    batches as the data pipeline. Each distinct abstract is split into sentences, tokenised and indexed once, and the
+    word indices of a pair are a copy of the abstract indices with the index of the entity mask at the positions of
+    the entity names, rather than masking, splitting and indexing the abstract again for every pair.
+
+    A pair is masked and indexed on its own, as in the data pipeline, when substituting the indices may not give the
+    same result: an entity name that is not always a whole word, a name next to a sentence end whose mask would move the
+    sentence boundary under the RuleSentenceSplitter rules, or a name that occurs in the mask of an earlier entity. The
+    sentence boundaries of the other pairs are those of the abstract before masking, which with the spacy splitter may
+    in rare cases differ from the boundaries of the masked abstract.
+    """
+
+    def __init__(self, data_pipeline, masker, batch_size=32, max_cached_abstracts=1000):
+        """
+        :param data_pipeline: The data pipeline of the model, see from_dataset for the supported steps
+        :param masker: The ProteinMasker that masks the entity names of a row
+        :param batch_size: The number of rows in a batch
+        :param max_cached_abstracts: The number of most recently indexed abstracts kept
+        """
+        self.data_pipeline = data_pipeline
+        self.masker = masker
+        self.batch_size = batch_size
+        self.max_cached_abstracts = max_cached_abstracts
+
+        preprocess_steps = [p for _, p in data_pipeline.preprocess_steps]
+        self._sentence_tokenisor = preprocess_steps[0] if len(preprocess_steps) > 0 else None
+        self._text_to_index = data_pipeline.processing_steps[0][1]
+        self._remaining_steps = data_pipeline.processing_steps[1:]
+        self._abstracts_cache = OrderedDict()
+        self._rule_splitter = RuleSentenceSplitter()
+
+    @property
+    def logger(self):
+        return logging.getLogger(__name__)
+
+    @staticmethod
+    def from_dataset(dataset, data_pipeline, batch_size=32):
+        """
+        Returns the indexer of the dataset, or None when it is not supported. The rows must be masked by a single
+        ProteinMasker of the entity names, with masks that are a single word, and the dataset must not be materialised.
+        The data pipeline must be at most a sentence tokenisor of the text column, then TransformTextToIndex and any
+        steps that transform its word indices.
+        """
+        logger = logging.getLogger(__name__)
+
+        transformer = dataset.transformer
+        preprocessors = transformer.preprocessors if isinstance(transformer, Preprocessor) else [transformer]
+        masker = preprocessors[0] if len(preprocessors) == 1 else None
+        if not isinstance(masker, ProteinMasker) or masker.entity_offset_indices is not None \
+                or not all(_token_pattern.fullmatch(str(m)) for m in masker.masks):
+            logger.info("The rows must be masked by a single ProteinMasker of entity names, found {}".format(
+                transformer))
+            return None
+
+        if dataset.materialised:
+            logger.info("The rows of the dataset are already masked, the abstracts can not be indexed once")
+            return None
+
+        preprocess_steps = [p for _, p in data_pipeline.preprocess_steps]
+        if len(preprocess_steps) > 1 or not all(isinstance(p, TransformSentenceTokenisor)
+                                                and p.text_column_index == masker.text_column_index
+                                                for p in preprocess_steps):
+            logger.info("Only a sentence tokenisor of the text is supported, found {}".format(preprocess_steps))
+            return None
+
+        if len(data_pipeline.processing_steps) == 0 \
+                or not isinstance(data_pipeline.processing_steps[0][1], TransformTextToIndex):
+            logger.info("The first processing step must be TransformTextToIndex, found {}".format(
+                data_pipeline.processing_steps))
+            return None
+
+        return AbstractPairIndexer(data_pipeline, masker, batch_size=batch_size)
+
+    def iter_transform(self, dataset, batch_indices=None):
+        """
+        Lazily transforms the dataset into the batches of the data pipeline
+        :param batch_indices: The list of row indices of each batch, by default batch_size rows at a time in order
+        """
+        if batch_indices is None:
+            batch_indices = [list(range(s, min(s + self.batch_size, len(dataset))))
+                             for s in range(0, len(dataset), self.batch_size)]
+
+        batches = (self._transform_batch(dataset.get_rows(indices)) for indices in batch_indices)
+        for name, p in self._remaining_steps:
+            batches = DataPipeline._iter_transform_step(p, batches)
+        return batches
+
+    def transform(self, dataset, batch_indices=None):
+        return list(self.iter_transform(dataset, batch_indices))
+
+    def _transform_batch(self, rows):
+        text_index = self.masker.text_column_index
+        text_to_index = self._text_to_index
+        f = (lambda x: x.lower()) if text_to_index.case_insensitive else (lambda x: x)
+        vocab_dict = text_to_index.vocab_dict
+        pad_index = vocab_dict[f(TransformTextToIndex.pad_token())]
+        unknown_index = vocab_dict[f(TransformTextToIndex.UNK_token())]
+        max_len = text_to_index.max_feature_lens[text_index]
+        mask_indices = [vocab_dict.get(f(str(m)), unknown_index) for m in self.masker.masks]
+
+        abstracts = self._get_abstracts([r[text_index] for r, _ in rows], f, unknown_index, max_len)
+
+        text_indices = []
+        masked_texts = []
+        masked_rows = []
+        for row_values, _ in rows:
+            entities = [str(row_values[ei]) for ei in self.masker.entity_column_indices]
+            indices = self._substitute(abstracts[row_values[text_index]], row_values[text_index], entities,
+                                       mask_indices, max_len)
+            if indices is None:
+                # Mask and index the pair on its own
+                masked_row = self.masker(list(row_values))
+                masked_texts.append(masked_row[text_index])
+                indices = len(masked_texts) - 1
+            else:
+                masked_row = list(row_values)
+                for ei, m in zip(self.masker.entity_column_indices, self.masker.masks):
+                    masked_row[ei] = str(m)
+
+            masked_row[text_index] = ""
+            masked_rows.append(masked_row)
+            text_indices.append(indices)
+
+        masked_text_indices = [self._index_words(self._tokenise(t), f, unknown_index, max_len)
+                               for t in self._join_sentences(masked_texts)]
+
+        cols, _ = _index_batch(list(zip(*masked_rows)), vocab_dict, text_to_index.max_feature_lens,
+                               text_to_index.case_insensitive, pad_index, unknown_index)
+        for r, indices in enumerate(text_indices):
+            if isinstance(indices, int):
+                indices = masked_text_indices[indices]
+            cols[text_index][r, 0:len(indices)] = indices
+
+        return [[torch.from_numpy(c) for c in cols], [y for _, y in rows]]
+
+    def _get_abstracts(self, texts, f, unknown_index, max_len):
+        """
+        Returns a dict of the word indices, the positions of each word and the words next to a sentence end of each
+        distinct text. The texts indexed before are read from the cache
+        """
+        result = {}
+        new_texts = []
+        for t in OrderedDict.fromkeys(texts):
+            if t in self._abstracts_cache:
+                self._abstracts_cache.move_to_end(t)
+                result[t] = self._abstracts_cache[t]
+            else:
+                new_texts.append(t)
+
+        for t, joined in zip(new_texts, self._join_sentences(new_texts)):
+            words = self._tokenise(joined)
+            positions = {}
+            for i, w in enumerate(words):
+                positions.setdefault(w, []).append(i)
+            boundary_words = (set(_sentence_start_word.findall(t)), set(_sentence_end_word.findall(t)))
+
+            result[t] = (self._index_words(words, f, unknown_index, max_len), positions, boundary_words)
+            self._abstracts_cache[t] = result[t]
+
+        while len(self._abstracts_cache) > self.max_cached_abstracts:
+            self._abstracts_cache.popitem(last=False)
+
+        return result
+
+    def _substitute(self, abstract, text, entities, mask_indices, max_len):
+        """
+        Returns the word indices of the abstract with the entities masked, or None when masking the text may give
+        different words
+        """
+        indices, positions, (start_words, end_words) = abstract
+        masks = [str(m) for m in self.masker.masks]
+
+        result = indices.copy()
+        for i, e in enumerate(entities):
+            # The masker replaces the names one at a time, so a name in an earlier mask would be replaced in the mask
+            if any(e in m for m in masks[0:i]):
+                return None
+            # A name listed twice is already masked
+            if e in entities[0:i]:
+                continue
+
+            e_positions = positions.get(e, [])
+            if text.count(e) != len(e_positions):
+                return None
+            # A sentence starts with an upper case letter or digit, and does not end after an abbreviation
+            if e in start_words and \
+                    (_sentence_start_char.match(e) is None) != (_sentence_start_char.match(masks[i]) is None):
+                return None
+            is_abbreviation = self._rule_splitter._is_abbreviation
+            if e in end_words and is_abbreviation(e + ".") != is_abbreviation(masks[i] + "."):
+                return None
+
+            result[[p for p in e_positions if p < max_len]] = mask_indices[i]
+
+        return result
+
+    def _join_sentences(self, texts):
+        # The text as transformed by the sentence tokenisor
+        if self._sentence_tokenisor is None or len(texts) == 0:
+            return texts
+
+        tokenisor = self._sentence_tokenisor
+        if tokenisor._sentence_tokenisor is None:
+            sentences = tokenisor._split_sentences(texts)
+        else:
+            sentences = [tokenisor._sentence_tokenisor(t) for t in texts]
+
+        eos = " {} ".format(tokenisor.eos_token)
+        return [eos.join(s) for s in sentences]
+
+    @staticmethod
+    def _tokenise(text):
+        return _token_pattern.findall(text)
+
+    def _index_words(self, words, f, unknown_index, max_len):
+        vocab_dict = self._text_to_index.vocab_dict
+        return np.asarray([vocab_dict.get(f(w), unknown_index) for w in words[0:max_len]], dtype=np.int64)
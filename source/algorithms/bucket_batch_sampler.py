@@ -0,0 +1,69 @@
+import logging
+import math
+
+import numpy as np
+
+
+class BucketBatchSampler:
+    """
+    Batch sampler for the DataLoader that groups records of similar length into the same batch, so that less of each
+    batch is padding when the batches are padded to their longest sequence.
+    """
+
+    def __init__(self, lengths, batch_size, shuffle=True, bucket_size_multiplier=100, seed=None):
+        """
+The records are split into buckets of batch_size * bucket_size_multiplier records, in random order when shuffle is
+set. Each bucket is sorted by length and cut into batches, and the order of the batches is then shuffled.
+        :param lengths: The length of each record in the dataset
+        :param batch_size: The number of records in a batch
+        :param shuffle: Shuffle the records before bucketing and the order of the batches
+        :param bucket_size_multiplier: The number of batches in a bucket. The larger the bucket, the closer the lengths
+        in a batch but the less random the batches are
+        :param seed: The seed for shuffling
+        """
+        self.lengths = np.asarray(lengths)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.bucket_size_multiplier = bucket_size_multiplier
+        self._random = np.random.RandomState(seed)
+
+    @property
+    def logger(self):
+        return logging.getLogger(__name__)
+
+    @staticmethod
+    def from_dataset(dataset, text_column_index, batch_size, shuffle=True, bucket_size_multiplier=100, seed=None):
+        """
+        Buckets the records of the dataset by the number of characters, not tokens, in the text column. The rows of a
+        dataset with get_rows, see CustomDatasetBase, are read without applying its transformer, so the lengths of a
+        dataset that is not materialised are those of the text before masking, which sort the records much the same.
+        :param dataset: Dataset where each item is (features, label)
+        :param text_column_index: The index of the text column in the features
+        """
+        if hasattr(dataset, "get_rows"):
+            rows = dataset.get_rows(np.arange(len(dataset)))
+        else:
+            rows = (dataset[i] for i in range(len(dataset)))
+        lengths = [len(x[text_column_index]) for x, _ in rows]
+        return BucketBatchSampler(lengths, batch_size, shuffle=shuffle,
+                                  bucket_size_multiplier=bucket_size_multiplier, seed=seed)
+
+    def __iter__(self):
+        indices = np.arange(len(self.lengths))
+        if self.shuffle:
+            self._random.shuffle(indices)
+
+        bucket_size = self.batch_size * self.bucket_size_multiplier
+        batches = []
+        for start in range(0, len(indices), bucket_size):
+            bucket = indices[start: start + bucket_size]
+            bucket = bucket[np.argsort(self.lengths[bucket], kind="mergesort")]
+            batches.extend([bucket[i: i + self.batch_size].tolist() for i in range(0, len(bucket), self.batch_size)])
+
+        if self.shuffle:
+            batches = [batches[i] for i in self._random.permutation(len(batches))]
+
+        return iter(batches)
+
+    def __len__(self):
+        return int(math.ceil(len(self.lengths) / self.batch_size))
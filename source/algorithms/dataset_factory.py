@@ -32,13 +32,14 @@ class DatasetFactory:
         """
         return list(self._class_name_class_dict.keys())
 
-    def get_datasetfactory(self, class_name):
+    def get_datasetfactory(self, class_name, **kwargs):
         """
         Returns a dataset factory object
         :param class_name: The name of the dataset factory class, see property dataset_factory_names to obtain valid list of class names
+        :param kwargs: Passed to the dataset factory constructor, e.g. preprocess_workers
         :return:
         """
         if class_name in self._class_name_class_dict:
-            return self._class_name_class_dict[class_name]()
+            return self._class_name_class_dict[class_name](**kwargs)
         else:
             raise ModuleNotFoundError("Module should be in {}".format(self.dataset_factory_names))
@@ -0,0 +1,121 @@
+import logging
+import os
+
+import numpy as np
+
+"""
+Binary store for pretrained word embeddings, so the text embedding file does not need to be parsed on every run
+"""
+
+
+class EmbeddingStore:
+    """
+    The store for an embedding prefix is two files, <prefix>.vocab with one word per line in the order of the rows
+    and <prefix>.npy with the float32 embedding matrix, which is memory mapped when loaded.
+    """
+    vocab_suffix = ".vocab"
+    matrix_suffix = ".npy"
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+
+        with open(self.vocab_file, "r", encoding="utf-8") as f:
+            self.words = f.read().split("\n")[:-1]
+
+        self.embeddings = np.load(self.matrix_file, mmap_mode="r")
+
+        assert len(self.words) == self.embeddings.shape[0], \
+            "The vocab has {} words, but the embedding matrix has {} rows".format(len(self.words),
+                                                                                  self.embeddings.shape[0])
+
+    @property
+    def logger(self):
+        return logging.getLogger(__name__)
+
+    @property
+    def vocab_file(self):
+        return self.prefix + self.vocab_suffix
+
+    @property
+    def matrix_file(self):
+        return self.prefix + self.matrix_suffix
+
+    @property
+    def dim(self):
+        return self.embeddings.shape[1]
+
+    def word_rows(self, words_index_dict):
+        """
+        Returns the matching (store rows, words_index_dict indices) for the words that are in the store.
+        When a word appears more than once in the store, the last row is used as is the case with the text file
+        :param words_index_dict: dict of word to index
+        """
+        index_to_row = {}
+        for r, word in enumerate(self.words):
+            index = words_index_dict.get(word, None)
+            if index is not None:
+                index_to_row[index] = r
+
+        indices = np.fromiter(index_to_row.keys(), dtype=np.int64, count=len(index_to_row))
+        rows = np.fromiter(index_to_row.values(), dtype=np.int64, count=len(index_to_row))
+
+        return rows, indices
+
+    @staticmethod
+    def find(handle):
+        """
+        Returns the EmbeddingStore for the embedding handle if there is one, else None.
+        The handle is either the .vocab file of the store, or a text embedding file that has been converted to a store
+        with the same prefix which is at least as recent as the text file.
+        :param handle: An open file handle
+        """
+        name = getattr(handle, "name", None)
+        if not isinstance(name, str):
+            return None
+
+        if name.endswith(EmbeddingStore.vocab_suffix):
+            return EmbeddingStore(name[:-len(EmbeddingStore.vocab_suffix)])
+
+        vocab_file = name + EmbeddingStore.vocab_suffix
+        matrix_file = name + EmbeddingStore.matrix_suffix
+        if os.path.isfile(vocab_file) and os.path.isfile(matrix_file):
+            if min(os.path.getmtime(vocab_file), os.path.getmtime(matrix_file)) >= os.path.getmtime(name):
+                return EmbeddingStore(name)
+            logging.getLogger(__name__).warning(
+                "Ignoring the embedding store for {} as it is older than the text file".format(name))
+
+        return None
+
+    @staticmethod
+    def convert(handle, prefix):
+        """
+        Converts a text embedding, in the space separated format with a header line "<num words> <dim>", to a store
+        :param handle: handle containing the text embedding
+        :param prefix: The prefix of the store files to write
+        :return: The EmbeddingStore
+        """
+        num_words, dim = [int(v) for v in handle.readline().split()]
+
+        embeddings = np.lib.format.open_memmap(prefix + EmbeddingStore.matrix_suffix, mode="w+", dtype=np.float32,
+                                               shape=(num_words, dim))
+
+        total = 0
+        with open(prefix + EmbeddingStore.vocab_suffix, "w", encoding="utf-8") as vocab:
+            for line in handle:
+                values = line.rstrip("\n").rstrip(" ").split(" ")
+                if len(values) < 2:
+                    continue
+
+                assert total < num_words, "The embedding has more words than the {} in the header".format(num_words)
+                embeddings[total] = np.asarray(values[1:], dtype=np.float32)
+                vocab.write(values[0])
+                vocab.write("\n")
+                total += 1
+
+        assert total == num_words, "The header has {} words, but found {}".format(num_words, total)
+        embeddings.flush()
+        del embeddings
+
+        logging.getLogger(__name__).info("Converted {} words of dim {} to {}".format(total, dim, prefix))
+
+        return EmbeddingStore(prefix)
@@ -1,18 +1,33 @@
 import logging
+import multiprocessing
+import os
 from multiprocessing.dummy import Pool
-from operator import add
 
 import torch
+import torch.multiprocessing
 
 from algorithms.Predictor import Predictor
 
+# The state of a cpu worker process, inherited from the parent when the worker is forked
+_cpu_worker_state = {}
+
 
 class EnsemblePredictor:
 
-    def __init__(self, model_wrapper=None):
+    def __init__(self, model_wrapper=None, cpu_workers=1):
+        """
+        :param model_wrapper: Runs a single model over the batches, see Predictor
+        :param cpu_workers: On cpu, the number of processes to run the ensemble members in parallel. The cpu threads
+        are split between the processes
+        """
+        self.cpu_workers = cpu_workers
         self.model_wrapper = model_wrapper or Predictor()
 
     def predict(self, model_networks, dataloader, device=None):
+        """
+        Returns a tuple (predicted, scores), the lists of the per batch arrays of predicted class indices and average
+        scores of the ensemble, see _aggregate_scores
+        """
         if not self._is_iterable(model_networks):
             model_networks = [model_networks]
 
@@ -30,39 +45,89 @@ class EnsemblePredictor:
         else:
             devices = [device]
 
+        if devices == ["cpu"] and self.cpu_workers > 1 and len(model_networks) > 1 and self._can_fork():
+            return self._predict_cpu_processes(model_networks, dataloader)
+
         # Use all available GPUS using multithreading
         self._logger.info("Using devices {}".format(devices))
-        model_device_map = [(m, dataloader, devices[i % len(devices)]) for i, m in enumerate(model_networks)]
+        predicted_ensemble = []
+        scores_ensemble_avg = []
         with Pool(len(devices)) as p:
-            agg_pred_scores = p.starmap(self.model_wrapper.predict, model_device_map)
+            if self._is_iterator(dataloader):
+                # The batches can only be read once, so run each batch through all the models before reading the next
+                for b in dataloader:
+                    model_device_map = self._get_model_device_map(model_networks, [b], devices)
+                    members_scores = [s for _, s in p.starmap(self.model_wrapper.predict, model_device_map)]
+                    batch_predicted, batch_scores = self._aggregate_scores(members_scores)
+                    predicted_ensemble.extend(batch_predicted)
+                    scores_ensemble_avg.extend(batch_scores)
+            else:
+                model_device_map = self._get_model_device_map(model_networks, dataloader, devices)
+                members_scores = [s for _, s in p.starmap(self.model_wrapper.predict, model_device_map)]
+                predicted_ensemble, scores_ensemble_avg = self._aggregate_scores(members_scores)
 
-        scores_ensemble = []
-        for _, s in agg_pred_scores:
-            self._populate_aggregate_scores_(s, scores_ensemble)
+        return predicted_ensemble, scores_ensemble_avg
 
-        scores_ensemble_avg = []
-        # average the confidence
-        for batch in scores_ensemble:
-            scores_ensemble_avg.append([list(map(lambda x: x / len(model_networks), p)) for p in batch])
+    def _predict_cpu_processes(self, model_networks, dataloader):
+        num_workers = min(self.cpu_workers, len(model_networks))
+        num_threads = max(1, (os.cpu_count() or 1) // num_workers)
+        self._logger.info("Using {} cpu processes with {} threads each".format(num_workers, num_threads))
+
+        # Forked workers then read the same weights rather than copies
+        for m in model_networks:
+            m.share_memory()
+
+        is_iterator = self._is_iterator(dataloader)
+        worker_batches = None if is_iterator else dataloader
 
-        # Predicted ensemble , arg max
         predicted_ensemble = []
-        for batch in scores_ensemble_avg:
-            predicted_ensemble.append([p.index(max(p)) for p in batch])
+        scores_ensemble_avg = []
+        context = torch.multiprocessing.get_context("fork")
+        with context.Pool(num_workers, initializer=_init_cpu_worker,
+                          initargs=(self.model_wrapper, model_networks, num_threads, worker_batches)) as p:
+            if is_iterator:
+                for b in dataloader:
+                    members_scores = p.starmap(_predict_cpu_worker, [(i, [b]) for i in range(len(model_networks))])
+                    batch_predicted, batch_scores = self._aggregate_scores(members_scores)
+                    predicted_ensemble.extend(batch_predicted)
+                    scores_ensemble_avg.extend(batch_scores)
+            else:
+                members_scores = p.starmap(_predict_cpu_worker, [(i, None) for i in range(len(model_networks))])
+                predicted_ensemble, scores_ensemble_avg = self._aggregate_scores(members_scores)
+
         return predicted_ensemble, scores_ensemble_avg
 
     @staticmethod
-    def _populate_aggregate_scores_(batches_of_scores, output_scores_ensemble):
+    def _can_fork():
+        return "fork" in multiprocessing.get_all_start_methods()
 
-        for bi in range(len(batches_of_scores)):
-            # First time not intialised case
-            if len(output_scores_ensemble) < bi + 1:
-                output_scores_ensemble.append(batches_of_scores[bi])
-            else:
-                batch_sum = []
-                for line in range(len(batches_of_scores[bi])):
-                    batch_sum.append(list(map(add, output_scores_ensemble[bi][line], batches_of_scores[bi][line])))
-                output_scores_ensemble[bi] = batch_sum
+    @staticmethod
+    def _aggregate_scores(members_scores):
+        """
+        Averages the scores of the ensemble members and takes the arg max
+        :param members_scores: For each member, the list of scores for each batch of shape (batch, classes)
+        :return: a tuple (predicted, scores) of lists with, for each batch, the int64 array of predicted class indices
+        and the float64 array of average scores of shape (batch, classes)
+        """
+        batch_sizes = [len(b) for b in members_scores[0]]
+        if len(batch_sizes) == 0:
+            return [], []
+
+        # Shape (members, rows, classes), using double precision so averaging matches summing the scores as floats
+        stacked_scores = torch.stack(
+            [torch.cat([torch.as_tensor(b, dtype=torch.float64) for b in m]) for m in members_scores])
+        scores_avg = stacked_scores.mean(dim=0)
+        predicted = scores_avg.argmax(dim=-1)
+
+        # Split back into batches as arrays, the callers convert to lists only where the records are built
+        predicted_batches = [b.numpy() for b in torch.split(predicted, batch_sizes)]
+        scores_batches = [b.numpy() for b in torch.split(scores_avg, batch_sizes)]
+
+        return predicted_batches, scores_batches
+
+    @staticmethod
+    def _get_model_device_map(model_networks, dataloader, devices):
+        return [(m, dataloader, devices[i % len(devices)]) for i, m in enumerate(model_networks)]
 
     @property
     def _logger(self):
@@ -76,3 +141,29 @@ class EnsemblePredictor:
             return False
         else:
             return True
+
+    @staticmethod
+    def _is_iterator(o):
+        try:
+            return iter(o) is o
+        except TypeError:
+            return False
+
+
+def _init_cpu_worker(model_wrapper, model_networks, num_threads, batches):
+    # Split the cpu threads between the workers, so the workers do not oversubscribe the cores
+    torch.set_num_threads(num_threads)
+    _cpu_worker_state["model_wrapper"] = model_wrapper
+    _cpu_worker_state["model_networks"] = model_networks
+    _cpu_worker_state["batches"] = batches
+
+
+def _predict_cpu_worker(model_index, batches=None):
+    """
+    Returns the scores of a single ensemble member, for the batches or else the batches inherited from the parent
+    """
+    batches = _cpu_worker_state["batches"] if batches is None else batches
+    model_network = _cpu_worker_state["model_networks"][model_index]
+
+    _, scores = _cpu_worker_state["model_wrapper"].predict(model_network, batches, "cpu")
+    return scores
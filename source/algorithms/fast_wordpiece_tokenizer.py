@@ -0,0 +1,129 @@
+import hashlib
+import logging
+from collections import OrderedDict
+
+"""
+Trie based WordPiece tokenizer that returns the same tokens as the pytorch_pretrained_bert BertTokenizer.tokenize
+"""
+
+# Marks the end of a vocab entry in the trie, no character is an empty string
+_END = ""
+
+
+class FastWordpieceTokenizer:
+    """
+    Tokenizes text like BertTokenizer.tokenize. The greedy longest match first search of the word pieces is a single
+    walk of a trie of the vocab, rather than a vocab lookup for every substring. The word pieces of each word are
+    cached, and the tokens of the most recent texts are memoized by the hash of the text so that an abstract that is
+    repeated for each of its entity pairs is only tokenized once.
+    """
+
+    def __init__(self, bert_tokeniser, memo_size=1024, max_word_cache_size=1 << 18):
+        """
+        :param bert_tokeniser: The pytorch_pretrained_bert BertTokenizer, the vocab and basic tokenizer are reused
+        :param memo_size: The number of most recently used texts whose tokens are kept
+        :param max_word_cache_size: The word piece cache is cleared when it has more words than this
+        """
+        self.bert_tokeniser = bert_tokeniser
+        self.memo_size = memo_size
+        self.max_word_cache_size = max_word_cache_size
+
+        wordpiece_tokenizer = bert_tokeniser.wordpiece_tokenizer
+        self.unk_token = wordpiece_tokenizer.unk_token
+        self.max_input_chars_per_word = wordpiece_tokenizer.max_input_chars_per_word
+
+        self._start_trie, self._continuation_trie = self._build_tries(wordpiece_tokenizer.vocab)
+
+        self._word_cache = {}
+        self._memo = OrderedDict()
+        self.memo_hits = 0
+        self.memo_misses = 0
+
+    @property
+    def logger(self):
+        return logging.getLogger(__name__)
+
+    @staticmethod
+    def _build_tries(vocab):
+        # The first piece of a word can be any vocab entry, the rest are the entries prefixed with ##
+        start_trie = {}
+        continuation_trie = {}
+        for token in vocab:
+            FastWordpieceTokenizer._insert(start_trie, token)
+            if token.startswith("##"):
+                FastWordpieceTokenizer._insert(continuation_trie, token[2:])
+
+        return start_trie, continuation_trie
+
+    @staticmethod
+    def _insert(trie, token):
+        node = trie
+        for c in token:
+            node = node.setdefault(c, {})
+        node[_END] = True
+
+    def tokenize(self, text):
+        """
+        Returns the list of word piece tokens of the text
+        """
+        key = hashlib.sha1(text.encode("utf-8")).digest()
+        tokens = self._memo.get(key, None)
+        if tokens is not None:
+            self.memo_hits += 1
+            self._memo.move_to_end(key)
+            return list(tokens)
+
+        self.memo_misses += 1
+        tokens = tuple(self._tokenize(text))
+        if self.memo_size > 0:
+            self._memo[key] = tokens
+            if len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+
+        return list(tokens)
+
+    def _tokenize(self, text):
+        if self.bert_tokeniser.do_basic_tokenize:
+            words = self.bert_tokeniser.basic_tokenizer.tokenize(text)
+        else:
+            words = [text]
+
+        if len(self._word_cache) > self.max_word_cache_size:
+            self._word_cache = {}
+
+        tokens = []
+        for word in words:
+            pieces = self._word_cache.get(word, None)
+            if pieces is None:
+                pieces = [p for w in word.split() for p in self._word_pieces(w)]
+                self._word_cache[word] = pieces
+            tokens.extend(pieces)
+
+        return tokens
+
+    def _word_pieces(self, word):
+        if len(word) > self.max_input_chars_per_word:
+            return [self.unk_token]
+
+        pieces = []
+        trie = self._start_trie
+        start = 0
+        while start < len(word):
+            # The longest vocab entry that matches from start
+            node = trie
+            end = None
+            for i in range(start, len(word)):
+                node = node.get(word[i], None)
+                if node is None:
+                    break
+                if _END in node:
+                    end = i + 1
+
+            if end is None:
+                return [self.unk_token]
+
+            pieces.append(word[start:end] if start == 0 else "##" + word[start:end])
+            trie = self._continuation_trie
+            start = end
+
+        return pieces
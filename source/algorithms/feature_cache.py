@@ -0,0 +1,187 @@
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy as np
+import torch
+
+"""
+Content addressed on disk cache of the batches returned by DataPipeline.transform
+"""
+
+
+class FeatureCache:
+
+    def __init__(self, cache_dir):
+        """
+Caches the transformed features of a dataset, so that runs over the same input with the same pipeline skip the
+preprocessing. The key is the hash of the input file, the dataset row transformer and the pickled data pipeline steps.
+Each feature column is stored as an int64 .npy file, the dtype of the word indices the embeddings take, that is memory
+mapped when loaded so that a batch is read without a copy.
+        :param cache_dir: The directory to store the cached features in
+        """
+        self.cache_dir = cache_dir
+
+    @property
+    def logger(self):
+        return logging.getLogger(__name__)
+
+    def __call__(self, dataset, data_pipeline, transform_func, order=None):
+        """
+        Returns the cached batches for the dataset, else runs transform_func and caches the result
+        :param dataset: The dataset that is transformed, must have the file_path it was loaded from to be cached
+        :param data_pipeline: The fitted data pipeline
+        :param transform_func: Function that returns the transformed batches when there is no cache entry
+        :param order: The indices of the records in the order they are batched, when it is not the dataset order
+        """
+        key = self.get_key(dataset, data_pipeline, order=order)
+        if key is None:
+            self.logger.info("Not caching features as the dataset was not loaded from a file")
+            return transform_func()
+
+        path = os.path.join(self.cache_dir, key)
+        if os.path.isdir(path):
+            self.logger.info("Loading cached features from {}".format(path))
+            return CachedBatches(path)
+
+        batches = transform_func()
+        self.save(batches, path)
+        self.logger.info("Cached features in {}".format(path))
+        return batches
+
+    def get_key(self, dataset, data_pipeline, order=None):
+        file_path = getattr(dataset, "file_path", None)
+        if not isinstance(file_path, str):
+            return None
+
+        key_hash = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                key_hash.update(chunk)
+
+        # Filters and row transformers of the dataset also change the features
+        key_hash.update(type(dataset).__name__.encode("utf-8"))
+        key_hash.update(str(len(dataset)).encode("utf-8"))
+        key_hash.update(pickle.dumps(getattr(dataset, "transformer", None)))
+        key_hash.update(self._get_pipeline_state(data_pipeline))
+        if order is not None:
+            key_hash.update(np.asarray(order, dtype=np.int64).tobytes())
+
+        return key_hash.hexdigest()
+
+    @staticmethod
+    def _get_pipeline_state(data_pipeline):
+        """
+        Returns the pickled data pipeline without the runtime_attributes of its steps, such as the number of worker
+        processes, which do not change the features
+        """
+        if not hasattr(data_pipeline, "processing_steps"):
+            return pickle.dumps(data_pipeline)
+
+        steps = []
+        for name, step in data_pipeline.preprocess_steps + data_pipeline.processing_steps:
+            state = step.__getstate__() if hasattr(step, "__getstate__") else step.__dict__
+            runtime_attributes = getattr(step, "runtime_attributes", [])
+            steps.append((name, type(step).__name__,
+                          {k: v for k, v in (state or {}).items() if k not in runtime_attributes}))
+        return pickle.dumps(steps)
+
+    def save(self, batches, path):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        # Write to a temp dir first so that a partially written entry is never read
+        tmp_path = tempfile.mkdtemp(dir=self.cache_dir)
+        try:
+            self._write(batches, tmp_path)
+            os.rename(tmp_path, path)
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            # Another run has cached the same features in the meantime
+            if not os.path.isdir(path):
+                raise
+
+    @staticmethod
+    def _write(batches, path):
+        batch_sizes = []
+        batch_widths = []
+        labels = []
+        is_feature_list = True
+        for b_x, b_y in batches:
+            is_feature_list = isinstance(b_x, (list, tuple))
+            features = b_x if is_feature_list else [b_x]
+            batch_sizes.append(len(features[0]))
+            # Batches padded to their longest sequence have a different width per batch
+            batch_widths.append([tuple(f.shape[1:]) for f in features])
+            labels.append(b_y)
+
+        total_rows = sum(batch_sizes)
+
+        # Fill one preallocated file per column, so the features are not copied again in memory
+        columns = []
+        if len(batches) > 0:
+            for c in range(len(batch_widths[0])):
+                column_shape = tuple(int(d) for d in np.max([w[c] for w in batch_widths], axis=0))
+                column_file = os.path.join(path, "feature_{}.npy".format(c))
+                columns.append(
+                    np.lib.format.open_memmap(column_file, mode="w+", dtype=np.int64,
+                                              shape=(total_rows,) + column_shape))
+
+        start = 0
+        for (b_x, _), size in zip(batches, batch_sizes):
+            features = b_x if is_feature_list else [b_x]
+            for column, f in zip(columns, features):
+                f = np.asarray(f)
+                column[(slice(start, start + size),) + tuple(slice(0, d) for d in f.shape[1:])] = f
+            start += size
+
+        for column in columns:
+            column.flush()
+
+        np.save(os.path.join(path, "batch_sizes.npy"), np.asarray(batch_sizes, dtype=np.int64))
+        with open(os.path.join(path, "meta.pb"), "wb") as f:
+            pickle.dump({"labels": labels, "num_columns": len(columns), "is_feature_list": is_feature_list,
+                         "batch_widths": batch_widths}, f)
+
+
+class CachedBatches:
+    """
+    List like view of the batches in a FeatureCache entry. The features are memory mapped and the tensors of a batch
+    share the memory of the mapped files
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.pb"), "rb") as f:
+            meta = pickle.load(f)
+
+        self._labels = meta["labels"]
+        self._is_feature_list = meta["is_feature_list"]
+        self._batch_widths = meta["batch_widths"]
+        # Copy on write, so the tensors are writable without changing the files
+        self._columns = [np.load(os.path.join(path, "feature_{}.npy".format(c)), mmap_mode="c")
+                         for c in range(meta["num_columns"])]
+
+        batch_sizes = np.load(os.path.join(path, "batch_sizes.npy"))
+        self._offsets = np.concatenate([[0], np.cumsum(batch_sizes)])
+
+    def __len__(self):
+        return len(self._labels)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Batch index {} out of range".format(index))
+
+        start, end = self._offsets[index], self._offsets[index + 1]
+        features = [torch.from_numpy(c[(slice(start, end),) + tuple(slice(0, d) for d in w)])
+                    for c, w in zip(self._columns, self._batch_widths[index])]
+        b_x = features if self._is_feature_list else features[0]
+
+        return [b_x, self._labels[index]]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
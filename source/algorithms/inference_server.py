@@ -0,0 +1,348 @@
+import argparse
+import glob
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from io import StringIO
+from socketserver import ThreadingMixIn
+
+import numpy as np
+
+from algorithms.BertTrainInferencePipeline import BertTrainInferencePipeline
+from algorithms.TrainInferencePipeline import TrainInferencePipeline
+from algorithms.dataset_factory import DatasetFactory
+
+"""
+Long running HTTP/JSON inference service. The models are loaded once and concurrent requests are combined into
+micro batches.
+
+POST /predict with a json record, or a list of records, in the same format as the dataset json file
+GET /stats returns the p50 / p99 latency and throughput
+GET /ping returns 200 when the service is up
+"""
+
+
+class _PendingRequest:
+
+    def __init__(self, records):
+        self.records = records
+        self.arrival_time = time.monotonic()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+
+    def __init__(self, predict_func, max_batch_size=32, max_latency_ms=20, max_latency_samples=10000,
+                 request_timeout_s=60):
+        """
+Combines the records of concurrent requests into a single call to predict_func. A batch is run once it has
+max_batch_size records, or when the oldest request in the batch has waited max_latency_ms. When a batch of several
+requests fails, each request is run on its own, so that a bad record only fails its own request.
+        :param predict_func: Function that takes a list of records and returns a tuple (predictions, confidence_scores)
+        :param max_batch_size: The max number of records in a batch, a single larger request is run as is
+        :param max_latency_ms: The max time to wait for more requests, after the first request of a batch arrives
+        :param max_latency_samples: The number of most recent request latencies used to compute the percentiles
+        :param request_timeout_s: The max time a request waits for its predictions, before a TimeoutError is raised
+        """
+        self.request_timeout_s = request_timeout_s
+        self.predict_func = predict_func
+        self.max_batch_size = max_batch_size
+        self.max_latency_ms = max_latency_ms
+
+        self._queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = None
+
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=max_latency_samples)
+        self._total_requests = 0
+        self._total_records = 0
+        self._total_batches = 0
+        self._start_time = time.monotonic()
+
+    @property
+    def logger(self):
+        return logging.getLogger(__name__)
+
+    def start(self):
+        self._stopped.clear()
+        self._start_time = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __call__(self, records):
+        """
+        Blocks until the records have been predicted, or raises a TimeoutError after request_timeout_s
+        :param records: list of records
+        :return: list of (prediction, confidence_scores) for each record
+        """
+        request = _PendingRequest(records)
+        self._queue.put(request)
+        if not request.done.wait(timeout=self.request_timeout_s):
+            raise TimeoutError("The records were not predicted within {} seconds".format(self.request_timeout_s))
+
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def stats(self):
+        with self._stats_lock:
+            latencies = list(self._latencies)
+            elapsed = time.monotonic() - self._start_time
+            result = {"requests": self._total_requests,
+                      "records": self._total_records,
+                      "batches": self._total_batches,
+                      "requests_per_second": self._total_requests / elapsed if elapsed > 0 else 0.0,
+                      "records_per_second": self._total_records / elapsed if elapsed > 0 else 0.0}
+
+        if len(latencies) > 0:
+            p50, p99 = np.percentile(latencies, [50, 99])
+            result["latency_p50_ms"] = float(p50) * 1000
+            result["latency_p99_ms"] = float(p99) * 1000
+
+        return result
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                first = self._queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            batch = [first]
+            try:
+                num_records = len(first.records)
+                deadline = first.arrival_time + self.max_latency_ms / 1000.0
+
+                # Keep adding requests until the batch is full or the first request has waited long enough
+                while num_records < self.max_batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        request = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    batch.append(request)
+                    num_records += len(request.records)
+
+                self._run_batch(batch)
+            except Exception as e:
+                # Fail the requests of this batch only, the loop keeps serving the next requests
+                self.logger.exception("Failed to run a batch of {} requests".format(len(batch)))
+                for request in batch:
+                    if not request.done.is_set():
+                        request.error = e
+                        request.done.set()
+
+    def _run_batch(self, batch):
+        records = [r for request in batch for r in request.records]
+        self.logger.debug("Running batch of {} requests with {} records".format(len(batch), len(records)))
+
+        try:
+            self._predict(batch, records)
+        except Exception as e:
+            self.logger.exception("Prediction failed for a batch of {} records".format(len(records)))
+            if len(batch) == 1:
+                batch[0].error = e
+            else:
+                # Run the requests one by one, so that only the requests with a bad record fail
+                for request in batch:
+                    try:
+                        self._predict([request], request.records)
+                    except Exception as request_error:
+                        request.error = request_error
+
+        end_time = time.monotonic()
+        with self._stats_lock:
+            self._total_batches += 1
+            for request in batch:
+                self._latencies.append(end_time - request.arrival_time)
+                self._total_requests += 1
+                self._total_records += len(request.records)
+
+        for request in batch:
+            request.done.set()
+
+    def _predict(self, batch, records):
+        predictions, confidence_scores = self.predict_func(records)
+        results = list(zip(predictions, confidence_scores))
+
+        start = 0
+        for request in batch:
+            request.result = results[start: start + len(request.records)]
+            start += len(request.records)
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class InferenceServer:
+
+    def __init__(self, predict_func, host="127.0.0.1", port=8080, max_batch_size=32, max_latency_ms=20,
+                 request_timeout_s=60):
+        """
+        :param predict_func: Function that takes a list of records and returns a tuple (predictions, confidence_scores)
+        :param request_timeout_s: The max time a request waits for its predictions, before a 503 is returned
+        """
+        self.batcher = MicroBatcher(predict_func, max_batch_size=max_batch_size, max_latency_ms=max_latency_ms,
+                                    request_timeout_s=request_timeout_s)
+        self._httpd = _ThreadingHTTPServer((host, port), self._get_handler_class())
+
+    @property
+    def logger(self):
+        return logging.getLogger(__name__)
+
+    @property
+    def server_address(self):
+        return self._httpd.server_address
+
+    @staticmethod
+    def load_predict_func(dataset_factory_name, artifacts_dir, is_bert=False, cpu_workers=1):
+        """
+        Loads the models in artifacts_dir once, and returns a function that predicts a list of records
+        :param dataset_factory_name: The name of the dataset factory used to read the records
+        :param artifacts_dir: The model artifacts dir, or the base dir of the ensemble of model artifacts dirs
+        :param is_bert: Load the model with BertTrainInferencePipeline
+        :param cpu_workers: On cpu, the number of processes to run the ensemble models in parallel
+        """
+        if is_bert:
+            predictor = BertTrainInferencePipeline.load(artifacts_dir)
+        else:
+            if len(glob.glob(os.path.join(artifacts_dir, "*model.pt"))) > 0:
+                ensemble_artifacts_dirs = [artifacts_dir]
+            else:
+                ensemble_artifacts_dirs = [d for d in glob.glob(os.path.join(artifacts_dir, "*")) if
+                                           os.path.isdir(d)]
+            predictor = TrainInferencePipeline.load_ensemble(ensemble_artifacts_dirs, cpu_workers=cpu_workers)
+
+        dataset_factory = DatasetFactory().get_datasetfactory(dataset_factory_name)
+
+        def predict(records):
+            dataset = dataset_factory.get_dataset(StringIO(json.dumps(records)))
+            return predictor(dataset)
+
+        return predict
+
+    def serve_forever(self):
+        self.batcher.start()
+        self.logger.info("Serving on {}".format(self.server_address))
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self.batcher.stop()
+
+    def shutdown(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _get_handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path == "/ping":
+                    self._send_json(200, {"status": "ok"})
+                elif self.path == "/stats":
+                    self._send_json(200, server.batcher.stats())
+                else:
+                    self._send_json(404, {"error": "Unknown path {}".format(self.path)})
+
+            def do_POST(self):
+                if self.path != "/predict":
+                    self._send_json(404, {"error": "Unknown path {}".format(self.path)})
+                    return
+
+                try:
+                    body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8"))
+                except ValueError as e:
+                    self._send_json(400, {"error": "Invalid json {}".format(e)})
+                    return
+
+                # Only a record, or a non empty list of records, is predicted
+                is_single_record = isinstance(body, dict)
+                records = [body] if is_single_record else body
+                if not isinstance(records, list) or len(records) == 0 \
+                        or not all(isinstance(r, dict) for r in records):
+                    self._send_json(400, {"error": "Expecting a json record or a non empty list of records"})
+                    return
+
+                try:
+                    results = server.batcher(records)
+                except TimeoutError as e:
+                    self._send_json(503, {"error": str(e)})
+                    return
+                except Exception as e:
+                    self._send_json(500, {"error": str(e)})
+                    return
+
+                response = [{"predicted": _to_json_value(p),
+                             "confidence_scores": {str(_to_json_value(k)): float(v) for k, v in s.items()}}
+                            for p, s in results]
+                self._send_json(200, response[0] if is_single_record else response)
+
+            def _send_json(self, status, value):
+                body = json.dumps(value).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                server.logger.debug(format % args)
+
+        return Handler
+
+
+def _to_json_value(value):
+    # Labels decoded by the label pipeline can be numpy types
+    return value.item() if isinstance(value, np.generic) else value
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("dataset", help="The dataset type", choices=DatasetFactory().dataset_factory_names)
+    parser.add_argument("artefactsdir", help="The base of artefacts dir that contains directories of model, vocab etc")
+
+    parser.add_argument("--host", help="The host to listen on", default="127.0.0.1")
+    parser.add_argument("--port", help="The port to listen on", type=int, default=8080)
+    parser.add_argument("--max-batch-size", help="The max number of records in a micro batch", type=int, default=32)
+    parser.add_argument("--max-latency-ms", help="The max time a request waits for the micro batch to fill",
+                        type=float, default=20)
+    parser.add_argument("--request-timeout-s", help="The max time a request waits for its predictions", type=float,
+                        default=60)
+    parser.add_argument("--cpu-workers",
+                        help="On cpu, the number of processes to run the ensemble models in parallel", type=int,
+                        default=1)
+    parser.add_argument("--bert", help="The artefacts are from the bert pipeline", action="store_true")
+    parser.add_argument("--log-level", help="Log level", default="INFO", choices={"INFO", "WARN", "DEBUG", "ERROR"})
+
+    args = parser.parse_args()
+
+    print(args.__dict__)
+
+    # Set up logging
+    logging.basicConfig(level=logging.getLevelName(args.log_level), handlers=[logging.StreamHandler(sys.stdout)],
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    predict_func = InferenceServer.load_predict_func(args.dataset, args.artefactsdir, is_bert=args.bert,
+                                                     cpu_workers=args.cpu_workers)
+    InferenceServer(predict_func, host=args.host, port=args.port, max_batch_size=args.max_batch_size,
+                    max_latency_ms=args.max_latency_ms, request_timeout_s=args.request_timeout_s).serve_forever()
@@ -6,23 +6,67 @@ import sys
 
 from algorithms.InferencePipeline import InferencePipeline
 from algorithms.dataset_factory import DatasetFactory
+from datasets.ppi_multitype_dataset_factory import PpiMultiTypeDatasetFactory
 
 
-def run(dataset_name, datajson, artefactsbase_dir, outdir, positives_filter_threshold):
+def run(dataset_name, datajson, artefactsbase_dir, outdir, positives_filter_threshold, feature_cache_dir=None,
+        cpu_workers=1, chunk_size=None, length_bucketing=False, group_by_abstract=False, all_interaction_types=False):
     logger = logging.getLogger(__name__)
     if os.path.isdir(datajson):
-        for data_file in glob.glob("{}/*.json".format(datajson)):
+        data_files = glob.glob("{}/*.json".format(datajson))
+        if chunk_size is not None:
+            data_files += glob.glob("{}/*.jsonl".format(datajson))
+
+        for data_file in data_files:
             logger.info("Running prediction for {}".format(data_file))
 
-            run_file(dataset_name, data_file, artefactsbase_dir, outdir, positives_filter_threshold)
+            run_file(dataset_name, data_file, artefactsbase_dir, outdir, positives_filter_threshold,
+                     feature_cache_dir, cpu_workers, chunk_size, length_bucketing, group_by_abstract,
+                     all_interaction_types)
     else:
-        run_file(dataset_name, datajson, artefactsbase_dir, outdir, positives_filter_threshold)
-
+        run_file(dataset_name, datajson, artefactsbase_dir, outdir, positives_filter_threshold, feature_cache_dir,
+                 cpu_workers, chunk_size, length_bucketing, group_by_abstract, all_interaction_types)
+
+
+def run_file(dataset_name, datajson, artefactsbase_dir, outdir, positives_filter_threshold, feature_cache_dir=None,
+             cpu_workers=1, chunk_size=None, length_bucketing=False, group_by_abstract=False,
+             all_interaction_types=False):
+    if all_interaction_types:
+        if dataset_name != PpiMultiTypeDatasetFactory.__name__:
+            raise ValueError("The interaction types of all the pairs can only be predicted with the dataset {}, "
+                             "found {}".format(PpiMultiTypeDatasetFactory.__name__, dataset_name))
+        if chunk_size is not None:
+            raise ValueError("The interaction types of all the pairs can not be predicted a chunk at a time")
+
+        # A record per abstract and gene pair, scored for every interaction type by the model head of each type
+        dataset_factory = DatasetFactory().get_datasetfactory(dataset_name, materialise=not group_by_abstract,
+                                                              all_types=True)
+        dataset = dataset_factory.get_dataset(datajson)
+        InferencePipeline().run_interaction_types(dataset, datajson, artefactsbase_dir, outdir,
+                                                  positives_filter_threshold, feature_cache_dir=feature_cache_dir,
+                                                  length_bucketing=length_bucketing,
+                                                  group_by_abstract=group_by_abstract)
+        return
+
+    # The abstract indexer masks the rows itself, so they are not masked by the dataset
+    dataset_factory = DatasetFactory().get_datasetfactory(dataset_name, materialise=not group_by_abstract)
+
+    if chunk_size is not None:
+        if feature_cache_dir is not None:
+            # The cache is keyed by the input file, a chunk has none
+            raise ValueError("The features of a file predicted a chunk at a time can not be cached, do not set both "
+                             "chunk_size and feature_cache_dir")
+
+        # The file is in json lines format, predict it a chunk at a time
+        InferencePipeline().run_streaming(dataset_factory, datajson, artefactsbase_dir, outdir,
+                                          positives_filter_threshold, chunk_size=chunk_size, cpu_workers=cpu_workers,
+                                          length_bucketing=length_bucketing, group_by_abstract=group_by_abstract)
+        return
 
-def run_file(dataset_name, datajson, artefactsbase_dir, outdir, positives_filter_threshold):
-    dataset_factory = DatasetFactory().get_datasetfactory(dataset_name)
     dataset = dataset_factory.get_dataset(datajson)
-    InferencePipeline().run(dataset, datajson, artefactsbase_dir, outdir, positives_filter_threshold)
+    InferencePipeline().run(dataset, datajson, artefactsbase_dir, outdir, positives_filter_threshold,
+                            feature_cache_dir=feature_cache_dir, cpu_workers=cpu_workers,
+                            length_bucketing=length_bucketing, group_by_abstract=group_by_abstract)
 
 
 if "__main__" == __name__:
@@ -39,6 +83,25 @@ if "__main__" == __name__:
     parser.add_argument("--log-level", help="Log level", default="INFO", choices={"INFO", "WARN", "DEBUG", "ERROR"})
     parser.add_argument("--positives-filter-threshold", help="The threshold to filter positives", type=float,
                         default=0.0)
+    parser.add_argument("--feature-cache-dir",
+                        help="Optional dir to cache the transformed features in, so repeated runs skip preprocessing",
+                        default=None)
+    parser.add_argument("--cpu-workers",
+                        help="On cpu, the number of processes to run the ensemble models in parallel", type=int,
+                        default=1)
+    parser.add_argument("--chunk-size",
+                        help="Stream the json lines formatted datajson, predicting this many records at a time",
+                        type=int, default=None)
+    parser.add_argument("--length-bucketing",
+                        help="Batch records of similar length together, the predictions are written in the input order",
+                        action="store_true")
+    parser.add_argument("--group-by-abstract",
+                        help="Split and index each abstract once for all its gene pairs, rather than once per pair",
+                        action="store_true")
+    parser.add_argument("--all-interaction-types",
+                        help="Score every interaction type of each abstract and gene pair, with models that have a "
+                             "head per interaction type and a dataset with all_types, e.g. PpiMultiTypeDatasetFactory",
+                        action="store_true")
 
     args = parser.parse_args()
 
@@ -48,4 +111,6 @@ if "__main__" == __name__:
     logging.basicConfig(level=logging.getLevelName(args.log_level), handlers=[logging.StreamHandler(sys.stdout)],
                         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 
-    run(args.dataset, args.datajson, args.artefactsdir, args.outdir, args.positives_filter_threshold)
+    run(args.dataset, args.datajson, args.artefactsdir, args.outdir, args.positives_filter_threshold,
+        args.feature_cache_dir, args.cpu_workers, args.chunk_size, args.length_bucketing, args.group_by_abstract,
+        args.all_interaction_types)
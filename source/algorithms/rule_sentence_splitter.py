@@ -0,0 +1,59 @@
+import logging
+import re
+
+"""
+Rule based sentence splitter for biomedical abstracts, a faster alternative to the spacy parser
+"""
+
+
+class RuleSentenceSplitter:
+    """
+    Splits after a ., ? or ! (and any closing quotes or brackets) that is followed by whitespace and then an upper case
+    letter, digit or opening bracket. There is no split after a known abbreviation such as "et al." or "e.g.", or
+    after an initial such as "J.". Dots inside a word, as in gene names or decimals, are never a split.
+    """
+
+    default_abbreviations = {"al.", "e.g.", "i.e.", "etc.", "vs.", "approx.", "ca.", "cf.", "fig.", "figs.",
+                             "ref.", "refs.", "no.", "nos.", "vol.", "dr.", "prof.", "mr.", "mrs.", "ms.", "st.",
+                             "sp.", "spp.", "var.", "subsp.", "inc.", "ltd.", "co.", "jr.", "sr.", "eq.", "resp.",
+                             "min.", "max.", "wt.", "conc.", "mol.", "exp.", "suppl.", "viz."}
+
+    _boundary = re.compile(r"[.?!][\"')\]]*\s+(?=[A-Z0-9(\[\"'])")
+    _initial = re.compile(r"^[A-Z]\.$")
+
+    def __init__(self, abbreviations=None):
+        """
+        :param abbreviations: Lower case words, including the trailing dot, that do not end a sentence
+        """
+        self.abbreviations = set(abbreviations or self.default_abbreviations)
+
+    @property
+    def logger(self):
+        return logging.getLogger(__name__)
+
+    def __call__(self, text):
+        """
+        Returns the list of sentences in the text
+        """
+        sentences = []
+        start = 0
+        for m in self._boundary.finditer(text):
+            punctuation_end = m.start() + 1
+            last_word = text[start:punctuation_end].rsplit(None, 1)[-1]
+            if self._is_abbreviation(last_word):
+                continue
+
+            sentence = text[start:m.end()].strip()
+            if len(sentence) > 0:
+                sentences.append(sentence)
+            start = m.end()
+
+        sentence = text[start:].strip()
+        if len(sentence) > 0:
+            sentences.append(sentence)
+
+        return sentences
+
+    def _is_abbreviation(self, word):
+        word = word.lstrip("([\"'")
+        return word.lower() in self.abbreviations or self._initial.match(word) is not None
@@ -0,0 +1,108 @@
+import logging
+import numbers
+from collections import Counter
+from multiprocessing import Pool
+
+from sklearn.feature_extraction.text import CountVectorizer
+
+"""
+Builds the vocab of the text columns from the document frequency of each word, without holding the texts in memory
+"""
+
+
+def _count_document_frequency(args):
+    texts, case_insensitive = args
+    analyser = CountVectorizer(lowercase=case_insensitive).build_analyzer()
+
+    counts = Counter()
+    for t in texts:
+        # dict.fromkeys keeps the first occurrence order of the words, so that the merged vocab order matches
+        counts.update(dict.fromkeys(analyser(t)).keys())
+    return counts
+
+
+class StreamingVocabBuilder:
+    """
+    Counts the number of texts (documents) that contain each word, tokenised and lower cased the same way as
+    CountVectorizer. The texts are read from the data loader in shards of shard_size texts, each shard is counted into
+    a Counter by one of num_workers processes and the counters are merged in shard order. Only the counters, and at
+    most num_workers * 2 shards, are held in memory.
+
+    Returns the same words, in the same order, as CountVectorizer(lowercase=case_insensitive, min_df=min_doc_frequency)
+    .vocabulary_
+    """
+
+    def __init__(self, case_insensitive=True, min_doc_frequency=1, num_workers=1, shard_size=10000):
+        """
+        :param min_doc_frequency: The min number of texts a word must occur in, or as a float the min proportion
+        :param num_workers: The number of processes that count the shards
+        :param shard_size: The number of texts counted in a single task
+        """
+        self.shard_size = shard_size
+        self.num_workers = num_workers
+        self.min_doc_frequency = min_doc_frequency
+        self.case_insensitive = case_insensitive
+
+    @property
+    def logger(self):
+        return logging.getLogger(__name__)
+
+    def __call__(self, data_loader):
+        """
+        Returns the list of words in data_loader that occur in at least min_doc_frequency texts, in the order they are
+        first seen. Every column of each batch b_x is a list of texts.
+        """
+        doc_frequency = Counter()
+        n_docs = 0
+
+        if self.num_workers > 1:
+            with Pool(self.num_workers) as pool:
+                for shards in self._iter_shard_windows(data_loader, self.num_workers * 2):
+                    n_docs += sum([len(s) for s in shards])
+                    for counts in pool.map(_count_document_frequency,
+                                           [(s, self.case_insensitive) for s in shards]):
+                        doc_frequency.update(counts)
+        else:
+            for shards in self._iter_shard_windows(data_loader, 1):
+                n_docs += len(shards[0])
+                doc_frequency.update(_count_document_frequency((shards[0], self.case_insensitive)))
+
+        if len(doc_frequency) == 0:
+            raise ValueError("empty vocabulary; perhaps the documents only contain stop words")
+
+        if isinstance(self.min_doc_frequency, numbers.Integral):
+            min_count = self.min_doc_frequency
+        else:
+            min_count = self.min_doc_frequency * n_docs
+
+        vocab = [w for w, c in doc_frequency.items() if c >= min_count]
+
+        if len(vocab) == 0:
+            raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+
+        self.logger.info("Counted {} words in {} texts, {} words occur in at least {} texts".format(
+            len(doc_frequency), n_docs, len(vocab), self.min_doc_frequency))
+
+        return vocab
+
+    def _iter_shard_windows(self, data_loader, window_size):
+        # Yields lists of window_size shards, each shard a list of shard_size texts
+        shards = []
+        shard = []
+        for b in data_loader:
+            for c in b[0]:
+                shard.extend(c)
+
+            while len(shard) >= self.shard_size:
+                shards.append(shard[0:self.shard_size])
+                shard = shard[self.shard_size:]
+
+                if len(shards) == window_size:
+                    yield shards
+                    shards = []
+
+        if len(shard) > 0:
+            shards.append(shard)
+
+        if len(shards) > 0:
+            yield shards
@@ -24,6 +24,10 @@ class TransformBertTextTokenToIndex:
     def construct_vocab_dict(self, data_loader):
         return self.tokeniser.vocab
 
+    @staticmethod
+    def pad_token():
+        return "[PAD]"
+
     @property
     def vocab_dict(self):
         return self.tokeniser.vocab
@@ -38,10 +42,16 @@ class TransformBertTextTokenToIndex:
         pass
 
     def transform(self, x):
+        return list(self.iter_transform(x))
+
+    def iter_transform(self, x):
+        """
+        Lazily transforms each batch as it is read from x
+        """
         self.logger.info("Transforming TransformBertTextTokenToIndex")
         id_converter = self.tokeniser.convert_tokens_to_ids
+        pad_id = self.tokeniser.vocab[self.pad_token()]
 
-        batches = []
         for idx, b in enumerate(x):
             b_x = b[0]
             b_y = b[1]
@@ -51,12 +61,16 @@ class TransformBertTextTokenToIndex:
             for _, r in enumerate(text_col):
                 tokens = id_converter(r)
                 rows.append(tokens)
-            col = torch.Tensor(rows).long()
 
-            batches.append([col, b_y])
+            # Pad to the longest row in the batch, rows that are already padded to a fixed length are left as is
+            max_len = max([len(r) for r in rows])
+            col = torch.full((len(rows), max_len), pad_id, dtype=torch.long)
+            for r_index, r in enumerate(rows):
+                col[r_index, :len(r)] = torch.tensor(r, dtype=torch.long)
+
+            yield [col, b_y]
 
         self.logger.info("Completed TransformBertTextTokenToIndex")
-        return batches
 
     def fit_transform(self, data_loader):
         self.fit(data_loader)
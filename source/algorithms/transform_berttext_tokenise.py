@@ -2,13 +2,21 @@ import logging
 
 from pytorch_pretrained_bert import BertTokenizer
 
+from algorithms.fast_wordpiece_tokenizer import FastWordpieceTokenizer
+
 
 class TransformBertTextTokenise:
     """
     Extracts vocab from data frame columns which have already been tokenised into words
     """
 
-    def __init__(self, bert_model_dir, max_feature_lens, case_insensitive=False):
+    def __init__(self, bert_model_dir, max_feature_lens, case_insensitive=False, dynamic_padding=False):
+        """
+        :param max_feature_lens: The max number of tokens, including [CLS] and [SEP], of each column
+        :param dynamic_padding: Do not pad the rows to max_feature_lens. The rows are [CLS] tokens [SEP] and are padded
+        to the longest row of the batch when converted to ids
+        """
+        self.dynamic_padding = dynamic_padding
         self.max_feature_lens = max_feature_lens
         self.case_insensitive = case_insensitive
 
@@ -23,6 +31,18 @@ class TransformBertTextTokenise:
     def construct_vocab_dict(self, data_loader):
         return self.tokeniser.vocab
 
+    @property
+    def fast_tokeniser(self):
+        # Built on first use and not pickled, so that the pickled pipeline does not change with the memo
+        if getattr(self, "_fast_tokeniser", None) is None:
+            self._fast_tokeniser = FastWordpieceTokenizer(self.tokeniser)
+        return self._fast_tokeniser
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_fast_tokeniser", None)
+        return state
+
     @staticmethod
     def pad_token():
         return "[PAD]"
@@ -48,11 +68,19 @@ class TransformBertTextTokenise:
         pass
 
     def transform(self, x):
+        return list(self.iter_transform(x))
+
+    def iter_transform(self, x):
+        """
+        Lazily transforms each batch as it is read from x
+        """
         self.logger.info("Transforming TransformBertTextTokenise")
         pad = self.pad_token()
-        tokeniser = self.tokeniser.tokenize
+        fast_tokeniser = self.fast_tokeniser
+        tokeniser = fast_tokeniser.tokenize
+        # Pipelines pickled before dynamic padding was added do not have the attribute
+        dynamic_padding = getattr(self, "dynamic_padding", False)
 
-        batches = []
         unknown_tokens = 0
         for idx, b in enumerate(x):
             b_x = b[0]
@@ -65,15 +93,19 @@ class TransformBertTextTokenise:
                     all_tokens = tokeniser(r)
                     sized_tokens = all_tokens[0:max - 2]
                     unknown_tokens += sum([1 for t in sized_tokens if t == self.unk_token()])
-                    sized_tokens = ['[CLS]'] + sized_tokens + [pad] * (max - 2 - len(sized_tokens)) + ['[SEP]']
+                    if dynamic_padding:
+                        sized_tokens = ['[CLS]'] + sized_tokens + ['[SEP]']
+                    else:
+                        sized_tokens = ['[CLS]'] + sized_tokens + [pad] * (max - 2 - len(sized_tokens)) + ['[SEP]']
                     row.append(sized_tokens)
                 col.append(row)
 
-            batches.append([col, b_y])
+            yield [col, b_y]
         self.logger.info("Unknown tokens count {}".format(unknown_tokens))
+        self.logger.info("Tokenised {} distinct texts, {} repeated texts were memoized".format(
+            fast_tokeniser.memo_misses, fast_tokeniser.memo_hits))
 
         self.logger.info("Completed TransformBertTextTokenise")
-        return batches
 
     def fit_transform(self, data_loader):
         self.fit(data_loader)
@@ -0,0 +1,118 @@
+import logging
+
+import torch
+from pytorch_pretrained_bert import BertTokenizer
+
+from algorithms.fast_wordpiece_tokenizer import FastWordpieceTokenizer
+
+
+class TransformBertTextTokeniseToIndex:
+    """
+    Tokenises the text column into WordPiece ids in a single step, same result as TransformBertTextTokenise followed
+    by TransformBertTextTokenToIndex. The ids are written directly into a tensor per batch, without the intermediate
+    lists of token strings.
+    """
+
+    def __init__(self, bert_model_dir, max_feature_lens, case_insensitive=False, text_col_index=0,
+                 dynamic_padding=False):
+        """
+        :param max_feature_lens: The max number of tokens, including [CLS] and [SEP], of each column
+        :param text_col_index: The index of the text column, the other columns are dropped
+        :param dynamic_padding: Pad each batch to its longest row rather than to the max feature length
+        """
+        self.dynamic_padding = dynamic_padding
+        self.text_col_index = text_col_index
+        self.max_feature_lens = max_feature_lens
+        self.case_insensitive = case_insensitive
+
+        self.tokeniser = BertTokenizer.from_pretrained(bert_model_dir, do_lower_case=case_insensitive)
+
+    @property
+    def logger(self):
+        return logging.getLogger(__name__)
+
+    @property
+    def fast_tokeniser(self):
+        # Built on first use and not pickled, so that the pickled pipeline does not change with the memo
+        if getattr(self, "_fast_tokeniser", None) is None:
+            self._fast_tokeniser = FastWordpieceTokenizer(self.tokeniser)
+        return self._fast_tokeniser
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_fast_tokeniser", None)
+        return state
+
+    def construct_vocab_dict(self, data_loader):
+        return self.tokeniser.vocab
+
+    @staticmethod
+    def pad_token():
+        return "[PAD]"
+
+    @staticmethod
+    def unk_token():
+        return "[UNK]"
+
+    @property
+    def vocab_dict(self):
+        return self.tokeniser.vocab
+
+    @vocab_dict.setter
+    def vocab_dict(self, vocab_index):
+        self.logger.warning("Vocab will not be updated...")
+
+    def fit(self, data_loader):
+        # Do Nothing
+        pass
+
+    def transform(self, x):
+        return list(self.iter_transform(x))
+
+    def iter_transform(self, x):
+        """
+        Lazily transforms each batch as it is read from x
+        """
+        self.logger.info("Transforming TransformBertTextTokeniseToIndex")
+        fast_tokeniser = self.fast_tokeniser
+        vocab = self.tokeniser.vocab
+        pad_id = vocab[self.pad_token()]
+        cls_id = vocab["[CLS]"]
+        sep_id = vocab["[SEP]"]
+        unk_id = vocab[self.unk_token()]
+        max_len = self.max_feature_lens[self.text_col_index]
+
+        unknown_tokens = 0
+        for idx, b in enumerate(x):
+            b_x = b[0]
+            b_y = b[1]
+
+            rows = []
+            for r in b_x[self.text_col_index]:
+                ids = [vocab[t] for t in fast_tokeniser.tokenize(r)[0:max_len - 2]]
+                unknown_tokens += ids.count(unk_id)
+                rows.append(ids)
+
+            if self.dynamic_padding:
+                width = max([len(r) for r in rows]) + 2
+            else:
+                width = max_len
+
+            col = torch.full((len(rows), width), pad_id, dtype=torch.long)
+            col[:, 0] = cls_id
+            for r_index, ids in enumerate(rows):
+                col[r_index, 1:len(ids) + 1] = torch.tensor(ids, dtype=torch.long)
+                # With fixed padding [SEP] is the last token, after the padding
+                col[r_index, len(ids) + 1 if self.dynamic_padding else width - 1] = sep_id
+
+            yield [col, b_y]
+
+        self.logger.info("Unknown tokens count {}".format(unknown_tokens))
+        self.logger.info("Tokenised {} distinct texts, {} repeated texts were memoized".format(
+            fast_tokeniser.memo_misses, fast_tokeniser.memo_hits))
+
+        self.logger.info("Completed TransformBertTextTokeniseToIndex")
+
+    def fit_transform(self, data_loader):
+        self.fit(data_loader)
+        return self.transform(data_loader)
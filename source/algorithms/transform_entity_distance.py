@@ -0,0 +1,65 @@
+import logging
+
+import torch
+
+from algorithms.BatchPositionEmbedder import BatchPositionEmbedder
+
+"""
+Computes the distance of each token to the nearest entity once, so the networks only need to look up the position embedding
+"""
+
+
+class TransformEntityDistance:
+
+    def __init__(self, text_column_index, max_distance, entity_markers=None, entity_column_indices=None):
+        """
+Appends one distance feature column per entity to each batch, after the existing feature columns.
+The entities are either fixed token ids (entity_markers) or the token id in an entity column (entity_column_indices).
+        :param text_column_index: The index of the column with the text token ids
+        :param max_distance: The distance is clipped to this value, e.g. the number of position embeddings - 1
+        :param entity_markers: The list of entity token ids, e.g. the ids of PROTEIN1 and PROTEIN2
+        :param entity_column_indices: The list of columns whose first token id is the entity
+        """
+        assert (entity_markers is None) != (entity_column_indices is None), \
+            "Exactly one of entity_markers or entity_column_indices must be set"
+
+        self.text_column_index = text_column_index
+        self.max_distance = max_distance
+        self.entity_markers = entity_markers
+        self.entity_column_indices = entity_column_indices
+
+    @property
+    def logger(self):
+        return logging.getLogger(__name__)
+
+    def fit(self, data_loader):
+        pass
+
+    def transform(self, x):
+        return list(self.iter_transform(x))
+
+    def iter_transform(self, x):
+        """
+        Lazily transforms each batch as it is read from x
+        """
+        self.logger.info("Running TransformEntityDistance")
+        # Only the shape of the embedding matters to compute the distance
+        distance_calculator = BatchPositionEmbedder(embeddings=torch.zeros(self.max_distance + 1, 1))
+
+        for idx, (b_x, b_y) in enumerate(x):
+            text = b_x[self.text_column_index]
+
+            if self.entity_markers is not None:
+                entities = self.entity_markers
+            else:
+                entities = [b_x[c][:, 0] for c in self.entity_column_indices]
+
+            distances = [distance_calculator.distances(text, e) for e in entities]
+
+            yield [list(b_x) + distances, b_y]
+
+        self.logger.info("Completed TransformEntityDistance")
+
+    def fit_transform(self, data_loader):
+        self.fit(data_loader)
+        return self.transform(data_loader)
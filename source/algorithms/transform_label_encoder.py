@@ -39,13 +39,17 @@ class TransformLabelEncoder:
         if not iterable:
             return self._encoder.transform([data_loader])[0]
 
-        batches = []
+        return list(self.iter_transform(data_loader))
+
+    def iter_transform(self, data_loader):
+        """
+        Lazily transforms each batch as it is read from data_loader
+        """
         for idx, b in enumerate(data_loader):
             b_x = b[0]
             b_y = b[1]
             encoded_y = self._encoder.transform(b_y)
-            batches.append([b_x, encoded_y])
-        return batches
+            yield [b_x, encoded_y]
 
     def inverse_transform(self, Y):
         # Check if iterable
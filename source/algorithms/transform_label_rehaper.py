@@ -36,7 +36,12 @@ class TransformLabelReshaper:
             self.logger.info("Loading int {} to tensor {}".format(int(data_loader), tensor))
             return tensor
 
-        batches = []
+        return list(self.iter_transform(data_loader))
+
+    def iter_transform(self, data_loader):
+        """
+        Lazily transforms each batch as it is read from data_loader
+        """
         for idx, b in enumerate(data_loader):
             b_x = b[0]
             b_y = b[1]
@@ -44,8 +49,7 @@ class TransformLabelReshaper:
             assert dim == 1, "Expect a 1 dimensional tensor, but found  {} dimension".format(dim)
             encoded_y = torch.from_numpy(b_y)
 
-            batches.append([b_x, encoded_y])
-        return batches
+            yield [b_x, encoded_y]
 
     def fit_transform(self, data_loader):
         self.fit(data_loader)
@@ -1,15 +1,41 @@
+import hashlib
 import logging
+from collections import OrderedDict
+
 import spacy
 
+from algorithms.rule_sentence_splitter import RuleSentenceSplitter
+
 """
 Replaces the name of the protein in the abstract .
 """
 
+# The sentences of the most recently segmented abstracts, shared by all instances so that an abstract repeated for
+# each pair, and in each fold of a k fold run, is only segmented once
+_sentences_cache = OrderedDict()
+_max_sentences_cache_size = 100000
 
-class TransformSentenceTokenisor:
+# The spacy components that split sentences, the rest of the pipeline is disabled
+_sentence_components = {"parser", "senter", "sentencizer"}
 
-    def __init__(self, text_column_index, eos_token="<EOS>"):
 
+class TransformSentenceTokenisor:
+    # The settings that only change how fast the features are computed, not the features, see FeatureCache
+    runtime_attributes = ["n_process", "batch_size"]
+
+    def __init__(self, text_column_index, eos_token="<EOS>", n_process=1, batch_size=1000,
+                 spacy_model="en_core_web_sm", splitter="spacy"):
+        """
+        :param splitter: "spacy" to split sentences with the spacy parser, or "rule" for the faster RuleSentenceSplitter
+        :param n_process: The number of processes spacy uses to segment the abstracts, more than 1 needs spacy 2.2.2+
+        :param batch_size: The number of abstracts segmented by spacy at a time
+        :param spacy_model: The spacy model used to split sentences
+        """
+        assert splitter in ("spacy", "rule"), "The splitter must be spacy or rule, but found {}".format(splitter)
+        self.splitter = splitter
+        self.spacy_model = spacy_model
+        self.batch_size = batch_size
+        self.n_process = n_process
         self.text_column_index = text_column_index
         self.eos_token = eos_token
         self.sentence_tokenisor = None
@@ -28,35 +54,114 @@ class TransformSentenceTokenisor:
         return self._sentence_tokenisor
 
     def _get_default_tokenisor(self):
-        sentence_tokenisor = spacy.load("en_core_web_sm")
-        return lambda x: [s.text.rstrip(".") for s in sentence_tokenisor(x, ).sents]
+        return lambda x: self._split_sentences([x])[0]
 
     @sentence_tokenisor.setter
     def sentence_tokenisor(self, value):
         self._sentence_tokenisor = value
 
+    @property
+    def nlp(self):
+        # Loaded once, and not pickled
+        if getattr(self, "_nlp", None) is None:
+            nlp = spacy.load(getattr(self, "spacy_model", "en_core_web_sm"))
+            disabled = [p for p in nlp.pipe_names if p not in _sentence_components]
+            nlp.disable_pipes(*disabled)
+            self.logger.info("Loaded spacy with the pipes {}, disabled {}".format(nlp.pipe_names, disabled))
+            self._nlp = nlp
+        return self._nlp
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_nlp", None)
+        return state
+
+    def _split_sentences(self, texts):
+        """
+        Returns the list of sentences of each text, the texts that are not in the cache are segmented by the splitter
+        """
+        splitter = getattr(self, "splitter", "spacy")
+        splitter_name = getattr(self, "spacy_model", "en_core_web_sm") if splitter == "spacy" else splitter
+        keys = [(splitter_name, hashlib.sha1(t.encode("utf-8")).digest()) for t in texts]
+
+        new_texts = OrderedDict()
+        for k, t in zip(keys, texts):
+            if k not in _sentences_cache:
+                new_texts[k] = t
+
+        if len(new_texts) > 0 and splitter == "rule":
+            rule_splitter = RuleSentenceSplitter()
+            for k, t in new_texts.items():
+                _sentences_cache[k] = [s.rstrip(".") for s in rule_splitter(t)]
+
+        elif len(new_texts) > 0:
+            pipe_args = {"batch_size": getattr(self, "batch_size", 1000)}
+            # n_process is only available from spacy 2.2.2
+            n_process = getattr(self, "n_process", 1)
+            if n_process > 1:
+                pipe_args["n_process"] = n_process
+
+            docs = self.nlp.pipe(new_texts.values(), **pipe_args)
+            for k, doc in zip(new_texts.keys(), docs):
+                _sentences_cache[k] = [s.text.rstrip(".") for s in doc.sents]
+
+        result = []
+        for k in keys:
+            _sentences_cache.move_to_end(k)
+            result.append(_sentences_cache[k])
+
+        while len(_sentences_cache) > _max_sentences_cache_size:
+            _sentences_cache.popitem(last=False)
+
+        return result
+
     def transform(self, x):
+        return list(self.iter_transform(x))
+
+    def iter_transform(self, x):
+        """
+        Lazily transforms each batch as it is read from x. With the default spacy tokenisor, batches are read until
+        there are batch_size abstracts, so that spacy segments them together
+        """
         self.logger.info("Running sentence tokenisor ")
         eos = " {} ".format(self.eos_token)
-        batches = []
-        tokenisor = self.sentence_tokenisor
 
-        for idx, (b_x, b_y) in enumerate(x):
+        if self._sentence_tokenisor is None:
+            pending = []
+            pending_texts = 0
+            for b in x:
+                pending.append(b)
+                pending_texts += len(b[0][self.text_column_index])
+                if pending_texts >= getattr(self, "batch_size", 1000):
+                    yield from self._transform_batches(pending, self._split_sentences, eos)
+                    pending = []
+                    pending_texts = 0
+
+            yield from self._transform_batches(pending, self._split_sentences, eos)
+        else:
+            tokenisor = self._sentence_tokenisor
+            for b in x:
+                yield from self._transform_batches([b], lambda texts: [tokenisor(t) for t in texts], eos)
+
+        self.logger.info("Completed  sentence tokenisor ")
 
-            text_column = b_x[self.text_column_index]
+    def _transform_batches(self, batches, split_func, eos):
+        if len(batches) == 0:
+            return
 
-            tokenised_sentences = []
-            for _, t in enumerate(text_column):
-                sentences = tokenisor(t)
-                tokenised_sentences.append(eos.join(sentences))
+        texts = [t for b_x, _ in batches for t in b_x[self.text_column_index]]
+        sentences = split_func(texts)
+
+        start = 0
+        for b_x, b_y in batches:
+            end = start + len(b_x[self.text_column_index])
+            tokenised_sentences = [eos.join(s) for s in sentences[start:end]]
+            start = end
 
             transformed_b_x = b_x
             transformed_b_x[self.text_column_index] = tokenised_sentences
 
-            batches.append([transformed_b_x, b_y])
-        self.logger.info("Completed  sentence tokenisor ")
-
-        return batches
+            yield [transformed_b_x, b_y]
 
     def fit_transform(self, data_loader):
         self.fit(data_loader)
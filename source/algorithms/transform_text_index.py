@@ -1,17 +1,67 @@
 import logging
+import re
+from collections import deque
+from multiprocessing import Pool
 
+import numpy as np
 import torch
-from sklearn.feature_extraction.text import CountVectorizer
+
+from algorithms.streaming_vocab_builder import StreamingVocabBuilder
 
 """
 Extracts vocab from data frame columns which have already been tokenised into words
 """
 
+# The CountVectorizer default token pattern
+_token_pattern = re.compile(r"(?u)\b\w\w+\b")
+
+# The arguments of _index_batch, set once in each worker process of the pool
+_worker_args = None
+
+
+def _init_worker(*args):
+    global _worker_args
+    _worker_args = args
+
+
+def _index_batch_in_worker(b_x):
+    return _index_batch(b_x, *_worker_args)
+
+
+def _index_batch(b_x, vocab_dict, max_feature_lens, case_insensitive, pad_index, unknown_index):
+    """
+    Returns a preallocated int64 array of word indices, padded to the max feature length, for each column of b_x and
+    the number of unknown words
+    """
+    result = []
+    unknown_words_count = 0
+    for c_index, c in enumerate(b_x):
+        max_len = max_feature_lens[c_index]
+        col = np.full((len(c), max_len), pad_index, dtype=np.int64)
+        for r_index, r in enumerate(c):
+            words = _token_pattern.findall(r)[0:max_len]
+            if case_insensitive:
+                words = [w.lower() for w in words]
+            indices = [vocab_dict.get(w, unknown_index) for w in words]
+            col[r_index, 0:len(indices)] = indices
+            unknown_words_count += indices.count(unknown_index)
+        result.append(col)
+
+    return result, unknown_words_count
+
 
 class TransformTextToIndex:
+    # The settings that only change how fast the features are computed, not the features, see FeatureCache
+    runtime_attributes = ["vocab_workers", "index_workers"]
 
     def __init__(self, max_feature_lens, min_vocab_doc_frequency=5, case_insensitive=True, vocab_dict=None,
-                 special_words=None, use_dataset_vocab=True):
+                 special_words=None, use_dataset_vocab=True, vocab_workers=1, index_workers=1):
+        """
+        :param vocab_workers: The number of processes that count the word document frequencies to build the vocab
+        :param index_workers: The number of processes that convert the batches of text into word indices
+        """
+        self.index_workers = index_workers
+        self.vocab_workers = vocab_workers
         self.use_dataset_vocab = use_dataset_vocab
         self.case_insensitive = case_insensitive
         self.special_words = special_words or []
@@ -30,7 +80,8 @@ class TransformTextToIndex:
         if self.use_dataset_vocab:
             vocab = self._get_vocab_dict(data_loader, self.get_specialwords_dict(),
                                          case_insensitive=self.case_insensitive,
-                                         min_vocab_doc_frequency=self.min_vocab_doc_frequency)
+                                         min_vocab_doc_frequency=self.min_vocab_doc_frequency,
+                                         num_workers=getattr(self, "vocab_workers", 1))
         else:
             vocab = self.get_specialwords_dict()
 
@@ -79,73 +130,71 @@ class TransformTextToIndex:
     def fit(self, data_loader):
         if self._vocab_dict is None or len(self._vocab_dict) == 0:
             self._vocab_dict = self._get_vocab_dict(data_loader, self.get_specialwords_dict(), self.case_insensitive,
-                                                    self.min_vocab_doc_frequency)
+                                                    self.min_vocab_doc_frequency,
+                                                    num_workers=getattr(self, "vocab_workers", 1))
 
     @staticmethod
-    def _get_vocab_dict(data_loader, special_words_dict, case_insensitive, min_vocab_doc_frequency):
-        count_vectoriser = CountVectorizer(lowercase=case_insensitive, min_df=min_vocab_doc_frequency)
-        f = lambda x: x
-        if case_insensitive:
-            f = lambda x: x.lower()
-
-        # fit pad first so that it has index zero
-
-        text = []
-        for idx, b in enumerate(data_loader):
-            b_x = b[0]
-
-            column_text = []
-            for c in b_x:
-                column_text.extend(c)
-            text.extend(column_text)
-
-        count_vectoriser.fit(text)
-
-        vocab_index_train = count_vectoriser.vocabulary_
+    def _get_vocab_dict(data_loader, special_words_dict, case_insensitive, min_vocab_doc_frequency, num_workers=1):
+        vocab_builder = StreamingVocabBuilder(case_insensitive=case_insensitive,
+                                              min_doc_frequency=min_vocab_doc_frequency, num_workers=num_workers)
+        vocab_train = vocab_builder(data_loader)
 
         # Set up so that the special words index doesnt change
         final_dict = special_words_dict.copy()
-        for k in vocab_index_train:
+        for k in vocab_train:
             if k not in final_dict:
                 final_dict[k] = len(final_dict)
 
         return final_dict
 
     def transform(self, x):
+        return list(self.iter_transform(x))
+
+    def iter_transform(self, x):
+        """
+        Lazily transforms each batch as it is read from x. The word indices of each column are written into a
+        preallocated array, and returned as a LongTensor that shares the memory of the array
+        """
         self.logger.info("Transforming TransformTextToIndex")
         f = lambda x: x
         if self.case_insensitive:
             f = lambda x: x.lower()
 
-        tokeniser = CountVectorizer().build_tokenizer()
         pad_index = self._vocab_dict[f(self.pad_token())]
         unknown_index = self._vocab_dict[f(TransformTextToIndex.UNK_token())]
-        batches = []
+        index_args = (self._vocab_dict, self.max_feature_lens, self.case_insensitive, pad_index, unknown_index)
+
         unknown_words_count = 0
-        for idx, b in enumerate(x):
-            b_x = b[0]
-            b_y = b[1]
-            col = []
-            for c_index, c in enumerate(b_x):
-                row = []
-                max = self.max_feature_lens[c_index]
-                for _, r in enumerate(c):
-                    tokens = [self._vocab_dict.get(f(w), unknown_index) for w in
-                              tokeniser(r)][0:max]
-                    tokens = tokens + [pad_index] * (max - len(tokens))
-                    row.append(tokens)
-                    # Unknown words count
-
-                    unknown_words_count += sum(t == unknown_index for t in tokens)
-                row = torch.Tensor(row).long()
-                col.append(row)
-
-            batches.append([col, b_y])
+        index_workers = getattr(self, "index_workers", 1)
+        if index_workers > 1:
+            # At most 2 batches per worker are indexed ahead of the results, and the next batch is only read from x
+            # once the oldest result is yielded, so that x is still read lazily
+            pending = deque()
+            with Pool(index_workers, initializer=_init_worker, initargs=index_args) as pool:
+                for b in x:
+                    pending.append((pool.apply_async(_index_batch_in_worker, (b[0],)), b[1]))
+                    if len(pending) < index_workers * 2:
+                        continue
+
+                    result, b_y = pending.popleft()
+                    cols, unknown = result.get()
+                    unknown_words_count += unknown
+                    yield [[torch.from_numpy(c) for c in cols], b_y]
+
+                while len(pending) > 0:
+                    result, b_y = pending.popleft()
+                    cols, unknown = result.get()
+                    unknown_words_count += unknown
+                    yield [[torch.from_numpy(c) for c in cols], b_y]
+        else:
+            for b in x:
+                cols, unknown = _index_batch(b[0], *index_args)
+                unknown_words_count += unknown
+                yield [[torch.from_numpy(c) for c in cols], b[1]]
 
         self.logger.info("Total number of unknown occurances {}".format(unknown_words_count))
 
         self.logger.info("Completed TransformTextToIndex")
-        return batches
 
     def fit_transform(self, data_loader):
         self.fit(data_loader)
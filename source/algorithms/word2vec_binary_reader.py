@@ -0,0 +1,86 @@
+import io
+import logging
+
+import numpy as np
+
+"""
+Reads the word2vec binary format directly, so the .bin embedding does not need to be converted to text
+"""
+
+
+class Word2VecBinaryReader:
+    """
+    Streams (word, vector) pairs from a word2vec .bin file. The file starts with a text header "<num words> <dim>\\n",
+    followed by for each word the utf-8 word, a space and dim little endian float32 values, optionally followed by \\n.
+    """
+    binary_suffix = ".bin"
+
+    def __init__(self, handle, chunk_size=1 << 20, close_handle=False):
+        """
+        :param handle: A handle opened in binary mode
+        :param chunk_size: The number of bytes read from the handle at a time
+        :param close_handle: Close the handle once all the words are read
+        """
+        self.close_handle = close_handle
+        self.chunk_size = chunk_size
+        self.handle = handle
+        self.num_words, self.dim = [int(v) for v in handle.readline().split()]
+
+    @property
+    def logger(self):
+        return logging.getLogger(__name__)
+
+    @staticmethod
+    def find(handle):
+        """
+        Returns a reader when the handle is in binary mode or is a file with the .bin extension, else None
+        :param handle: An open file handle
+        """
+        if isinstance(handle, (io.RawIOBase, io.BufferedIOBase)):
+            return Word2VecBinaryReader(handle)
+
+        name = getattr(handle, "name", None)
+        if isinstance(name, str) and name.endswith(Word2VecBinaryReader.binary_suffix):
+            return Word2VecBinaryReader(open(name, "rb"), close_handle=True)
+
+        return None
+
+    def __iter__(self):
+        return self.iter_vectors()
+
+    def iter_vectors(self, words=None):
+        """
+        Yields (word, vector) for each word in the file, in file order
+        :param words: Optional set of utf-8 encoded words, only the vectors of these words are returned
+        """
+        row_bytes = self.dim * np.dtype(np.float32).itemsize
+        vector_type = np.dtype(np.float32).newbyteorder("<")
+
+        buffer = b""
+        pos = 0
+        for _ in range(self.num_words):
+            space = buffer.find(b" ", pos)
+            while space < 0:
+                buffer, pos = self._read_more(buffer, pos)
+                space = buffer.find(b" ", pos)
+
+            # The \n of the previous vector, if any, is read as part of the word
+            word = buffer[pos:space].lstrip(b"\n")
+            pos = space + 1
+
+            while len(buffer) - pos < row_bytes:
+                buffer, pos = self._read_more(buffer, pos)
+
+            if words is None or word in words:
+                vector = np.frombuffer(buffer, dtype=vector_type, count=self.dim, offset=pos).astype(np.float32)
+                yield word.decode("utf-8", errors="replace"), vector
+            pos += row_bytes
+
+        if self.close_handle:
+            self.handle.close()
+
+    def _read_more(self, buffer, pos):
+        chunk = self.handle.read(self.chunk_size)
+        if not chunk:
+            raise EOFError("Expected {} words in the word2vec file, but the file ended".format(self.num_words))
+        return buffer[pos:] + chunk, 0
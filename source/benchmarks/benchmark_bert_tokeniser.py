@@ -0,0 +1,60 @@
+import argparse
+import json
+import logging
+import sys
+import timeit
+
+from pytorch_pretrained_bert import BertTokenizer
+
+from algorithms.fast_wordpiece_tokenizer import FastWordpieceTokenizer
+
+
+def run(bert_model_dir, shard_file, text_field, case_insensitive, repeat):
+    """
+    Compares BertTokenizer.tokenize against the FastWordpieceTokenizer over the texts of a PubTator inference shard,
+    the json output of PubtatorAnnotationsInferenceTransformer, where the abstract is repeated for each gene pair
+    """
+    logger = logging.getLogger(__name__)
+
+    with open(shard_file, "r") as f:
+        texts = [r[text_field] for r in json.load(f)]
+
+    bert_tokeniser = BertTokenizer.from_pretrained(bert_model_dir, do_lower_case=case_insensitive)
+
+    bert_func = lambda: [bert_tokeniser.tokenize(t) for t in texts]
+
+    # A new tokenizer for each run, so that the memo and word cache of the previous run are not reused
+    def fast_func():
+        fast_tokeniser = FastWordpieceTokenizer(bert_tokeniser)
+        return [fast_tokeniser.tokenize(t) for t in texts]
+
+    for i, (expected, actual) in enumerate(zip(bert_func(), fast_func())):
+        assert expected == actual, "The tokens do not match for record {}".format(i)
+
+    # Building the trie is part of the fast tokenizer time
+    bert_time = min(timeit.repeat(bert_func, number=1, repeat=repeat))
+    fast_time = min(timeit.repeat(fast_func, number=1, repeat=repeat))
+
+    logger.info("Records {}, distinct texts {}".format(len(texts), len(set(texts))))
+    logger.info("BertTokenizer                 : {:.6f} seconds".format(bert_time))
+    logger.info("FastWordpieceTokenizer        : {:.6f} seconds".format(fast_time))
+    logger.info("Speedup                       : {:.1f}x".format(bert_time / fast_time))
+
+    return bert_time, fast_time
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("bertmodeldir", help="The dir containing the BERT vocab.txt")
+    parser.add_argument("shardfile", help="The json file of records created by PubtatorAnnotationsInferenceTransformer")
+    parser.add_argument("--textfield", help="The field of the record to tokenize", default="normalised_abstract")
+    parser.add_argument("--caseinsensitive", help="Lower case the text", action="store_true")
+    parser.add_argument("--repeat", help="The number of times to repeat the timing", type=int, default=3)
+    parser.add_argument("--log-level", help="Log level", default="INFO", choices={"INFO", "WARN", "DEBUG", "ERROR"})
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.getLevelName(args.log_level), handlers=[logging.StreamHandler(sys.stdout)],
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    run(args.bertmodeldir, args.shardfile, args.textfield, args.caseinsensitive, args.repeat)
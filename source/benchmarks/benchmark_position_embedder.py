@@ -0,0 +1,59 @@
+import argparse
+import logging
+import sys
+import timeit
+
+import torch
+
+from algorithms.BatchPositionEmbedder import BatchPositionEmbedder
+from algorithms.PositionEmbedder import PositionEmbedder
+from algorithms.SinusoidalDistanceEmbedder import SinusoidalDistanceEmbedder
+
+
+def run(batch_size, seq_len, vocab_size, max_pos, pos_dim, repeat):
+    """
+    Compares the per sentence PositionEmbedder against the BatchPositionEmbedder for a random batch of 2 entities
+    """
+    logger = logging.getLogger(__name__)
+
+    embeddings = SinusoidalDistanceEmbedder(max_pos=max_pos, pos_dim=pos_dim)()
+    entities = [1, 2]
+    tokens = torch.LongTensor(batch_size, seq_len).random_(0, vocab_size)
+
+    per_row = PositionEmbedder(embeddings=embeddings)
+    batched = BatchPositionEmbedder(embeddings=embeddings)
+
+    per_row_func = lambda: [torch.stack([per_row(t, e) for t in tokens]) for e in entities]
+    batched_func = lambda: [batched(tokens, e) for e in entities]
+
+    for e, expected, actual in zip(entities, per_row_func(), batched_func()):
+        assert torch.allclose(expected, actual), "The batch embedding does not match for entity {}".format(e)
+
+    per_row_time = min(timeit.repeat(per_row_func, number=1, repeat=repeat))
+    batched_time = min(timeit.repeat(batched_func, number=1, repeat=repeat))
+
+    logger.info("Batch size {}, sequence length {}, max distance {}".format(batch_size, seq_len, max_pos))
+    logger.info("PositionEmbedder per row      : {:.6f} seconds per batch".format(per_row_time))
+    logger.info("BatchPositionEmbedder         : {:.6f} seconds per batch".format(batched_time))
+    logger.info("Speedup                       : {:.1f}x".format(per_row_time / batched_time))
+
+    return per_row_time, batched_time
+
+
+if "__main__" == __name__:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batchsize", help="The batch size", type=int, default=32)
+    parser.add_argument("--seqlen", help="The number of tokens per row", type=int, default=250)
+    parser.add_argument("--vocabsize", help="The range of token ids, smaller values mean more entity matches",
+                        type=int, default=50)
+    parser.add_argument("--maxpos", help="The max distance embedded", type=int, default=10)
+    parser.add_argument("--posdim", help="The position embedding dim", type=int, default=3)
+    parser.add_argument("--repeat", help="The number of times to repeat the timing", type=int, default=5)
+    parser.add_argument("--log-level", help="Log level", default="INFO", choices={"INFO", "WARN", "DEBUG", "ERROR"})
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.getLevelName(args.log_level), handlers=[logging.StreamHandler(sys.stdout)],
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    run(args.batchsize, args.seqlen, args.vocabsize, args.maxpos, args.posdim, args.repeat)
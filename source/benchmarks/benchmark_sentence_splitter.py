@@ -0,0 +1,107 @@
+import argparse
+import glob
+import logging
+import os
+import sys
+import timeit
+
+import pandas as pd
+import spacy
+
+from algorithms.rule_sentence_splitter import RuleSentenceSplitter
+
+# The fields of the test data files that contain abstracts
+_text_fields = ["pubmedabstract", "normalised_abstract", "passage", "text", "article_abstract"]
+
+
+def load_abstracts(data_files):
+    """
+    Returns the distinct abstracts in the json data files
+    """
+    abstracts = set()
+    for data_file in data_files:
+        df = pd.read_json(data_file)
+        for field in filter(lambda c: c in df.columns, _text_fields):
+            abstracts.update([t for t in df[field] if isinstance(t, str) and len(t.strip()) > 0])
+
+    return sorted(abstracts)
+
+
+def run(data_files, spacy_model, repeat):
+    """
+    Compares the RuleSentenceSplitter against the spacy parser on the abstracts in data_files. Reports the throughput
+    of each, the percentage of abstracts split into exactly the same sentences and the precision and recall of the
+    rule based sentence boundaries, taking spacy as the reference
+    """
+    logger = logging.getLogger(__name__)
+
+    abstracts = load_abstracts(data_files)
+    assert len(abstracts) > 0, "No abstracts found in {}".format(data_files)
+
+    nlp = spacy.load(spacy_model)
+    nlp.disable_pipes(*[p for p in nlp.pipe_names if p not in {"parser", "senter", "sentencizer"}])
+    rule_splitter = RuleSentenceSplitter()
+
+    spacy_func = lambda: [[s.text for s in doc.sents] for doc in nlp.pipe(abstracts)]
+    rule_func = lambda: [rule_splitter(a) for a in abstracts]
+
+    spacy_sentences = spacy_func()
+    rule_sentences = rule_func()
+
+    exact_matches = 0
+    true_positives, rule_boundaries, spacy_boundaries = 0, 0, 0
+    for a, expected, actual in zip(abstracts, spacy_sentences, rule_sentences):
+        expected = [s.strip() for s in expected if len(s.strip()) > 0]
+        exact_matches += int(expected == actual)
+
+        expected_boundaries = _boundaries(a, expected)
+        actual_boundaries = _boundaries(a, actual)
+        true_positives += len(expected_boundaries & actual_boundaries)
+        spacy_boundaries += len(expected_boundaries)
+        rule_boundaries += len(actual_boundaries)
+
+    spacy_time = min(timeit.repeat(spacy_func, number=1, repeat=repeat))
+    rule_time = min(timeit.repeat(rule_func, number=1, repeat=repeat))
+
+    logger.info("Abstracts {} from {} files".format(len(abstracts), len(data_files)))
+    logger.info("spacy {}          : {:.1f} abstracts per second".format(spacy_model, len(abstracts) / spacy_time))
+    logger.info("RuleSentenceSplitter          : {:.1f} abstracts per second".format(len(abstracts) / rule_time))
+    logger.info("Speedup                       : {:.1f}x".format(spacy_time / rule_time))
+    logger.info("Abstracts with the same splits: {:.1f}%".format(100.0 * exact_matches / len(abstracts)))
+    logger.info("Boundary precision            : {:.3f}".format(true_positives / max(rule_boundaries, 1)))
+    logger.info("Boundary recall               : {:.3f}".format(true_positives / max(spacy_boundaries, 1)))
+
+    return spacy_time, rule_time, exact_matches / len(abstracts)
+
+
+def _boundaries(text, sentences):
+    # The character offset of the start of each sentence after the first
+    result = set()
+    start = 0
+    for s in sentences:
+        offset = text.find(s, start)
+        if offset < 0:
+            continue
+        if offset > 0:
+            result.add(offset)
+        start = offset + len(s)
+    return result
+
+
+if "__main__" == __name__:
+    tests_dir = os.path.join(os.path.dirname(__file__), "..", "..", "tests")
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--datafiles", help="The json files with abstracts, defaults to the test data files", nargs="+",
+                        default=glob.glob(os.path.join(tests_dir, "data", "*.json")) + glob.glob(
+                            os.path.join(tests_dir, "test_dataformatters", "*.json")))
+    parser.add_argument("--spacymodel", help="The spacy model", default="en_core_web_sm")
+    parser.add_argument("--repeat", help="The number of times to repeat the timing", type=int, default=3)
+    parser.add_argument("--log-level", help="Log level", default="INFO", choices={"INFO", "WARN", "DEBUG", "ERROR"})
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.getLevelName(args.log_level), handlers=[logging.StreamHandler(sys.stdout)],
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    run(args.datafiles, args.spacymodel, args.repeat)
@@ -0,0 +1,29 @@
+import argparse
+import logging
+import sys
+
+from algorithms.embedding_store import EmbeddingStore
+
+
+def convert(text_path, output_prefix=None):
+    """
+    Converts the word2vec text file into an EmbeddingStore. By default the store is written next to the text file, so
+    the embedding loaders pick it up automatically when passed the text file
+    """
+    output_prefix = output_prefix or text_path
+    with open(text_path, "r", encoding="utf-8") as handle:
+        EmbeddingStore.convert(handle, output_prefix)
+
+
+if "__main__" == __name__:
+    logging.basicConfig(level=logging.INFO, handlers=[logging.StreamHandler(sys.stdout)],
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    parser = argparse.ArgumentParser()
+    parser.add_argument("inputwordtovectext",
+                        help="The input word to vec text formatted file")
+    parser.add_argument("--outprefix",
+                        help="The prefix of the output .vocab and .npy files, defaults to the input file name",
+                        default=None)
+    args = parser.parse_args()
+
+    convert(args.inputwordtovectext, args.outprefix)
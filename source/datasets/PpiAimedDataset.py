@@ -26,25 +26,30 @@ class PpiAimedDataset(CustomDatasetBase):
                 "The type of argument file_path_or_dataframe  must be a str or pandas dataframe, but is {}".format(
                     type(file_path_or_dataframe)))
 
-        # Filter features
-        self._data_df = data_df[["passage", "participant1", "participant1_loc", "participant2", "participant2_loc"]]
+        # Filter features and set up labels
+        self._set_columns(data_df, ["passage", "participant1", "participant1_loc", "participant2", "participant2_loc"],
+                          "isValid")
 
-        # Set up labels
-        if "isValid" in data_df.columns:
-            self._labels = data_df[["isValid"]]
-            self._labels = np.reshape(self._labels.values.tolist(), (-1,))
-        else:
-            self._labels = np.reshape([-1] * data_df.shape[0], (-1,))
+    def _to_samples(self, rows, labels):
+        for row_values in rows:
+            self._to_offsets(row_values)
 
-    def __len__(self):
-        return self._data_df.shape[0]
+        if self.transformer is not None:
+            rows = self.transformer.transform_rows(rows) if hasattr(self.transformer, "transform_rows") \
+                else [self.transformer(r) for r in rows]
 
-    def __getitem__(self, index):
-        row_values = self._data_df.iloc[index, :].tolist()
+        # remove the location offsets
+        return [[r[0], r[1], r[3]] for r in rows]
+
+    @staticmethod
+    def _to_offsets(row_values):
         # Convert to offset "22-40" 22
         row_values[2] = int(row_values[2].split("-")[0])
         row_values[4] = int(row_values[4].split("-")[0])
 
+    def _to_sample(self, row_values, y):
+        self._to_offsets(row_values)
+
         # transform
         if self.transformer is not None:
             self.row_values = self.transformer(row_values)
@@ -52,8 +57,6 @@ class PpiAimedDataset(CustomDatasetBase):
         # remove the location offsets
         x = np.array(row_values)[[0, 1, 3]].tolist()
 
-        # y
-        y = self._labels[index].tolist()
         return x, y
 
     @property
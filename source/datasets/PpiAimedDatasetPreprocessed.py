@@ -30,21 +30,13 @@ class PpiAimedDatasetPreprocessed(CustomDatasetBase):
                 "The type of argument file_path_or_dataframe  must be a str or pandas dataframe, but is {}".format(
                     type(file_path_or_dataframe)))
 
-        # Filter features
-        self._data_df = data_df[["passage"]]
+        # Filter features and set up labels
+        self._set_columns(data_df, ["passage"], "isValid")
 
-        # Set up labels
-        if "isValid" in data_df.columns:
-            self._labels = data_df[["isValid"]]
-            self._labels = np.reshape(self._labels.values.tolist(), (-1,))
-        else:
-            self._labels = np.reshape([-1] * data_df.shape[0], (-1,))
-
-    def __len__(self):
-        return self._data_df.shape[0]
+    def _to_samples(self, rows, labels):
+        return [self._to_sample(r, y)[0] for r, y in zip(rows, labels)]
 
-    def __getitem__(self, index):
-        row_values = self._data_df.iloc[index, :].tolist()
+    def _to_sample(self, row_values, y):
 
         # transform
         if self.transformer is not None:
@@ -53,8 +45,6 @@ class PpiAimedDatasetPreprocessed(CustomDatasetBase):
         # remove the location offsets
         x = np.array(row_values).tolist()
 
-        # y
-        y = self._labels[index].tolist()
         return x, y
 
     @property
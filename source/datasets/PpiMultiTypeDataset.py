@@ -0,0 +1,52 @@
+from datasets.PpiDataset import PPIDataset
+
+
+class PpiMultiTypeDataset(PPIDataset):
+    """
+    Represents the custom PPI dataset with the interaction type as a feature column, for networks with a head per
+    interaction type. With all_types, there is a single row for each abstract and gene pair, to score every interaction
+    type of the pair at once.
+    """
+
+    default_interaction_types = ["phosphorylation", "dephosphorylation", "ubiquitination", "methylation",
+                                 "acetylation", "deubiquitination", "demethylation"]
+
+    def __init__(self, file_path, interaction_types=None, all_types=False, transformer=None):
+        """
+        :param interaction_types: The interaction types, in the order of the network heads
+        :param all_types: Keep one row of each abstract and gene pair, the interaction type and the label are not used
+        """
+        self._interaction_types = interaction_types or self.default_interaction_types
+        self.all_types = all_types
+        super(PpiMultiTypeDataset, self).__init__(file_path, interaction_type=None, transformer=transformer)
+
+    # The columns of an abstract and gene pair
+    pair_columns = ["normalised_abstract", "participant1Id", "participant2Id"]
+
+    @staticmethod
+    def unique_pairs(data_df):
+        """
+        Returns the first record of each abstract and gene pair, the records of the dataset with all_types
+        """
+        return data_df.drop_duplicates(subset=PpiMultiTypeDataset.pair_columns)
+
+    def _set_columns(self, data_df, feature_columns, label_column):
+        if self.all_types:
+            data_df = self.unique_pairs(data_df).copy()
+            # Any interaction type, forward_all_types does not use the column
+            data_df["interactionType"] = self._interaction_types[0]
+            data_df = data_df.drop(columns=[label_column], errors="ignore")
+
+        super(PpiMultiTypeDataset, self)._set_columns(data_df, feature_columns, label_column)
+
+    @property
+    def interaction_types(self):
+        return self._interaction_types
+
+    @property
+    def interaction_type_column_index(self):
+        return 3
+
+    @property
+    def entity_markers(self):
+        return ["PROTEIN1", "PROTEIN2"]
@@ -1,6 +1,3 @@
-import numpy as np
-import pandas as pd
-
 from datasets.custom_dataset_base import CustomDatasetBase
 
 
@@ -17,33 +14,14 @@ class PpiMulticlassDataset(CustomDatasetBase):
         self.transformer = transformer
         self._file_path = file_path
         # Read json
-        data_df = pd.read_json(self._file_path)
+        data_df = self._read_dataframe(self._file_path)
 
         # Filter interaction types if required
         if interaction_type is not None:
             data_df = data_df.query('interactionType == "{}"'.format(interaction_type))
 
-        # Filter features
-        self._data_df = data_df[["normalised_abstract", "participant1Id", "participant2Id"]]
-
-        # Set up labels
-        if "class" in data_df.columns:
-            self._labels = data_df[["class"]]
-            self._labels = np.reshape(self._labels.values.tolist(), (-1,))
-        else:
-            self._labels = np.reshape([-1] * data_df.shape[0], (-1,))
-
-    def __len__(self):
-        return self._data_df.shape[0]
-
-    def __getitem__(self, index):
-        x = self._data_df.iloc[index, :].tolist()
-        y = self._labels[index].tolist()
-
-        if self.transformer is not None:
-            x = self.transformer(x)
-
-        return x, y
+        # Filter features and set up labels
+        self._set_columns(data_df, ["normalised_abstract", "participant1Id", "participant2Id"], "class")
 
     @property
     def class_size(self):
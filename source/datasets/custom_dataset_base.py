@@ -1,7 +1,136 @@
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
 from torch.utils.data import Dataset
 
+# The dataset whose rows are transformed by the worker processes of materialise, set once in each worker
+_materialise_dataset = None
+
+
+def _init_materialise_worker(dataset):
+    global _materialise_dataset
+    _materialise_dataset = dataset
+
+
+def _materialise_rows(rows_labels):
+    rows, labels = rows_labels
+    return _materialise_dataset._to_samples(rows, labels)
+
 
 class CustomDatasetBase(Dataset):
+    """
+    Base class of the datasets. The feature columns and the labels are held as NumPy arrays, converted from the
+    dataframe once by _set_columns, so that a row or a batch of rows is read without pandas
+    """
+
+    @staticmethod
+    def _read_dataframe(file_path_or_dataframe):
+        """
+        Returns the dataframe, or the dataframe of the records in the json file or buffer
+        """
+        if isinstance(file_path_or_dataframe, pd.DataFrame):
+            return file_path_or_dataframe
+        return pd.read_json(file_path_or_dataframe)
+
+    def _set_columns(self, data_df, feature_columns, label_column):
+        """
+        Converts the feature columns and the label column of the dataframe into arrays. When the label column is not in
+        the dataframe, the labels are -1
+        """
+        self._columns = [self._to_array(data_df[c].tolist()) for c in feature_columns]
+        self._materialised = False
+
+        if label_column in data_df.columns:
+            self._labels = np.reshape(data_df[[label_column]].values.tolist(), (-1,))
+        else:
+            self._labels = np.reshape([-1] * data_df.shape[0], (-1,))
+
+    @staticmethod
+    def _to_array(values):
+        # An object array of python values, the same values as iloc[index, :].tolist()
+        result = np.empty(len(values), dtype=object)
+        result[:] = values
+        return result
+
+    def materialise(self, num_workers=1):
+        """
+        Applies the transformer to every row once and keeps the transformed rows, for example the masked text, in place
+        of the original columns. Reading the rows again, in each epoch or each pass over the data, then costs no
+        preprocessing. Call after the transformer is set.
+        :param num_workers: The number of processes that transform the rows
+        """
+        if getattr(self, "_materialised", False) or len(self) == 0:
+            return
+
+        rows = [list(r) for r in zip(*[c.tolist() for c in self._columns])]
+        labels = self._labels.tolist()
+
+        if num_workers > 1:
+            # Each worker transforms a slice of the rows at once
+            slice_size = max(1, len(labels) // (num_workers * 4))
+            slices = [(rows[s:s + slice_size], labels[s:s + slice_size]) for s in range(0, len(labels), slice_size)]
+            with Pool(num_workers, initializer=_init_materialise_worker, initargs=(self,)) as pool:
+                transformed_rows = [r for t in pool.map(_materialise_rows, slices) for r in t]
+        else:
+            transformed_rows = self._to_samples(rows, labels)
+
+        self._columns = [self._to_array(c) for c in zip(*transformed_rows)]
+        self._materialised = True
+
+    @property
+    def materialised(self):
+        """
+        True when the rows are already transformed, see materialise
+        """
+        return getattr(self, "_materialised", False)
+
+    def get_rows(self, indices):
+        """
+        Returns the list of row values and y of the indices, without applying the transformer. Once materialised, the
+        row values are the transformed values
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        columns = [c[indices].tolist() for c in self._columns]
+        labels = self._labels[indices].tolist()
+        return [(list(row_values), y) for row_values, y in zip(zip(*columns), labels)]
+
+    def _get_sample(self, row_values, y):
+        if getattr(self, "_materialised", False):
+            return row_values, y
+        return self._to_sample(row_values, y)
+
+    def _to_samples(self, rows, labels):
+        """
+        Returns the x of each of the rows, as _to_sample. A transformer with transform_rows, see Preprocessor, is applied
+        to all the rows at once, a column at a time. Datasets that override _to_sample override this too
+        """
+        if self.transformer is None or not hasattr(self.transformer, "transform_rows"):
+            return [self._to_sample(r, y)[0] for r, y in zip(rows, labels)]
+        return self.transformer.transform_rows(rows)
+
+    def _to_sample(self, row_values, y):
+        """
+        Returns the x, y of a row, applying the transformer to the row values
+        """
+        x = row_values
+        if self.transformer is not None:
+            x = self.transformer(x)
+        return x, y
+
+    def __len__(self):
+        return len(self._labels)
+
+    def __getitem__(self, index):
+        row_values = [c[index] for c in self._columns]
+        return self._get_sample(row_values, self._labels[index].tolist())
+
+    def __getitems__(self, indices):
+        """
+        Returns the list of x, y of the indices, reading each column once for the whole batch. The DataLoader calls this
+        instead of __getitem__ for each index, when available
+        """
+        return [self._get_sample(row_values, y) for row_values, y in self.get_rows(indices)]
 
     @property
     def class_size(self):
@@ -27,6 +156,21 @@ class CustomDatasetBase(Dataset):
     def entity_markers(self):
         raise NotImplementedError
 
+    @property
+    def interaction_types(self):
+        """
+        The interaction types in the interaction type column, for networks with a head per interaction type
+        """
+        return []
+
     @property
     def lambda_postive_field_filter(self):
         return lambda x: True
+
+    @property
+    def file_path(self):
+        """
+        The file the dataset was loaded from, None when the dataset was created from a dataframe
+        """
+        file_path = getattr(self, "_file_path", None)
+        return file_path if isinstance(file_path, str) else None
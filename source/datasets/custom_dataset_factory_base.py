@@ -1,6 +1,18 @@
 class CustomDatasetFactoryBase:
 
+    def __init__(self, preprocess_workers=1, materialise=True):
+        """
+        :param preprocess_workers: The number of processes that apply the transformer to the rows of a dataset
+        :param materialise: Apply the transformer to the rows of a dataset once, see CustomDatasetBase.materialise.
+        Otherwise the rows are transformed on every read, e.g. for the AbstractPairIndexer which masks the rows itself
+        """
+        self.materialise = materialise
+        self.preprocess_workers = preprocess_workers
+
     def get_dataset(self, file_path):
+        """
+        :param file_path: The json file of the records, or a dataframe of the records
+        """
         raise NotImplementedError
 
     def get_metric_factory(self):
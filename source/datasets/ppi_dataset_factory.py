@@ -24,4 +24,8 @@ class PpiDatasetFactory(CustomDatasetFactoryBase):
 
         dataset.transformer = transformer
 
+        # Mask once, rather than on every read of a row
+        if self.materialise:
+            dataset.materialise(num_workers=self.preprocess_workers)
+
         return dataset
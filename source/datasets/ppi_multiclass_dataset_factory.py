@@ -21,4 +21,8 @@ class PpiMulticlassDatasetFactory(CustomDatasetFactoryBase):
 
         dataset.transformer = transformer
 
+        # Mask once, rather than on every read of a row
+        if self.materialise:
+            dataset.materialise(num_workers=self.preprocess_workers)
+
         return dataset
@@ -0,0 +1,39 @@
+from datasets.PpiMultiTypeDataset import PpiMultiTypeDataset
+from datasets.custom_dataset_factory_base import CustomDatasetFactoryBase
+from metrics.result_scorer_f1_binary_factory import ResultScorerF1BinaryFactory
+from preprocessor.Preprocessor import Preprocessor
+from preprocessor.ProteinMasker import ProteinMasker
+
+
+class PpiMultiTypeDatasetFactory(CustomDatasetFactoryBase):
+    """
+    The PPI dataset for the RelationExtractorMultiTypeBiLstmNetworkFactory. The interaction type is not prefixed to the
+    abstract, it is kept in its own column
+    """
+
+    def __init__(self, preprocess_workers=1, all_types=False, materialise=True):
+        """
+        :param all_types: One row for each abstract and gene pair, to score all the interaction types of a pair at once
+        """
+        super(PpiMultiTypeDatasetFactory, self).__init__(preprocess_workers=preprocess_workers,
+                                                         materialise=materialise)
+        self.all_types = all_types
+
+    def get_metric_factory(self):
+        return ResultScorerF1BinaryFactory()
+
+    def get_dataset(self, file_path):
+        dataset = PpiMultiTypeDataset(file_path=file_path, all_types=self.all_types)
+
+        mask = ProteinMasker(entity_column_indices=dataset.entity_column_indices, masks=dataset.entity_markers,
+                             text_column_index=dataset.text_column_index)
+
+        transformer = Preprocessor([mask])
+
+        dataset.transformer = transformer
+
+        # Mask once, rather than on every read of a row
+        if self.materialise:
+            dataset.materialise(num_workers=self.preprocess_workers)
+
+        return dataset
@@ -20,4 +20,8 @@ class PpiNoInteractionDatasetFactory(CustomDatasetFactoryBase):
 
         dataset.transformer = transformer
 
+        # Mask once, rather than on every read of a row
+        if self.materialise:
+            dataset.materialise(num_workers=self.preprocess_workers)
+
         return dataset
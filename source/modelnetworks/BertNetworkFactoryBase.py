@@ -2,3 +2,9 @@ class BertNetworkFactoryBase:
 
     def get_network(self, class_size, embedding_dim, feature_lens, **kwargs):
         raise NotImplementedError
+
+    def supports_dynamic_padding(self):
+        """
+        True when the network accepts batches padded to the longest sequence in the batch, rather than a fixed length
+        """
+        return False
@@ -3,7 +3,9 @@ import logging
 import torch
 import torch.nn as nn
 
+from algorithms.BatchPositionEmbedder import BatchPositionEmbedder
 from algorithms.PositionEmbedder import PositionEmbedder
+from modelnetworks.packed_lstm import get_sequence_lengths, run_packed_lstm
 
 
 class RelationExtractorBiLstmNetwork(nn.Module):
@@ -72,6 +74,8 @@ class RelationExtractorBiLstmNetwork(nn.Module):
         # No softmax
         # nn.LogSoftmax())
 
+        self.use_packed_sequence = True
+
     @property
     def embeddings(self):
         if self.__embeddings is None:
@@ -92,7 +96,10 @@ class RelationExtractorBiLstmNetwork(nn.Module):
 
     @property
     def pos_embedder(self):
-        self.__pos_embedder__ = self.__pos_embedder__ or PositionEmbedder()
+        self.__pos_embedder__ = self.__pos_embedder__ or BatchPositionEmbedder()
+        # Models pickled with the per sentence PositionEmbedder
+        if isinstance(self.__pos_embedder__, PositionEmbedder):
+            self.__pos_embedder__ = BatchPositionEmbedder.from_position_embedder(self.__pos_embedder__)
         return self.__pos_embedder__
 
     def forward(self, feature_tuples):
@@ -107,24 +114,21 @@ class RelationExtractorBiLstmNetwork(nn.Module):
         self.logger.debug("Executing embeddings")
         embeddings = self.embeddings(text_inputs)
 
-        # TODO: avoid this loop, use builtin
         embeddings_with_pos = embeddings
         self.logger.debug("Executing pos embedding")
 
-        for _, entity in enumerate(self.entity_markers):
-
-            # TODO: avoid this loop, use builtin
-            batch_pos_embedding_entity = []
-
-            for i, (t, sentence_embedding) in enumerate(zip(text_inputs, embeddings)):
-                sentence_pos_embedding = self.pos_embedder(t, entity)
+        # Set pos_embedding to zero when pad token ( indicated by zero embedding)
+        pad_mask = torch.all(embeddings.eq(0.0), dim=2)
 
-                # Set pos_embedding to zero when pad token ( indicated by zero embedding)
-                sentence_pos_embedding[torch.all(sentence_embedding.eq(0.0), dim=1)] = 0.0
-                batch_pos_embedding_entity.append(sentence_pos_embedding)
+        # Distances precomputed by TransformEntityDistance are appended after the feature columns
+        precomputed_distances = feature_tuples[len(self.feature_lengths):]
 
-            batch_pos_embedding_entity_tensor = torch.stack(batch_pos_embedding_entity).to(
-                device=embeddings_with_pos.device)
+        for i, entity in enumerate(self.entity_markers):
+            if len(precomputed_distances) > 0:
+                batch_pos_embedding_entity_tensor = self.pos_embedder.embed(precomputed_distances[i], pad_mask=pad_mask,
+                                                                            tokens=text_inputs)
+            else:
+                batch_pos_embedding_entity_tensor = self.pos_embedder(text_inputs, entity, pad_mask=pad_mask)
 
             embeddings_with_pos = torch.cat([embeddings_with_pos, batch_pos_embedding_entity_tensor], dim=2)
         # Final output
@@ -132,7 +136,12 @@ class RelationExtractorBiLstmNetwork(nn.Module):
         # final_input = merged_pos_embed.permute(0, 2, 1)
 
         self.logger.debug("Running through layers")
-        outputs, (_, _) = self.lstm(embeddings_with_pos)
+        # Models saved before packing was added were trained running the lstm over the padding
+        if getattr(self, "use_packed_sequence", False):
+            lengths = get_sequence_lengths(pad_mask)
+            outputs = run_packed_lstm(self.lstm[0], embeddings_with_pos, lengths, total_length=self.max_sequence_len)
+        else:
+            outputs, (_, _) = self.lstm(embeddings_with_pos)
 
         outputs = outputs.permute(0, 2, 1)
 
@@ -3,6 +3,8 @@ import logging
 import torch
 import torch.nn as nn
 
+from modelnetworks.packed_lstm import get_sequence_lengths, run_packed_lstm
+
 
 class RelationExtractorBiLstmNetworkNoPos(nn.Module):
     """
@@ -57,6 +59,8 @@ Proceedings of the Eighth International Joint Conference on Natural Language Pro
         # No softmax
         # nn.LogSoftmax())
 
+        self.use_packed_sequence = True
+
     @property
     def embeddings(self):
         if self.__embeddings is None:
@@ -76,6 +80,18 @@ Proceedings of the Eighth International Joint Conference on Natural Language Pro
         return logging.getLogger(__name__)
 
     def forward(self, feature_tuples):
+        out = self.encode(feature_tuples)
+
+        self.logger.debug("Running fc")
+        out = self.fc(out)
+        # self.logger.debug("Running softmax")
+        # log_probs = self.softmax(out, dim=1)
+        return out
+
+    def encode(self, feature_tuples):
+        """
+        Returns the flattened bilstm outputs of the text, the input of the fc layer, of shape (batch, fc_input_size)
+        """
 
         # The input format is tuples of features.. where each item in tuple is a shape feature_len * batch_szie
 
@@ -89,18 +105,18 @@ Proceedings of the Eighth International Joint Conference on Natural Language Pro
         embeddings = self.embeddings(text_transposed)
 
         self.logger.debug("Running through layers")
-        outputs, (_, _) = self.lstm(embeddings)
+        # Models saved before packing was added were trained running the lstm over the padding
+        if getattr(self, "use_packed_sequence", False):
+            # The pad token has a zero embedding
+            lengths = get_sequence_lengths(torch.all(embeddings.eq(0.0), dim=2))
+            dropout, lstm = self.lstm
+            outputs = run_packed_lstm(lstm, dropout(embeddings), lengths, total_length=self.max_sequence_len)
+        else:
+            outputs, (_, _) = self.lstm(embeddings)
 
         # transform such that the shape is batch, seq, embedding
         outputs = outputs.permute(0, 2, 1).contiguous()
 
         # out = outputs[:, last_time_step_index, :]
 
-        self.logger.debug("Running fc")
-        # out = self.fc(out)
-
-        out = outputs.view(-1, self.fc_input_size)
-        out = self.fc(out)
-        # self.logger.debug("Running softmax")
-        # log_probs = self.softmax(out, dim=1)
-        return out
+        return outputs.view(-1, self.fc_input_size)
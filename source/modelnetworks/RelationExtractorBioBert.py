@@ -11,7 +11,7 @@ class RelationExtractorBioBert(nn.Module):
     def logger(self):
         return logging.getLogger(__name__)
 
-    def __init__(self, model_dir, num_classes, seed=None):
+    def __init__(self, model_dir, num_classes, seed=None, pad_token_id=0):
         super().__init__()
 
         if seed is None:
@@ -22,7 +22,15 @@ class RelationExtractorBioBert(nn.Module):
         self.model = BertForSequenceClassification.from_pretrained(model_dir,
                                                                    num_labels=num_classes)
 
+        self.pad_token_id = pad_token_id
+        self.use_attention_mask = True
+
         print(self.model)
 
     def forward(self, input):
-        return self.model(input)
+        # Models saved before the attention mask was added were trained attending to the padding
+        if not getattr(self, "use_attention_mask", False):
+            return self.model(input)
+
+        attention_mask = input.ne(self.pad_token_id).long()
+        return self.model(input, attention_mask=attention_mask)
@@ -15,6 +15,9 @@ class RelationExtractorBioBertFactory(BertNetworkFactoryBase):
         self.logger.info("Retrieving key {} with default {}, found {}".format(key, default, value))
         return value
 
+    def supports_dynamic_padding(self):
+        return True
+
     def get_network(self, class_size, embedding_dim, feature_lens, **kwargs):
         model_dir = self._get_value(kwargs, "pretrained_biobert_dir", None)
 
@@ -4,6 +4,7 @@ import math
 import torch
 import torch.nn as nn
 
+from algorithms.BatchPositionEmbedder import BatchPositionEmbedder
 from algorithms.PositionEmbedder import PositionEmbedder
 
 
@@ -118,7 +119,10 @@ class RelationExtractorCnnPosNetwork(nn.Module):
 
     @property
     def pos_embedder(self):
-        self.__pos_embedder__ = self.__pos_embedder__ or PositionEmbedder()
+        self.__pos_embedder__ = self.__pos_embedder__ or BatchPositionEmbedder()
+        # Models pickled with the per sentence PositionEmbedder
+        if isinstance(self.__pos_embedder__, PositionEmbedder):
+            self.__pos_embedder__ = BatchPositionEmbedder.from_position_embedder(self.__pos_embedder__)
         return self.__pos_embedder__
 
     def forward(self, features):
@@ -133,20 +137,18 @@ class RelationExtractorCnnPosNetwork(nn.Module):
         embeddings_with_pos = embeddings
         self.logger.debug("Executing pos embedding")
 
-        for _, entity in enumerate(self.entity_markers):
+        # Set pos_embedding to zero when pad token ( indicated by zero embedding)
+        pad_mask = torch.all(embeddings.eq(0.0), dim=2)
 
-            # TODO: avoid this loop, use builtin
-            batch_pos_embedding_entity = []
+        # Distances precomputed by TransformEntityDistance are appended after the feature columns
+        precomputed_distances = features[len(self.feature_lengths):]
 
-            for i, (t, sentence_embedding) in enumerate(zip(input, embeddings)):
-                sentence_pos_embedding = self.pos_embedder(t, entity)
-
-                # Set pos_embedding to zero when pad token ( indicated by zero embedding)
-                sentence_pos_embedding[torch.all(sentence_embedding.eq(0.0), dim=1)] = 0.0
-                batch_pos_embedding_entity.append(sentence_pos_embedding)
-
-            batch_pos_embedding_entity_tensor = torch.stack(batch_pos_embedding_entity).to(
-                device=embeddings_with_pos.device)
+        for i, entity in enumerate(self.entity_markers):
+            if len(precomputed_distances) > 0:
+                batch_pos_embedding_entity_tensor = self.pos_embedder.embed(precomputed_distances[i], pad_mask=pad_mask,
+                                                                            tokens=input)
+            else:
+                batch_pos_embedding_entity_tensor = self.pos_embedder(input, entity, pad_mask=pad_mask)
 
             embeddings_with_pos = torch.cat([embeddings_with_pos, batch_pos_embedding_entity_tensor], dim=2)
 
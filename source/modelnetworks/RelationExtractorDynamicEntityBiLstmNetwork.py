@@ -3,7 +3,9 @@ import logging
 import torch
 import torch.nn as nn
 
+from algorithms.BatchPositionEmbedder import BatchPositionEmbedder
 from algorithms.PositionEmbedder import PositionEmbedder
+from modelnetworks.packed_lstm import get_sequence_lengths, run_packed_lstm
 
 
 class RelationExtractorDynamicEntityBiLstmNetwork(nn.Module):
@@ -70,6 +72,8 @@ class RelationExtractorDynamicEntityBiLstmNetwork(nn.Module):
         # No softmax
         # nn.LogSoftmax())
 
+        self.use_packed_sequence = True
+
     @property
     def embeddings(self):
         if self.__embeddings is None:
@@ -90,7 +94,10 @@ class RelationExtractorDynamicEntityBiLstmNetwork(nn.Module):
 
     @property
     def pos_embedder(self):
-        self.__pos_embedder__ = self.__pos_embedder__ or PositionEmbedder()
+        self.__pos_embedder__ = self.__pos_embedder__ or BatchPositionEmbedder()
+        # Models pickled with the per sentence PositionEmbedder
+        if isinstance(self.__pos_embedder__, PositionEmbedder):
+            self.__pos_embedder__ = BatchPositionEmbedder.from_position_embedder(self.__pos_embedder__)
         return self.__pos_embedder__
 
     def forward(self, feature_tuples):
@@ -106,27 +113,24 @@ class RelationExtractorDynamicEntityBiLstmNetwork(nn.Module):
         self.logger.debug("Executing embeddings")
         embeddings = self.embeddings(text_transposed)
 
-        # TODO: avoid this loop, use builtin
         embeddings_with_pos = embeddings
         self.logger.debug("Executing pos embedding")
 
-        for f in range(len(feature_tuples)):
-            if f == self.text_column_index: continue
-
-            entity = feature_tuples[f]  # .transpose(0, 1)
-
-            # TODO: avoid this loop, use builtin
-            batch_pos_embedding_entity = []
-
-            for i, (t, e, sentence_embedding) in enumerate(zip(text_transposed, entity, embeddings)):
-                sentence_pos_embedding = self.pos_embedder(t, e[0])
+        # Set pos_embedding to zero when pad token ( indicated by zero embedding)
+        pad_mask = torch.all(embeddings.eq(0.0), dim=2)
 
-                # Set pos_embedding to zero when pad token ( indicated by zero embedding)
-                sentence_pos_embedding[torch.all(sentence_embedding.eq(0.0), dim=1)] = 0.0
-                batch_pos_embedding_entity.append(sentence_pos_embedding)
+        # Distances precomputed by TransformEntityDistance are appended after the feature columns
+        precomputed_distances = feature_tuples[len(self.feature_lengths):]
+        entity_columns = [f for f in range(len(self.feature_lengths)) if f != self.text_column_index]
 
-            batch_pos_embedding_entity_tensor = torch.stack(batch_pos_embedding_entity).to(
-                device=embeddings_with_pos.device)
+        for i, f in enumerate(entity_columns):
+            if len(precomputed_distances) > 0:
+                batch_pos_embedding_entity_tensor = self.pos_embedder.embed(precomputed_distances[i], pad_mask=pad_mask,
+                                                                            tokens=text_transposed)
+            else:
+                # The entity id is the first token of the entity column
+                entity = feature_tuples[f][:, 0]
+                batch_pos_embedding_entity_tensor = self.pos_embedder(text_transposed, entity, pad_mask=pad_mask)
 
             embeddings_with_pos = torch.cat([embeddings_with_pos, batch_pos_embedding_entity_tensor], dim=2)
         # Final output
@@ -134,7 +138,12 @@ class RelationExtractorDynamicEntityBiLstmNetwork(nn.Module):
         # final_input = merged_pos_embed.permute(0, 2, 1)
 
         self.logger.debug("Running through layers")
-        outputs, (_, _) = self.lstm(embeddings_with_pos)
+        # Models saved before packing was added were trained running the lstm over the padding
+        if getattr(self, "use_packed_sequence", False):
+            lengths = get_sequence_lengths(pad_mask)
+            outputs = run_packed_lstm(self.lstm[0], embeddings_with_pos, lengths, total_length=self.max_sequence_len)
+        else:
+            outputs, (_, _) = self.lstm(embeddings_with_pos)
 
         outputs = outputs.permute(0, 2, 1)
 
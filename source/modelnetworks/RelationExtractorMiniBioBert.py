@@ -11,7 +11,7 @@ class RelationExtractorMiniBioBert(nn.Module):
     def logger(self):
         return logging.getLogger(__name__)
 
-    def __init__(self, model_dir, num_classes, seed=None, num_layers=5):
+    def __init__(self, model_dir, num_classes, seed=None, num_layers=5, pad_token_id=0):
         super().__init__()
 
         if seed is None:
@@ -25,7 +25,15 @@ class RelationExtractorMiniBioBert(nn.Module):
         model_full.bert.encoder.layer = model_full.bert.encoder.layer[0: num_layers]
 
         self.model = model_full
+        self.pad_token_id = pad_token_id
+        self.use_attention_mask = True
+
         print(self.model)
 
     def forward(self, input):
-        return self.model(input)
+        # Models saved before the attention mask was added were trained attending to the padding
+        if not getattr(self, "use_attention_mask", False):
+            return self.model(input)
+
+        attention_mask = input.ne(self.pad_token_id).long()
+        return self.model(input, attention_mask=attention_mask)
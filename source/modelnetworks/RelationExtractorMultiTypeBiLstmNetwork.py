@@ -0,0 +1,58 @@
+import torch
+import torch.nn as nn
+
+from modelnetworks.RelationExtractorBiLstmNetworkNoPos import RelationExtractorBiLstmNetworkNoPos
+
+
+class RelationExtractorMultiTypeBiLstmNetwork(RelationExtractorBiLstmNetworkNoPos):
+    """
+    A bilstm encoder of the masked abstract shared by a head per interaction type. The interaction type is a feature
+    column rather than a QUERY prefix of the abstract, so that the abstract of a gene pair is encoded once and
+    forward_all_types scores every interaction type from the one encoding.
+    """
+
+    def __init__(self, class_size, embedding_dim, feature_lengths, interaction_type_indices,
+                 interaction_type_column_index, **kwargs):
+        """
+        :param interaction_type_indices: The vocab index of each interaction type, in the order of the heads
+        :param interaction_type_column_index: The index of the feature column with the interaction type
+        """
+        super(RelationExtractorMultiTypeBiLstmNetwork, self).__init__(class_size, embedding_dim, feature_lengths,
+                                                                      **kwargs)
+        self.interaction_type_column_index = interaction_type_column_index
+        self.num_interaction_types = len(interaction_type_indices)
+
+        # All the heads as a single linear layer, the output is reshaped into (batch, types, classes)
+        dropout_rate_fc = self.fc[0].p
+        self.fc = nn.Sequential(
+            nn.Dropout(dropout_rate_fc),
+            nn.Linear(self.fc_input_size, self.num_interaction_types * class_size))
+
+        # Maps the vocab index of the interaction type to its head, -1 for any other word
+        head_lookup = torch.full((max(interaction_type_indices) + 1,), -1, dtype=torch.long)
+        head_lookup[torch.tensor(interaction_type_indices, dtype=torch.long)] = torch.arange(
+            self.num_interaction_types, dtype=torch.long)
+        self.register_buffer("head_lookup", head_lookup)
+
+    def forward(self, feature_tuples):
+        """
+        Returns the scores of the interaction type in the interaction type column of each row, of shape
+        (batch, classes)
+        """
+        type_inputs = feature_tuples[self.interaction_type_column_index][:, 0]
+        heads = self.head_lookup[type_inputs.clamp(max=self.head_lookup.shape[0] - 1)]
+        assert bool(torch.all(heads.ge(0))), "Found a row whose interaction type has no head"
+
+        scores = self.forward_all_types(feature_tuples)
+        return scores[torch.arange(scores.shape[0], device=scores.device), heads]
+
+    def forward_all_types(self, feature_tuples):
+        """
+        Returns the scores of every interaction type, of shape (batch, interaction types, classes). The interaction type
+        column is not used.
+        """
+        out = self.encode(feature_tuples)
+
+        self.logger.debug("Running fc")
+        out = self.fc(out)
+        return out.view(out.shape[0], self.num_interaction_types, self._class_size)
@@ -4,6 +4,7 @@ import math
 import torch
 import torch.nn as nn
 
+from algorithms.BatchPositionEmbedder import BatchPositionEmbedder
 from algorithms.PositionEmbedder import PositionEmbedder
 
 
@@ -123,7 +124,10 @@ class RelationExtractorResnetCnnPosNetwork(nn.Module):
 
     @property
     def pos_embedder(self):
-        self.__pos_embedder__ = self.__pos_embedder__ or PositionEmbedder()
+        self.__pos_embedder__ = self.__pos_embedder__ or BatchPositionEmbedder()
+        # Models pickled with the per sentence PositionEmbedder
+        if isinstance(self.__pos_embedder__, PositionEmbedder):
+            self.__pos_embedder__ = BatchPositionEmbedder.from_position_embedder(self.__pos_embedder__)
         return self.__pos_embedder__
 
     def forward(self, feature_tuples):
@@ -142,23 +146,21 @@ class RelationExtractorResnetCnnPosNetwork(nn.Module):
         embeddings_with_pos = embeddings
         self.logger.debug("Executing pos embedding")
 
-        for f in range(len(feature_tuples)):
-            if f == self.text_column_index: continue
-
-            entity = feature_tuples[f]  # .transpose(0, 1)
-
-            # TODO: avoid this loop, use builtin
-            batch_pos_embedding_entity = []
-
-            for i, (t, e, sentence_embedding) in enumerate(zip(text_transposed, entity, embeddings)):
-                sentence_pos_embedding = self.pos_embedder(t, e[0])
-
-                # Set pos_embedding to zero when pad token ( indicated by zero embedding)
-                sentence_pos_embedding[torch.all(sentence_embedding.eq(0.0), dim=1)] = 0.0
-                batch_pos_embedding_entity.append(sentence_pos_embedding)
-
-            batch_pos_embedding_entity_tensor = torch.stack(batch_pos_embedding_entity).to(
-                device=embeddings_with_pos.device)
+        # Set pos_embedding to zero when pad token ( indicated by zero embedding)
+        pad_mask = torch.all(embeddings.eq(0.0), dim=2)
+
+        # Distances precomputed by TransformEntityDistance are appended after the feature columns
+        precomputed_distances = feature_tuples[len(self.feature_lengths):]
+        entity_columns = [f for f in range(len(self.feature_lengths)) if f != self.text_column_index]
+
+        for i, f in enumerate(entity_columns):
+            if len(precomputed_distances) > 0:
+                batch_pos_embedding_entity_tensor = self.pos_embedder.embed(precomputed_distances[i], pad_mask=pad_mask,
+                                                                            tokens=text_transposed)
+            else:
+                # The entity id is the first token of the entity column
+                entity = feature_tuples[f][:, 0]
+                batch_pos_embedding_entity_tensor = self.pos_embedder(text_transposed, entity, pad_mask=pad_mask)
 
             embeddings_with_pos = torch.cat([embeddings_with_pos, batch_pos_embedding_entity_tensor], dim=2)
 
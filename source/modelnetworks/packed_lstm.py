@@ -0,0 +1,36 @@
+import torch
+from torch.nn.utils.rnn import pack_padded_sequence, pad_packed_sequence
+
+"""
+Runs an LSTM over only the tokens of each sequence, so that the padding at the end is not processed
+"""
+
+
+def get_sequence_lengths(pad_mask):
+    """
+    Returns the number of tokens before the padding of each sequence
+    :param pad_mask: Bool tensor of shape (batch, seq_len), true at the padding positions
+    """
+    # Sequences that are all padding are run as a single step, as packing does not allow empty sequences
+    return (~pad_mask).long().sum(dim=1).clamp(min=1)
+
+
+def run_packed_lstm(lstm, inputs, lengths, total_length):
+    """
+    Returns the outputs of a batch first lstm, of shape (batch, total_length, num_directions * hidden_size), where the
+    outputs past the length of each sequence are zeros
+    :param lstm: A batch first nn.LSTM
+    :param inputs: Tensor of shape (batch, seq_len, input_size)
+    :param lengths: Tensor with the number of tokens in each sequence
+    :param total_length: The sequence length of the returned outputs
+    """
+    # Sort by length for packing, and restore the input order of the outputs after
+    sorted_lengths, sort_index = lengths.sort(descending=True)
+    inverse_index = torch.empty_like(sort_index)
+    inverse_index[sort_index] = torch.arange(len(sort_index), device=sort_index.device)
+
+    packed = pack_padded_sequence(inputs.index_select(0, sort_index), sorted_lengths.cpu(), batch_first=True)
+    packed_outputs, _ = lstm(packed)
+    outputs, _ = pad_packed_sequence(packed_outputs, batch_first=True, total_length=int(total_length))
+
+    return outputs.index_select(0, inverse_index)
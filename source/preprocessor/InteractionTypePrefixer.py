@@ -20,3 +20,13 @@ class InteractionTypePrefixer:
         row_x[self.col_to_transform] = "QUERY{} {}".format(row_x[self.prefixer_col_index], row_x[self.col_to_transform])
 
         return row_x
+
+    def transform_rows(self, rows):
+        """
+        Prefixes the column of a batch of rows
+        """
+        column = ["QUERY{} {}".format(r[self.prefixer_col_index], r[self.col_to_transform]) for r in rows]
+        for r, c in zip(rows, column):
+            r[self.col_to_transform] = c
+
+        return rows
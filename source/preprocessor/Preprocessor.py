@@ -16,3 +16,16 @@ class Preprocessor:
             transformed_row = p(transformed_row)
 
         return transformed_row
+
+    def transform_rows(self, rows):
+        """
+        Applies the transformations to a batch of rows. Each transformation with transform_rows transforms all the rows
+        at once, the others a row at a time
+        """
+        for p in self.preprocessors:
+            if hasattr(p, "transform_rows"):
+                rows = p.transform_rows(rows)
+            else:
+                rows = [p(r) for r in rows]
+
+        return rows
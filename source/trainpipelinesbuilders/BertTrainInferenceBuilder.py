@@ -8,8 +8,7 @@ from algorithms.DataPipeline import DataPipeline
 from algorithms.LabelPipeline import LabelPipeline
 from algorithms.bert_network_factory_locator import BertNetworkFactoryLocator
 from algorithms.loss_function_factory_locator import LossFunctionFactoryLocator
-from algorithms.transform_berttext_token_to_index import TransformBertTextTokenToIndex
-from algorithms.transform_berttext_tokenise import TransformBertTextTokenise
+from algorithms.transform_berttext_tokenise_to_index import TransformBertTextTokeniseToIndex
 from algorithms.transform_label_encoder import TransformLabelEncoder
 from algorithms.transform_label_rehaper import TransformLabelReshaper
 
@@ -47,15 +46,21 @@ class BertTrainInferenceBuilder:
         case_insensitive = False
         base_model_dir = self._get_value(self.additional_args, "pretrained_biobert_dir", None)
         assert base_model_dir is not None, "The value for pretrained_biobert_dir must be passed and must be a valid dir with biobert artifacts"
-        text_to_token = TransformBertTextTokenise(base_model_dir, max_feature_lens, case_insensitive)
 
-        # Token to id
-        token_to_index = TransformBertTextTokenToIndex(base_model_dir, case_insensitive,
-                                                       text_col_index=self.dataset.text_column_index)
+        # Pad each batch to its longest sequence, rather than to max_feature_lens, when the network supports it
+        model_factory = BertNetworkFactoryLocator().get_factory(self.network_factory_name)
+        default_dynamic_padding = "1" if model_factory.supports_dynamic_padding() else "0"
+        dynamic_padding = bool(int(self._get_value(self.additional_args, "dynamic_padding", default_dynamic_padding)))
+        assert not dynamic_padding or model_factory.supports_dynamic_padding(), \
+            "The network {} requires fixed length inputs, dynamic_padding must be 0".format(self.network_factory_name)
+
+        # Text to token ids in a single step
+        text_to_index = TransformBertTextTokeniseToIndex(base_model_dir, max_feature_lens, case_insensitive,
+                                                         text_col_index=self.dataset.text_column_index,
+                                                         dynamic_padding=dynamic_padding)
 
         data_pipeline = DataPipeline(text_to_index=None, preprocess_steps=None,
-                                     processing_steps=[("token_Totext", text_to_token)
-                                         , (("token_to_index", token_to_index))])
+                                     processing_steps=[("tokenise_to_index", text_to_index)])
 
         # Label pipeline
         class_size = self.dataset.class_size
@@ -66,7 +71,6 @@ class BertTrainInferenceBuilder:
         np_feature_lens = np.array(max_feature_lens)
 
         # network
-        model_factory = BertNetworkFactoryLocator().get_factory(self.network_factory_name)
         model = model_factory.get_network(embedding_dim=None, class_size=class_size, feature_lens=np_feature_lens,
                                           **self.additional_args)
 
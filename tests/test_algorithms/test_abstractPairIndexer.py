@@ -0,0 +1,122 @@
+import os
+from io import StringIO
+from unittest import TestCase
+
+import pandas as pd
+from ddt import ddt, data, unpack
+from torch.utils.data import DataLoader
+
+from algorithms.Collator import Collator
+from algorithms.DataPipeline import DataPipeline
+from algorithms.abstract_pair_indexer import AbstractPairIndexer
+from algorithms.transform_entity_distance import TransformEntityDistance
+from algorithms.transform_sentence_tokeniser import TransformSentenceTokenisor
+from algorithms.transform_text_index import TransformTextToIndex
+from datasets.ppi_dataset_factory import PpiDatasetFactory
+from datasets.ppi_multiclass_dataset_factory import PpiMulticlassDatasetFactory
+
+
+@ddt
+class TestAbstractPairIndexer(TestCase):
+
+    def _get_data_pipeline(self, dataset, max_text_len, case_insensitive):
+        text_to_index = TransformTextToIndex(max_feature_lens=[max_text_len, 1, 1], min_vocab_doc_frequency=1,
+                                             case_insensitive=case_insensitive,
+                                             special_words=dataset.entity_markers)
+        special_words_dict = text_to_index.get_specialwords_dict()
+        entity_distance = TransformEntityDistance(text_column_index=dataset.text_column_index, max_distance=10,
+                                                  entity_markers=[special_words_dict[e.lower() if case_insensitive
+                                                                                     else e]
+                                                                  for e in dataset.entity_markers])
+        sentence_tokenisor = TransformSentenceTokenisor(text_column_index=dataset.text_column_index,
+                                                        eos_token=TransformTextToIndex.eos_token(), splitter="rule")
+        data_pipeline = DataPipeline(text_to_index=text_to_index,
+                                     preprocess_steps=[("Sentence_tokenisor", sentence_tokenisor)],
+                                     processing_steps=[("text_to_index", text_to_index),
+                                                       ("entity_distance", entity_distance)])
+        data_pipeline.fit(DataLoader(dataset, batch_size=32, collate_fn=Collator()))
+        return data_pipeline
+
+    def _assert_same_batches(self, expected, actual):
+        self.assertEqual(len(expected), len(actual))
+        for (e_x, e_y), (a_x, a_y) in zip(expected, actual):
+            self.assertEqual(e_y, a_y)
+            self.assertEqual([c.tolist() for c in e_x], [c.tolist() for c in a_x])
+
+    @data((250, True)
+        , (20, True)
+        , (250, False))
+    @unpack
+    def test_iter_transform_matches_data_pipeline(self, max_text_len, case_insensitive):
+        # Arrange
+        file_path = os.path.join(os.path.dirname(__file__), "..", "data", "sample_train_multiclass.json")
+        masked_dataset = PpiMulticlassDatasetFactory().get_dataset(file_path)
+        data_pipeline = self._get_data_pipeline(masked_dataset, max_text_len, case_insensitive)
+        expected = list(data_pipeline.iter_transform(DataLoader(masked_dataset, batch_size=32, collate_fn=Collator())))
+
+        dataset = PpiMulticlassDatasetFactory(materialise=False).get_dataset(file_path)
+        sut = AbstractPairIndexer.from_dataset(dataset, data_pipeline)
+
+        # Act
+        actual = list(sut.iter_transform(dataset))
+
+        # Assert
+        self._assert_same_batches(expected, actual)
+
+    def test_iter_transform_pairs_masked_on_their_own(self):
+        # Arrange
+        abstract = "KLK3 binds KLK and CDK2. p53 and KLK3 bind Co. The CDK2-like KLK3 kinase MAPK1 phosphorylates " \
+                   "KLK3. MAPK1 binds p53"
+        records = [{"normalised_abstract": abstract, "participant1Id": p1, "participant2Id": p2, "class": "other"}
+                   # From left to right: whole word names, a name in another name, a lower case name that starts a
+                   # sentence, an abbreviation that ends a sentence, a hyphenated name, names that start and end a
+                   # sentence, a pair of the same name and a name that is not in the abstract
+                   for p1, p2 in [("KLK3", "MAPK1"), ("KLK3", "KLK"), ("p53", "KLK3"), ("Co", "MAPK1"),
+                                  ("MAPK1", "CDK2"), ("CDK2", "MAPK1"), ("KLK3", "KLK3"), ("MAPK1", "Q15257")]]
+        json = pd.DataFrame(records).to_json(orient="records")
+
+        masked_dataset = PpiMulticlassDatasetFactory().get_dataset(StringIO(json))
+        data_pipeline = self._get_data_pipeline(masked_dataset, 250, True)
+        expected = list(data_pipeline.iter_transform(DataLoader(masked_dataset, batch_size=4, collate_fn=Collator())))
+
+        dataset = PpiMulticlassDatasetFactory(materialise=False).get_dataset(StringIO(json))
+        sut = AbstractPairIndexer.from_dataset(dataset, data_pipeline, batch_size=4)
+
+        # Act
+        actual = list(sut.iter_transform(dataset))
+
+        # Assert
+        self._assert_same_batches(expected, actual)
+
+    def test_iter_transform_batch_indices(self):
+        # Arrange
+        file_path = os.path.join(os.path.dirname(__file__), "..", "data", "sample_train_multiclass.json")
+        masked_dataset = PpiMulticlassDatasetFactory().get_dataset(file_path)
+        data_pipeline = self._get_data_pipeline(masked_dataset, 250, True)
+        batch_indices = [[3, 1, 2], [0, 5], [4]]
+        expected = list(data_pipeline.iter_transform(DataLoader(masked_dataset, batch_sampler=batch_indices,
+                                                                collate_fn=Collator())))
+
+        dataset = PpiMulticlassDatasetFactory(materialise=False).get_dataset(file_path)
+        sut = AbstractPairIndexer.from_dataset(dataset, data_pipeline)
+
+        # Act
+        actual = list(sut.iter_transform(dataset, batch_indices))
+
+        # Assert
+        self._assert_same_batches(expected, actual)
+
+    @data((PpiMulticlassDatasetFactory(), "sample_train_multiclass.json")
+        , (PpiDatasetFactory(materialise=False), "sample_train.json"))
+    @unpack
+    def test_from_dataset_not_supported(self, dataset_factory, data_file):
+        # Arrange
+        file_path = os.path.join(os.path.dirname(__file__), "..", "data", data_file)
+        dataset = dataset_factory.get_dataset(file_path)
+        data_pipeline = DataPipeline(text_to_index=TransformTextToIndex(max_feature_lens=dataset.feature_lens))
+
+        # Act
+        actual = AbstractPairIndexer.from_dataset(dataset, data_pipeline)
+
+        # Assert
+        self.assertIsNone(actual)
@@ -0,0 +1,102 @@
+from unittest import TestCase
+
+import numpy as np
+import torch
+from ddt import ddt, data, unpack
+
+from algorithms.BatchPositionEmbedder import BatchPositionEmbedder
+from algorithms.PositionEmbedder import PositionEmbedder
+
+
+@ddt
+class TestBatchPositionEmbedder(TestCase):
+
+    @data(([[0, 3, 4, 0], [5, 6, 7, 8]], 0, 30)
+        , ([[0, 1, 2, 3, 4, 5], [5, 4, 3, 2, 1, 0]], 0, 3)
+        , ([[1, 1, 1, 1, 99, 99]], 1, 2)
+        , ([[1, 2, 3]], 20, 2)
+          )
+    @unpack
+    def test__call__matches_position_embedder(self, tokens, entity, max_pos):
+        """
+Tests the batch embedding is the same as embedding each sentence separately
+        """
+        # Arrange
+        pos_dim = 2
+        position_embeddings = torch.from_numpy(np.random.uniform(0, 1, (max_pos, pos_dim))).float()
+        tokens_tensor = torch.tensor(tokens)
+
+        expected = torch.stack([PositionEmbedder(embeddings=position_embeddings.clone())(t, entity)
+                                for t in tokens_tensor])
+
+        sut = BatchPositionEmbedder(embeddings=position_embeddings)
+
+        # Act
+        actual = sut(tokens_tensor, entity)
+
+        # Assert
+        self.assertEqual(expected.shape, actual.shape)
+        self.assertTrue(torch.allclose(expected, actual))
+
+    def test__call__entity_per_row(self):
+        """
+Tests case where each row has a different entity
+        """
+        # Arrange
+        max_pos = 3
+        pos_dim = 2
+        position_embeddings = torch.from_numpy(np.random.uniform(0, 1, (max_pos, pos_dim))).float()
+        tokens = torch.tensor([[7, 0, 0, 0], [0, 0, 0, 8]])
+        entities = torch.tensor([7, 8])
+
+        expected = torch.stack([position_embeddings[[0, 1, 2, 2]], position_embeddings[[2, 2, 1, 0]]])
+
+        sut = BatchPositionEmbedder(embeddings=position_embeddings)
+
+        # Act
+        actual = sut(tokens, entities)
+
+        # Assert
+        self.assertTrue(torch.allclose(expected, actual))
+
+    def test_embed_pad_token_id(self):
+        """
+Tests the pad token positions are zeroed when embedding precomputed distances, as in __call__
+        """
+        # Arrange
+        max_pos = 3
+        pos_dim = 2
+        position_embeddings = torch.from_numpy(np.random.uniform(0, 1, (max_pos, pos_dim))).float()
+        tokens = torch.tensor([[7, 5, 0, 0], [5, 7, 5, 0]])
+
+        sut = BatchPositionEmbedder(embeddings=position_embeddings, pad_token_id=0)
+        expected = sut(tokens, 7)
+
+        # Act
+        actual = sut.embed(sut.distances(tokens, 7), tokens=tokens)
+
+        # Assert
+        self.assertTrue(torch.allclose(expected, actual))
+        self.assertTrue(torch.all(actual[0, 2:].eq(0.0)))
+
+    def test__call__pad_mask(self):
+        """
+Tests case where the pad mask is passed
+        """
+        # Arrange
+        max_pos = 3
+        pos_dim = 2
+        position_embeddings = torch.from_numpy(np.random.uniform(0, 1, (max_pos, pos_dim))).float()
+        tokens = torch.tensor([[7, 0, 0, 0]])
+        pad_mask = torch.tensor([[False, False, True, True]])
+
+        expected = torch.stack([position_embeddings[[0, 1, 2, 2]]])
+        expected[0, 2:] = 0.0
+
+        sut = BatchPositionEmbedder(embeddings=position_embeddings)
+
+        # Act
+        actual = sut(tokens, 7, pad_mask=pad_mask)
+
+        # Assert
+        self.assertTrue(torch.allclose(expected, actual))
@@ -0,0 +1,71 @@
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from ddt import ddt, data, unpack
+
+from algorithms.bucket_batch_sampler import BucketBatchSampler
+from datasets.PpiDataset import PPIDataset
+
+
+@ddt
+class TestBucketBatchSampler(TestCase):
+
+    @data((10, 3, True)
+        , (10, 3, False)
+        , (9, 3, True)
+        , (1, 4, True))
+    @unpack
+    def test___iter__all_records_once(self, num_records, batch_size, shuffle):
+        # Arrange
+        lengths = [(i * 7) % 5 for i in range(num_records)]
+        sut = BucketBatchSampler(lengths, batch_size, shuffle=shuffle, bucket_size_multiplier=2, seed=1)
+
+        # Act
+        actual = list(sut)
+
+        # Assert
+        self.assertEqual(len(sut), len(actual))
+        self.assertSequenceEqual(list(range(num_records)), sorted([i for b in actual for i in b]))
+        self.assertTrue(all([len(b) <= batch_size for b in actual]))
+
+    def test___iter__similar_lengths_batched(self):
+        # Arrange
+        lengths = [1, 100, 2, 101, 3, 102]
+        sut = BucketBatchSampler(lengths, batch_size=3, shuffle=False)
+
+        # Act
+        actual = list(sut)
+
+        # Assert
+        self.assertSequenceEqual([[0, 2, 4], [1, 3, 5]], actual)
+
+    def test_from_dataset(self):
+        # Arrange
+        dataset = [(["short", "P1"], "yes"), (["a much longer sentence", "P1"], "no"), (["tiny", "P2"], "no")]
+
+        # Act
+        sut = BucketBatchSampler.from_dataset(dataset, text_column_index=0, batch_size=2, shuffle=False)
+
+        # Assert
+        self.assertSequenceEqual([[2, 0], [1]], list(sut))
+
+    def test_from_dataset_reads_text_without_transformer(self):
+        # Arrange
+        data_df = pd.DataFrame({"pubmedId": ["1", "2", "3"],
+                                "interactionType": ["phosphorylation"] * 3,
+                                "participant1Id": ["P1"] * 3,
+                                "participant2Id": ["P2"] * 3,
+                                "normalised_abstract": ["short", "a much longer sentence", "tiny"],
+                                "isValid": [True, False, False]})
+        transformer = MagicMock(side_effect=lambda x: x)
+        dataset = PPIDataset(data_df, transformer=transformer)
+
+        # Act
+        sut = BucketBatchSampler.from_dataset(dataset, text_column_index=dataset.text_column_index, batch_size=2,
+                                              shuffle=False)
+
+        # Assert
+        self.assertSequenceEqual([[2, 0], [1]], list(sut))
+        transformer.assert_not_called()
@@ -0,0 +1,121 @@
+import os
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pandas as pd
+from ddt import ddt, data, unpack
+
+from datasets.PpiAimedDataset import PpiAimedDataset
+from datasets.PpiAimedDatasetYlhsieh import PpiAimedDatasetYlhsieh
+from datasets.PpiDataset import PPIDataset
+from datasets.PpiMulticlassDataset import PpiMulticlassDataset
+from datasets.custom_dataset_base import CustomDatasetBase
+from datasets.interaction_dataset import InteractionDataset
+from datasets.ppi_aimed_dataset_factory import PpiAimedDatasetFactory
+from datasets.ppi_dataset_factory import PpiDatasetFactory
+from preprocessor.Preprocessor import Preprocessor
+
+
+@ddt
+class TestCustomDatasetBase(TestCase):
+
+    @data((PPIDataset, "sample_train.json",
+           ["normalised_abstract", "participant1Id", "participant2Id", "interactionType"], "isValid")
+        , (PpiMulticlassDataset, "sample_train_multiclass.json",
+           ["normalised_abstract", "participant1Id", "participant2Id"], "class")
+        , (InteractionDataset, "sample_classification.json", ["pubmedabstract"], "interactionType")
+        , (PpiAimedDatasetYlhsieh, "AIMedtrain_sample_Ylhsieh.json", ["text"], "isValid"))
+    @unpack
+    def test___getitem__matches_dataframe_row(self, dataset_class, data_file, feature_columns, label_column):
+        # Arrange
+        file_path = os.path.join(os.path.dirname(__file__), "..", "data", data_file)
+        data_df = pd.read_json(file_path)
+        sut = dataset_class(file_path)
+
+        # Act
+        actual = [sut[i] for i in range(len(sut))]
+
+        # Assert
+        labels = np.reshape(data_df[[label_column]].values.tolist(), (-1,))
+        expected = [(data_df[feature_columns].iloc[i, :].tolist(), labels[i].tolist())
+                    for i in range(data_df.shape[0])]
+        self.assertEqual(expected, actual)
+
+    @data(PPIDataset, PpiMulticlassDataset, PpiAimedDataset)
+    def test___getitems__matches_getitem(self, dataset_class):
+        # Arrange
+        data_file = {PPIDataset: "sample_train.json", PpiMulticlassDataset: "sample_train_multiclass.json",
+                     PpiAimedDataset: "Aimedsample.json"}[dataset_class]
+        sut = dataset_class(os.path.join(os.path.dirname(__file__), "..", "data", data_file))
+        indices = list(reversed(range(len(sut))))[0:5]
+
+        # Act
+        actual = sut.__getitems__(indices)
+
+        # Assert
+        self.assertEqual([sut[i] for i in indices], actual)
+
+    def test___getitem__no_labels(self):
+        # Arrange
+        data_df = pd.DataFrame({"passage": ["Sample text KLK3", "Sample text2"]})
+        sut = PpiAimedDatasetYlhsieh(data_df.rename(columns={"passage": "text"}))
+
+        # Act
+        actual = sut.__getitems__([0, 1])
+
+        # Assert
+        self.assertEqual([(["Sample text KLK3"], -1), (["Sample text2"], -1)], actual)
+
+    @data((PpiDatasetFactory, "sample_train.json", 1)
+        , (PpiDatasetFactory, "sample_train.json", 2)
+        , (PpiAimedDatasetFactory, "Aimedsample.json", 1)
+        , (PpiAimedDatasetFactory, "Aimedsample.json", 2))
+    @unpack
+    def test_materialise_matches_transformer(self, factory_class, data_file, preprocess_workers):
+        # Arrange
+        file_path = os.path.join(os.path.dirname(__file__), "..", "data", data_file)
+        # The rows transformed on every read, as before materialise
+        with patch.object(CustomDatasetBase, "materialise"):
+            expected_dataset = factory_class().get_dataset(file_path)
+
+        sut = factory_class(preprocess_workers=preprocess_workers)
+
+        # Act
+        actual = sut.get_dataset(file_path)
+
+        # Assert
+        indices = list(range(len(actual)))
+        self.assertEqual([expected_dataset[i] for i in indices], [actual[i] for i in indices])
+        self.assertEqual([expected_dataset[i] for i in indices], actual.__getitems__(indices))
+        # Reading the rows again returns the same masked rows
+        self.assertEqual(actual.__getitems__(indices), actual.__getitems__(indices))
+
+    def test_materialise_transformer_called_once_per_row(self):
+        # Arrange
+        data_df = pd.DataFrame({"text": ["Sample KLK3 text", "Sample text2"], "isValid": [True, False]})
+        sut = PpiAimedDatasetYlhsieh(data_df)
+        sut.transformer = MagicMock(side_effect=lambda x: x)
+
+        # Act
+        sut.materialise()
+        sut.__getitems__([0, 1])
+        sut.__getitems__([1, 0])
+
+        # Assert
+        self.assertEqual(2, sut.transformer.call_count)
+
+    def test_materialise_transforms_rows_at_once(self):
+        # Arrange
+        file_path = os.path.join(os.path.dirname(__file__), "..", "data", "sample_train.json")
+        sut = PPIDataset(file_path)
+        sut.transformer = MagicMock(spec=Preprocessor, side_effect=lambda x: x,
+                                    transform_rows=MagicMock(side_effect=lambda rows: rows))
+
+        # Act
+        sut.materialise()
+
+        # Assert
+        sut.transformer.transform_rows.assert_called_once()
+        self.assertEqual(len(sut), len(sut.transformer.transform_rows.call_args[0][0]))
+        sut.transformer.assert_not_called()
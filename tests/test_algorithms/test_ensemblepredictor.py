@@ -1,6 +1,9 @@
 from unittest import TestCase
 from unittest.mock import MagicMock
 
+import numpy as np
+import torch
+
 from algorithms.ensemble_predictor import EnsemblePredictor
 
 
@@ -27,8 +30,8 @@ class TestEnsemblePredictor(TestCase):
         actual_predictions, actual_confidence = sut.predict(models, input)
 
         # Assert
-        self.assertSequenceEqual(predictions, actual_predictions)
-        self.assertSequenceEqual(confidence_scores, actual_confidence)
+        self.assertSequenceEqual(predictions, [b.tolist() for b in actual_predictions])
+        self.assertSequenceEqual(confidence_scores, [b.tolist() for b in actual_confidence])
 
     def test_predict_2(self):
         """
@@ -53,8 +56,8 @@ class TestEnsemblePredictor(TestCase):
         actual_predictions, actual_confidence = sut.predict(models, input)
 
         # Assert
-        self.assertSequenceEqual(predictions, actual_predictions)
-        self.assertSequenceEqual(confidence_scores, actual_confidence)
+        self.assertSequenceEqual(predictions, [b.tolist() for b in actual_predictions])
+        self.assertSequenceEqual(confidence_scores, [b.tolist() for b in actual_confidence])
 
     def test_predict_2_different_confidence(self):
         """
@@ -88,8 +91,8 @@ class TestEnsemblePredictor(TestCase):
         actual_predictions, actual_confidence = sut.predict(models, input)
 
         # Assert
-        self.assertSequenceEqual(predictions, actual_predictions)
-        self.assertSequenceEqual(expected_confidence_scores, actual_confidence)
+        self.assertSequenceEqual(predictions, [b.tolist() for b in actual_predictions])
+        self.assertSequenceEqual(expected_confidence_scores, [b.tolist() for b in actual_confidence])
 
     def test_predict_2_different_confidence_multiple_batch(self):
         """
@@ -123,5 +126,89 @@ class TestEnsemblePredictor(TestCase):
         actual_predictions, actual_confidence = sut.predict(models, input)
 
         # Assert
-        self.assertSequenceEqual(predictions, actual_predictions)
-        self.assertSequenceEqual(expected_confidence_scores, actual_confidence)
+        self.assertSequenceEqual(predictions, [b.tolist() for b in actual_predictions])
+        self.assertSequenceEqual(expected_confidence_scores, [b.tolist() for b in actual_confidence])
+
+    def test_predict_2_different_confidence_iterator(self):
+        """
+        Case where the batches can only be read once, so each batch is run through all the models in turn
+        """
+        # Arrange
+        batches = iter([["batch1"], ["batch2"]])
+        confidence_scores_1 = {"batch1": [[0.0, 1]], "batch2": [[1.0, 0.0]]}
+        confidence_scores_2 = {"batch1": [[0.05, .95]], "batch2": [[.80, 0.2]]}
+
+        expected_predictions = [[1], [0]]
+        expected_confidence_scores = [[[0.05 / 2, 1.95 / 2]], [[1.8 / 2, 0.2 / 2]]]
+
+        mock_model_1 = MagicMock()
+        mock_model_2 = MagicMock()
+
+        models = [mock_model_1, mock_model_2]
+
+        # mock predictor
+        mock_model_wrapper = MagicMock()
+
+        def mock_model_wrapper_call(m, d, h):
+            scores = confidence_scores_1 if m == mock_model_1 else confidence_scores_2
+            return None, [scores[b[0]] for b in d]
+
+        mock_model_wrapper.predict.side_effect = mock_model_wrapper_call
+
+        sut = EnsemblePredictor(model_wrapper=mock_model_wrapper)
+
+        # Act
+        actual_predictions, actual_confidence = sut.predict(models, batches)
+
+        # Assert
+        self.assertSequenceEqual(expected_predictions, [b.tolist() for b in actual_predictions])
+        self.assertSequenceEqual(expected_confidence_scores, [b.tolist() for b in actual_confidence])
+
+    def test_predict_2_tensor_scores(self):
+        """
+        Case where the members return score tensors for each batch, as the Predictor does
+        """
+        # Arrange
+        confidence_scores_1 = [torch.tensor([[0.0, 1.0], [1.0, 0.0]]), torch.tensor([[0.5, 0.5]])]
+        confidence_scores_2 = [torch.tensor([[0.5, 0.5], [0.5, 0.5]]), torch.tensor([[0.0, 1.0]])]
+
+        expected_predictions = [[1, 0], [1]]
+        expected_confidence_scores = [[[0.25, 0.75], [0.75, 0.25]], [[0.25, 0.75]]]
+
+        mock_model_1 = MagicMock()
+        mock_model_2 = MagicMock()
+
+        mock_model_wrapper = MagicMock()
+        mock_model_wrapper.predict.side_effect = lambda m, d, h: (
+            None, confidence_scores_1 if m == mock_model_1 else confidence_scores_2)
+
+        sut = EnsemblePredictor(model_wrapper=mock_model_wrapper)
+
+        # Act
+        actual_predictions, actual_confidence = sut.predict([mock_model_1, mock_model_2], input)
+
+        # Assert
+        self.assertTrue(all(isinstance(b, np.ndarray) for b in actual_predictions + actual_confidence))
+        self.assertSequenceEqual(expected_predictions, [b.tolist() for b in actual_predictions])
+        self.assertSequenceEqual(expected_confidence_scores, [b.tolist() for b in actual_confidence])
+
+    def test_predict_cpu_workers(self):
+        """
+        Case where the ensemble members are run in forked cpu processes
+        """
+        # Arrange
+        torch.manual_seed(1)
+        models = [torch.nn.Linear(3, 2), torch.nn.Linear(3, 2), torch.nn.Linear(3, 2)]
+        batches = [[torch.rand(4, 3), [0] * 4], [torch.rand(2, 3), [0] * 2]]
+
+        expected_predictions, expected_confidence = EnsemblePredictor().predict(models, batches, device="cpu")
+
+        sut = EnsemblePredictor(cpu_workers=2)
+
+        # Act
+        actual_predictions, actual_confidence = sut.predict(models, iter(batches))
+
+        # Assert
+        self.assertSequenceEqual([b.tolist() for b in expected_predictions], [b.tolist() for b in actual_predictions])
+        for e, a in zip(expected_confidence, actual_confidence):
+            self.assertTrue(torch.tensor(e).allclose(torch.tensor(a)))
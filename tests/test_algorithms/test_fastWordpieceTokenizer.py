@@ -0,0 +1,73 @@
+import os
+import pickle
+import tempfile
+from unittest import TestCase
+
+from ddt import ddt, data, unpack
+from pytorch_pretrained_bert import BertTokenizer
+
+from algorithms.fast_wordpiece_tokenizer import FastWordpieceTokenizer
+from algorithms.transform_berttext_tokenise import TransformBertTextTokenise
+
+
+@ddt
+class TestFastWordpieceTokenizer(TestCase):
+
+    def setUp(self):
+        self.model_dir = tempfile.mkdtemp()
+        vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "PR", "##OT", "##EI", "##N", "##1", "##2", "p", "##hop",
+                 "##hor", "##yla", "##tes", "phos", "this", "is", "a", "map", ".", ",", "(", ")", "un", "##aff",
+                 "##able", "##a", "##ab", "##abl", "kinase", "##s", "PROTEIN1"]
+        with open(os.path.join(self.model_dir, "vocab.txt"), "w") as f:
+            f.write("\n".join(vocab))
+            f.write("\n")
+
+    @data(("This is a map PROTEIN1. PROTEIN1 phophorylates PROTEIN2", False)
+        , ("this is a map PROTEIN1. PROTEIN1 phophorylates PROTEIN2", True)
+        , ("unaffable kinases (unaffabl) xyz", False)
+        , ("  ", False)
+        , ("", False)
+        , ("[SEP] [PAD] unknownword" + "a" * 120, False))
+    @unpack
+    def test_tokenize_matches_bert_tokenizer(self, text, case_insensitive):
+        # Arrange
+        bert_tokeniser = BertTokenizer.from_pretrained(self.model_dir, do_lower_case=case_insensitive)
+        sut = FastWordpieceTokenizer(bert_tokeniser)
+
+        expected = bert_tokeniser.tokenize(text)
+
+        # Act
+        actual = sut.tokenize(text)
+
+        # Assert
+        self.assertSequenceEqual(expected, actual)
+
+    def test_tokenize_memoizes_repeated_text(self):
+        # Arrange
+        bert_tokeniser = BertTokenizer.from_pretrained(self.model_dir, do_lower_case=False)
+        sut = FastWordpieceTokenizer(bert_tokeniser, memo_size=1)
+        text = "this is a map"
+
+        # Act
+        first = sut.tokenize(text)
+        first.append("mutated")
+        second = sut.tokenize(text)
+        sut.tokenize("unaffable")
+        sut.tokenize(text)
+
+        # Assert
+        self.assertSequenceEqual(["this", "is", "a", "map"], second)
+        self.assertEqual(1, sut.memo_hits)
+        self.assertEqual(3, sut.memo_misses)
+
+    def test_pickle_transform_excludes_tokenizer(self):
+        # Arrange
+        transform = TransformBertTextTokenise(self.model_dir, [10], dynamic_padding=True)
+        expected = pickle.dumps(transform)
+        transform.fit_transform([[[["this is a map"]], ["yes"]]])
+
+        # Act
+        actual = pickle.dumps(transform)
+
+        # Assert
+        self.assertEqual(expected, actual)
@@ -0,0 +1,164 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+import torch
+
+from algorithms.DataPipeline import DataPipeline
+from algorithms.feature_cache import FeatureCache
+from algorithms.transform_sentence_tokeniser import TransformSentenceTokenisor
+from algorithms.transform_text_index import TransformTextToIndex
+
+
+class TestFeatureCache(TestCase):
+
+    def test_call_warm_run_loads_cache(self):
+        # Arrange
+        cache_dir = tempfile.mkdtemp()
+        data_file = os.path.join(cache_dir, "data.json")
+        with open(data_file, "w") as f:
+            f.write('[{"abstract": "This is sample text"}]')
+
+        dataset = _FileDataset(data_file, num_rows=3)
+        batches = [[[torch.tensor([[1, 2, 3], [4, 5, 6]]), torch.tensor([[7], [8]])], ["yes", "no"]],
+                   [[torch.tensor([[9, 10, 11]]), torch.tensor([[12]])], ["no"]]]
+
+        sut = FeatureCache(cache_dir)
+        transform_func = MagicMock(return_value=batches)
+
+        # Act
+        sut(dataset, {"vocab": 1}, transform_func)
+        actual = sut(dataset, {"vocab": 1}, transform_func)
+
+        # Assert
+        self.assertEqual(1, transform_func.call_count)
+        self.assertEqual(len(batches), len(actual))
+        for (e_x, e_y), (a_x, a_y) in zip(batches, actual):
+            self.assertEqual(len(e_x), len(a_x))
+            for e, a in zip(e_x, a_x):
+                self.assertTrue(e.equal(a), "Expected {}, but found {}".format(e, a))
+            self.assertSequenceEqual(e_y, a_y)
+
+    def test_call_variable_width_batches(self):
+        # Arrange
+        cache_dir = tempfile.mkdtemp()
+        data_file = os.path.join(cache_dir, "data.json")
+        with open(data_file, "w") as f:
+            f.write('[{"abstract": "This is sample text"}]')
+
+        dataset = _FileDataset(data_file, num_rows=3)
+        batches = [[torch.tensor([[1, 2], [4, 5]]), ["yes", "no"]],
+                   [torch.tensor([[9, 10, 11, 0]]), ["no"]]]
+
+        sut = FeatureCache(cache_dir)
+        transform_func = MagicMock(return_value=batches)
+
+        # Act
+        sut(dataset, {"vocab": 1}, transform_func)
+        actual = sut(dataset, {"vocab": 1}, transform_func)
+
+        # Assert
+        self.assertEqual(1, transform_func.call_count)
+        for (e_x, e_y), (a_x, a_y) in zip(batches, actual):
+            self.assertTrue(e_x.equal(a_x), "Expected {}, but found {}".format(e_x, a_x))
+            self.assertSequenceEqual(e_y, a_y)
+
+    def test_call_warm_run_not_copied(self):
+        # Arrange
+        cache_dir = tempfile.mkdtemp()
+        data_file = os.path.join(cache_dir, "data.json")
+        with open(data_file, "w") as f:
+            f.write('[{"abstract": "This is sample text"}]')
+
+        dataset = _FileDataset(data_file, num_rows=3)
+        batches = [[torch.tensor([[1, 2], [4, 5]]), ["yes", "no"]],
+                   [torch.tensor([[9, 10, 11, 0]]), ["no"]]]
+
+        sut = FeatureCache(cache_dir)
+        sut(dataset, {"vocab": 1}, MagicMock(return_value=batches))
+
+        # Act
+        actual = sut(dataset, {"vocab": 1}, MagicMock(return_value=batches))
+
+        # Assert, each read of a batch is a view of the same memory mapped features
+        for i in range(len(batches)):
+            first_read, second_read = actual[i][0], actual[i][0]
+            self.assertEqual(torch.int64, first_read.dtype)
+            self.assertEqual(first_read.data_ptr(), second_read.data_ptr())
+
+    def test_call_pipeline_change_invalidates_cache(self):
+        # Arrange
+        cache_dir = tempfile.mkdtemp()
+        data_file = os.path.join(cache_dir, "data.json")
+        with open(data_file, "w") as f:
+            f.write('[{"abstract": "This is sample text"}]')
+
+        dataset = _FileDataset(data_file, num_rows=1)
+        batches = [[torch.tensor([[1, 2, 3]]), ["yes"]]]
+
+        sut = FeatureCache(cache_dir)
+        transform_func = MagicMock(return_value=batches)
+
+        # Act
+        sut(dataset, {"vocab": 1}, transform_func)
+        sut(dataset, {"vocab": 2}, transform_func)
+
+        # Assert
+        self.assertEqual(2, transform_func.call_count)
+
+    def test_get_key_ignores_worker_settings(self):
+        # Arrange
+        cache_dir = tempfile.mkdtemp()
+        data_file = os.path.join(cache_dir, "data.json")
+        with open(data_file, "w") as f:
+            f.write('[{"abstract": "This is sample text"}]')
+
+        dataset = _FileDataset(data_file, num_rows=1)
+        pipeline = DataPipeline(text_to_index=TransformTextToIndex(max_feature_lens=[10], vocab_dict={"a": 0}),
+                                preprocess_steps=[("sentence", TransformSentenceTokenisor(text_column_index=0))])
+        parallel_pipeline = DataPipeline(
+            text_to_index=TransformTextToIndex(max_feature_lens=[10], vocab_dict={"a": 0}, vocab_workers=4,
+                                               index_workers=4),
+            preprocess_steps=[("sentence", TransformSentenceTokenisor(text_column_index=0, n_process=4,
+                                                                      batch_size=10))])
+        other_pipeline = DataPipeline(text_to_index=TransformTextToIndex(max_feature_lens=[20], vocab_dict={"a": 0}),
+                                      preprocess_steps=[("sentence", TransformSentenceTokenisor(text_column_index=0))])
+
+        sut = FeatureCache(cache_dir)
+
+        # Act
+        actual = sut.get_key(dataset, pipeline)
+
+        # Assert
+        self.assertEqual(actual, sut.get_key(dataset, parallel_pipeline))
+        self.assertNotEqual(actual, sut.get_key(dataset, other_pipeline))
+
+    def test_call_no_file_not_cached(self):
+        # Arrange
+        cache_dir = tempfile.mkdtemp()
+        dataset = _FileDataset(None, num_rows=1)
+        batches = [[torch.tensor([[1, 2, 3]]), ["yes"]]]
+
+        sut = FeatureCache(cache_dir)
+        transform_func = MagicMock(return_value=batches)
+
+        # Act
+        sut(dataset, {"vocab": 1}, transform_func)
+        actual = sut(dataset, {"vocab": 1}, transform_func)
+
+        # Assert
+        self.assertEqual(2, transform_func.call_count)
+        self.assertEqual(batches, actual)
+        self.assertEqual([], os.listdir(cache_dir))
+
+
+class _FileDataset:
+
+    def __init__(self, file_path, num_rows):
+        self.file_path = file_path
+        self.transformer = None
+        self.num_rows = num_rows
+
+    def __len__(self):
+        return self.num_rows
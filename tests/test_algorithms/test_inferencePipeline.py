@@ -0,0 +1,35 @@
+from unittest import TestCase
+
+import pandas as pd
+
+from algorithms.InferencePipeline import InferencePipeline
+
+
+class TestInferencePipeline(TestCase):
+
+    def test_filter_threshold(self):
+        # Arrange
+        df = pd.DataFrame({"predicted": ["phosphorylation", "other", "acetylation", "phosphorylation"],
+                           "predicted_confidence": [0.9, 0.95, 0.4, 0.6]})
+
+        sut = InferencePipeline()
+
+        # Act
+        actual = sut._filter_threshold(df, 0.5, lambda x: x != "other", confidence_score_field="predicted_confidence",
+                                       predicted_field="predicted")
+
+        # Assert
+        self.assertSequenceEqual([0, 3], actual.index.tolist())
+
+    def test_filter_threshold_zero(self):
+        # Arrange
+        df = pd.DataFrame({"predicted": ["other"], "predicted_confidence": [0.9]})
+
+        sut = InferencePipeline()
+
+        # Act
+        actual = sut._filter_threshold(df, 0.0, lambda x: x != "other", confidence_score_field="predicted_confidence",
+                                       predicted_field="predicted")
+
+        # Assert
+        self.assertEqual(1, len(actual))
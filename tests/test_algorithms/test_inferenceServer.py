@@ -0,0 +1,155 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from unittest import TestCase
+from unittest.mock import MagicMock
+
+from ddt import ddt, data
+
+from algorithms.inference_server import MicroBatcher, InferenceServer
+
+
+@ddt
+class TestInferenceServer(TestCase):
+
+    def test_micro_batcher_combines_concurrent_requests(self):
+        # Arrange
+        predict_func = MagicMock(side_effect=lambda records: ([r["id"] for r in records],
+                                                              [{True: 0.9, False: 0.1} for _ in records]))
+        sut = MicroBatcher(predict_func, max_batch_size=4, max_latency_ms=500)
+        sut.start()
+
+        results = {}
+
+        def submit(i):
+            results[i] = sut([{"id": i}, {"id": i * 10}])
+
+        # Act
+        threads = [threading.Thread(target=submit, args=(i,)) for i in range(1, 3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        sut.stop()
+
+        # Assert
+        self.assertEqual(1, predict_func.call_count)
+        self.assertSequenceEqual([1, 10], [p for p, _ in results[1]])
+        self.assertSequenceEqual([2, 20], [p for p, _ in results[2]])
+        self.assertEqual(2, sut.stats()["requests"])
+        self.assertIn("latency_p99_ms", sut.stats())
+
+    def test_micro_batcher_error(self):
+        # Arrange
+        predict_func = MagicMock(side_effect=ValueError("Bad record"))
+        sut = MicroBatcher(predict_func, max_latency_ms=1)
+        sut.start()
+
+        # Act
+        with self.assertRaises(ValueError):
+            sut([{"id": 1}])
+        sut.stop()
+
+    def test_micro_batcher_bad_record_fails_its_own_request(self):
+        # Arrange
+        def predict(records):
+            if any(r["id"] < 0 for r in records):
+                raise ValueError("Bad record")
+            return [r["id"] for r in records], [{True: 0.9, False: 0.1} for _ in records]
+
+        sut = MicroBatcher(predict, max_batch_size=4, max_latency_ms=500)
+        sut.start()
+
+        results = {}
+
+        def submit(i):
+            try:
+                results[i] = [p for p, _ in sut([{"id": i}])]
+            except ValueError as e:
+                results[i] = e
+
+        # Act
+        threads = [threading.Thread(target=submit, args=(i,)) for i in [1, -1, 2]]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        sut.stop()
+
+        # Assert
+        self.assertEqual([1], results[1])
+        self.assertEqual([2], results[2])
+        self.assertIsInstance(results[-1], ValueError)
+
+    def test_micro_batcher_keeps_running_after_invalid_request(self):
+        # Arrange
+        predict_func = lambda records: ([True for _ in records], [{True: 0.9, False: 0.1} for _ in records])
+        sut = MicroBatcher(predict_func, max_latency_ms=1, request_timeout_s=5)
+        sut.start()
+
+        # Act
+        with self.assertRaises(TypeError):
+            sut(5)
+        actual = sut([{"id": 1}])
+        sut.stop()
+
+        # Assert
+        self.assertEqual([(True, {True: 0.9, False: 0.1})], actual)
+
+    def test_micro_batcher_timeout(self):
+        # Arrange
+        predict_func = lambda records: time.sleep(1) or ([True], [{True: 0.9}])
+        sut = MicroBatcher(predict_func, max_latency_ms=1, request_timeout_s=0.05)
+        sut.start()
+
+        # Act
+        with self.assertRaises(TimeoutError):
+            sut([{"id": 1}])
+        sut.stop()
+
+    @data(5, [], [1, {"id": 2}], "text")
+    def test_predict_http_invalid_body(self, body):
+        # Arrange
+        predict_func = lambda records: ([True for _ in records], [{True: 0.9, False: 0.1} for _ in records])
+        sut = InferenceServer(predict_func, port=0, max_latency_ms=1)
+        server_thread = threading.Thread(target=sut.serve_forever, daemon=True)
+        server_thread.start()
+        host, port = sut.server_address
+
+        request = urllib.request.Request("http://{}:{}/predict".format(host, port),
+                                         data=json.dumps(body).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"})
+
+        # Act
+        with self.assertRaises(urllib.error.HTTPError) as context:
+            urllib.request.urlopen(request)
+
+        sut.shutdown()
+        server_thread.join()
+
+        # Assert
+        self.assertEqual(400, context.exception.code)
+
+    def test_predict_http(self):
+        # Arrange
+        predict_func = lambda records: ([True for _ in records], [{True: 0.9, False: 0.1} for _ in records])
+        sut = InferenceServer(predict_func, port=0, max_latency_ms=1)
+        server_thread = threading.Thread(target=sut.serve_forever, daemon=True)
+        server_thread.start()
+        host, port = sut.server_address
+
+        request = urllib.request.Request("http://{}:{}/predict".format(host, port),
+                                         data=json.dumps([{"id": 1}, {"id": 2}]).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"})
+
+        # Act
+        with urllib.request.urlopen(request) as response:
+            actual = json.loads(response.read().decode("utf-8"))
+
+        sut.shutdown()
+        server_thread.join()
+
+        # Assert
+        self.assertSequenceEqual([{"predicted": True, "confidence_scores": {"True": 0.9, "False": 0.1}}] * 2, actual)
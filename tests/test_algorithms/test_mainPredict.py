@@ -0,0 +1,17 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from algorithms.main_predict import run_file
+
+
+class TestMainPredict(TestCase):
+
+    def test_run_file_all_interaction_types_unsupported_dataset(self):
+        # Arrange
+        data_file = os.path.join(os.path.dirname(__file__), "..", "data", "sample_train.json")
+        out_dir = tempfile.mkdtemp()
+
+        # Act + Assert
+        with self.assertRaisesRegex(ValueError, "PpiMultiTypeDatasetFactory"):
+            run_file("PpiDatasetFactory", data_file, out_dir, out_dir, 0.0, all_interaction_types=True)
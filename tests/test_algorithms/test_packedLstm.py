@@ -0,0 +1,36 @@
+from unittest import TestCase
+
+import torch
+import torch.nn as nn
+
+from modelnetworks.packed_lstm import get_sequence_lengths, run_packed_lstm
+
+
+class TestPackedLstm(TestCase):
+
+    def test_run_packed_lstm_matches_unpadded(self):
+        # Arrange
+        torch.manual_seed(1)
+        lstm = nn.LSTM(3, hidden_size=4, batch_first=True, bidirectional=True)
+        lengths = torch.tensor([2, 5, 3])
+        inputs = torch.randn(3, 5, 3)
+
+        # Act
+        actual = run_packed_lstm(lstm, inputs, lengths, total_length=7)
+
+        # Assert
+        self.assertEqual(torch.Size([3, 7, 8]), actual.shape)
+        for i, l in enumerate(lengths.tolist()):
+            expected, _ = lstm(inputs[i:i + 1, :l])
+            self.assertTrue(torch.allclose(expected[0], actual[i, :l], atol=1e-6))
+            self.assertTrue(actual[i, l:].eq(0).all())
+
+    def test_get_sequence_lengths(self):
+        # Arrange
+        pad_mask = torch.tensor([[False, False, True], [True, True, True], [False, False, False]])
+
+        # Act
+        actual = get_sequence_lengths(pad_mask)
+
+        # Assert
+        self.assertSequenceEqual([2, 1, 3], actual.tolist())
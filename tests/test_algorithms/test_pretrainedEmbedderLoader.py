@@ -1,7 +1,12 @@
-from io import StringIO
+import os
+import tempfile
+from io import StringIO, BytesIO
 from unittest import TestCase
 
+import numpy as np
+
 from algorithms.PretrainedEmbedderLoader import PretrainedEmbedderLoader
+from algorithms.embedding_store import EmbeddingStore
 
 
 class TestPretrainedEmbedderLoader(TestCase):
@@ -109,3 +114,65 @@ class TestPretrainedEmbedderLoader(TestCase):
 
         # Assert
         self.assertEqual([0] * embed_dim, embeddings_array[existing_word_dict[pad]].tolist())
+
+    def test___call__embedding_store(self):
+        """
+        The store converted from the text file gives the same embeddings as the text file
+        """
+        # Arrange
+        embeddings_list = ["4 3",
+                           "hat 0.2 .34 0.8",
+                           "mat 0.5 .34 0.8",
+                           "entity1 0.5 .55 0.8",
+                           "entity2 0.3 .55 0.9"]
+        text_file = os.path.join(tempfile.mkdtemp(), "embedding.txt")
+        with open(text_file, "w") as f:
+            f.write("\n".join(embeddings_list))
+        with open(text_file, "r") as f:
+            EmbeddingStore.convert(f, text_file)
+
+        pad = "[#$%]"
+        word_dict = {pad: 0, "entity1": 1, "entityX": 2}
+
+        expected_vocab, expected_embedding = PretrainedEmbedderLoader(pad, seed=1)(
+            StringIO("\n".join(embeddings_list)), initial_words_index_dict=word_dict)
+
+        sut = PretrainedEmbedderLoader(pad, seed=1)
+
+        # Act
+        with open(text_file, "r") as embedding_handle:
+            word_index_dict, embeddings_array = sut(embedding_handle, initial_words_index_dict=word_dict)
+
+        # Assert
+        self.assertEqual(expected_vocab, word_index_dict)
+        self.assertTrue(np.allclose(expected_embedding, embeddings_array))
+
+    def test___call__word2vec_binary(self):
+        """
+        Case where the embedding is in the word2vec binary format
+        """
+        # Arrange
+        embeddings_list = ["4 3",
+                           "hat 0.2 .34 0.8",
+                           "mat 0.5 .34 0.8",
+                           "entity1 0.5 .55 0.8",
+                           "entity2 0.3 .55 0.9"]
+        binary_embedding = "4 3\n".encode("utf-8")
+        for line in embeddings_list[1:]:
+            values = line.split(" ")
+            binary_embedding += values[0].encode("utf-8") + b" " + np.asarray(values[1:], dtype="<f4").tobytes()
+
+        pad = "[#$%]"
+        word_dict = {pad: 0, "entity1": 1, "entityX": 2}
+
+        expected_vocab, expected_embedding = PretrainedEmbedderLoader(pad, seed=1)(
+            StringIO("\n".join(embeddings_list)), initial_words_index_dict=word_dict)
+
+        sut = PretrainedEmbedderLoader(pad, seed=1)
+
+        # Act
+        word_index_dict, embeddings_array = sut(BytesIO(binary_embedding), initial_words_index_dict=word_dict)
+
+        # Assert
+        self.assertEqual(expected_vocab, word_index_dict)
+        self.assertTrue(np.allclose(expected_embedding, embeddings_array))
@@ -1,7 +1,12 @@
-from io import StringIO
+import os
+import tempfile
+from io import StringIO, BytesIO
 from unittest import TestCase
 
+import numpy as np
+
 from algorithms.PretrainedEmbedderLoaderMinimum import PretrainedEmbedderLoaderMinimum
+from algorithms.embedding_store import EmbeddingStore
 
 
 class TestPretrainedEmbedderLoaderMinimum(TestCase):
@@ -85,3 +90,92 @@ class TestPretrainedEmbedderLoaderMinimum(TestCase):
         # Assert
         self.assertEqual(expected_vocab, word_index_dict)
         self.assertEqual(embeddings_array.shape[0], len(word_index_dict))
+
+    def test___call__embedding_store(self):
+        """
+        Case where the handle is the vocab file of the embedding store
+        """
+        # Arrange
+        embeddings_list = ["4 3",
+                           "hat 0.2 .34 0.8",
+                           "mat 0.5 .34 0.8",
+                           "entity1 0.5 .55 0.8",
+                           "entity2 0.3 .55 0.9"]
+        store_prefix = os.path.join(tempfile.mkdtemp(), "embedding")
+        EmbeddingStore.convert(StringIO("\n".join(embeddings_list)), store_prefix)
+
+        pad = "[#$%]"
+        embed_dim = 3
+        word_dict = {pad: 0, "entity1": 1, "entityX": 2, "hat": 3}
+
+        expected_vocab, expected_embedding = PretrainedEmbedderLoaderMinimum(pad, dim=embed_dim, seed=1)(
+            StringIO("\n".join(embeddings_list)), initial_words_index_dict=word_dict)
+
+        sut = PretrainedEmbedderLoaderMinimum(pad, dim=embed_dim, seed=1)
+
+        # Act
+        with open(store_prefix + EmbeddingStore.vocab_suffix, "r") as embedding_handle:
+            word_index_dict, embeddings_array = sut(embedding_handle, initial_words_index_dict=word_dict)
+
+        # Assert
+        self.assertEqual(expected_vocab, word_index_dict)
+        self.assertTrue(np.allclose(expected_embedding, embeddings_array))
+
+    def test___call__parallel(self):
+        """
+        Case where the embedding file is scanned in parallel byte ranges
+        """
+        # Arrange
+        embed_dim = 3
+        embeddings_list = ["{} 3".format(101)] + ["word{} {} .34 0.8".format(i, i) for i in range(100)] + [
+            "word5 0.5 .55 0.8"]
+        text_file = os.path.join(tempfile.mkdtemp(), "embedding.txt")
+        with open(text_file, "w") as f:
+            f.write("\n".join(embeddings_list))
+
+        pad = "[#$%]"
+        word_dict = {pad: 0, "word0": 1, "word5": 2, "word49": 3, "word99": 4, "entityX": 5}
+
+        expected_vocab, expected_embedding = PretrainedEmbedderLoaderMinimum(pad, dim=embed_dim, seed=1)(
+            StringIO("\n".join(embeddings_list)), initial_words_index_dict=word_dict)
+
+        sut = PretrainedEmbedderLoaderMinimum(pad, dim=embed_dim, seed=1, num_workers=3)
+
+        # Act
+        with open(text_file, "r") as embedding_handle:
+            word_index_dict, embeddings_array = sut(embedding_handle, initial_words_index_dict=word_dict)
+
+        # Assert
+        self.assertEqual(expected_vocab, word_index_dict)
+        self.assertSequenceEqual(expected_embedding.tolist(), embeddings_array.tolist())
+        self.assertSequenceEqual([0.5, .55, 0.8], embeddings_array[2].tolist())
+
+    def test___call__word2vec_binary(self):
+        """
+        Case where the embedding is in the word2vec binary format
+        """
+        # Arrange
+        embeddings_list = ["4 3",
+                           "hat 0.2 .34 0.8",
+                           "mat 0.5 .34 0.8",
+                           "entity1 0.5 .55 0.8",
+                           "entity2 0.3 .55 0.9"]
+        binary_embedding = "4 3\n".encode("utf-8")
+        for line in embeddings_list[1:]:
+            values = line.split(" ")
+            binary_embedding += values[0].encode("utf-8") + b" " + np.asarray(values[1:], dtype="<f4").tobytes()
+
+        pad = "[#$%]"
+        word_dict = {pad: 0, "entity1": 1, "entityX": 2}
+
+        expected_vocab, expected_embedding = PretrainedEmbedderLoaderMinimum(pad, dim=3, seed=1)(
+            StringIO("\n".join(embeddings_list)), initial_words_index_dict=word_dict)
+
+        sut = PretrainedEmbedderLoaderMinimum(pad, dim=3, seed=1)
+
+        # Act
+        word_index_dict, embeddings_array = sut(BytesIO(binary_embedding), initial_words_index_dict=word_dict)
+
+        # Assert
+        self.assertEqual(expected_vocab, word_index_dict)
+        self.assertTrue(np.allclose(expected_embedding, embeddings_array))
@@ -0,0 +1,65 @@
+import os
+from logging.config import fileConfig
+from unittest import TestCase
+
+import numpy as np
+import torch
+
+from modelnetworks.RelationExtractorMultiTypeBiLstmNetwork import RelationExtractorMultiTypeBiLstmNetwork
+
+
+class TestRelationExtractorMultiTypeBiLstmNetwork(TestCase):
+    def setUp(self):
+        fileConfig(os.path.join(os.path.dirname(__file__), 'logger.ini'))
+
+    def _get_sut(self, vocab_size, class_size, max_abstract_len, interaction_type_indices):
+        sut = RelationExtractorMultiTypeBiLstmNetwork(class_size=class_size, embedding_dim=5,
+                                                      feature_lengths=np.array([max_abstract_len, 1, 1, 1]),
+                                                      interaction_type_indices=interaction_type_indices,
+                                                      interaction_type_column_index=3,
+                                                      embed_vocab_size=vocab_size)
+        sut.eval()
+        return sut
+
+    def test_forward_all_types(self):
+        # Arrange
+        vocab_size = 1000
+        batch_size = 30
+        class_size = 2
+        max_abstract_len = 10
+        interaction_type_indices = [7, 8, 9, 10, 11, 12, 13]
+
+        abstract = torch.LongTensor(batch_size, max_abstract_len).random_(1, vocab_size)
+        entity = torch.LongTensor(batch_size, 1).random_(1, vocab_size)
+        interaction_type = torch.LongTensor(batch_size, 1).random_(7, 14)
+
+        sut = self._get_sut(vocab_size, class_size, max_abstract_len, interaction_type_indices)
+
+        # Act
+        actual = sut.forward_all_types((abstract, entity, entity, interaction_type))
+
+        # Assert
+        self.assertEqual(torch.Size([batch_size, len(interaction_type_indices), class_size]), actual.shape)
+
+    def test_forward_selects_head_of_interaction_type(self):
+        # Arrange
+        vocab_size = 1000
+        batch_size = 30
+        class_size = 2
+        max_abstract_len = 10
+        interaction_type_indices = [9, 7, 8]
+
+        abstract = torch.LongTensor(batch_size, max_abstract_len).random_(1, vocab_size)
+        entity = torch.LongTensor(batch_size, 1).random_(1, vocab_size)
+        interaction_type = torch.LongTensor(batch_size, 1).random_(7, 10)
+
+        sut = self._get_sut(vocab_size, class_size, max_abstract_len, interaction_type_indices)
+        all_types = sut.forward_all_types((abstract, entity, entity, interaction_type))
+        heads = [interaction_type_indices.index(t) for t in interaction_type[:, 0].tolist()]
+
+        # Act
+        actual = sut((abstract, entity, entity, interaction_type))
+
+        # Assert
+        self.assertEqual(torch.Size([batch_size, class_size]), actual.shape)
+        self.assertTrue(torch.allclose(all_types[torch.arange(batch_size), heads], actual))
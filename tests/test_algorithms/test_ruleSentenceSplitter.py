@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+from ddt import ddt, data, unpack
+
+from algorithms.rule_sentence_splitter import RuleSentenceSplitter
+
+
+@ddt
+class TestRuleSentenceSplitter(TestCase):
+
+    @data(("This is sample entity1. But ths is a new sentence",
+           ["This is sample entity1.", "But ths is a new sentence"])
+        , ("Smith et al. Showed that BRCA1 binds p53. It is bound.",
+           ["Smith et al. Showed that BRCA1 binds p53.", "It is bound."])
+        , ("Kinases (e.g. RelA) were 2.5 fold higher! J. Doe agreed.",
+           ["Kinases (e.g. RelA) were 2.5 fold higher!", "J. Doe agreed."])
+        , ("The NF-kappa.B complex is shown (Fig. 2). 3 genes were found",
+           ["The NF-kappa.B complex is shown (Fig. 2).", "3 genes were found"])
+        , ("Is it bound? \"Yes\" it is.", ["Is it bound?", "\"Yes\" it is."])
+        , ("the protein p.R123H binds. lower case does not split.",
+           ["the protein p.R123H binds. lower case does not split."])
+        , ("  ", []))
+    @unpack
+    def test___call__(self, text, expected):
+        # Arrange
+        sut = RuleSentenceSplitter()
+
+        # Act
+        actual = sut(text)
+
+        # Assert
+        self.assertSequenceEqual(expected, actual)
@@ -30,3 +30,41 @@ class TestSitDataPipeline(TestCase):
 
         # Act
         sut.fit_transform(DataLoader(mock_dataset))
+
+    def test_iter_transform(self):
+        # Arrange
+        batches = [[[["This is sample text"]], ["yes"]], [[["This is sample text2"]], ["no"]]]
+
+        step_1 = _UpperCaseStep()
+        step_2 = _UpperCaseStep()
+        sut = DataPipeline(text_to_index=None, processing_steps=[("step1", step_1), ("step2", step_2)])
+        sut.fit(batches)
+
+        expected = [[[["THIS IS SAMPLE TEXT"]], ["yes"]], [[["THIS IS SAMPLE TEXT2"]], ["no"]]]
+
+        # Act
+        actual = sut.iter_transform(batches)
+        actual_first = next(actual)
+
+        # Assert
+        self.assertEqual(1, step_2.batches_read, "Expected the second batch not to be read yet")
+        self.assertSequenceEqual(expected, [actual_first] + list(actual))
+
+
+class _UpperCaseStep:
+    """
+    Transform step that only supports transforming the whole dataset
+    """
+
+    def __init__(self):
+        self.batches_read = 0
+
+    def fit(self, data_loader):
+        pass
+
+    def transform(self, x):
+        result = []
+        for b_x, b_y in x:
+            self.batches_read += 1
+            result.append([[[t.upper() for t in c] for c in b_x], b_y])
+        return result
@@ -17,6 +17,8 @@ import tempfile
 from io import StringIO
 from unittest import TestCase
 
+import pandas as pd
+
 from algorithms.InferencePipeline import InferencePipeline
 from algorithms.TrainInferenceBuilder import TrainInferenceBuilder
 from algorithms.dataset_factory import DatasetFactory
@@ -45,11 +47,73 @@ class TestSitInferencePipeline(TestCase):
         # Act + assert
         sut.run(artifactsdir=base_path, data_file=sample_file, dataset=dataset, out_dir=base_path)
 
-    def _get_sut_train_pipeline(self, mock_dataset, out_dir=tempfile.mkdtemp(), epochs=5, scorer=None):
+    def test_run_streaming(self):
+        # Arrange
+        base_path = tempfile.mkdtemp()
+        out_dir = os.path.join(base_path, "model_artifacts")
+        os.mkdir(out_dir)
+
+        mock_dataset_train, scorer = self._get_ppidataset()
+        mock_dataset_val, _ = self._get_ppidataset()
+        train_pipeline = self._get_sut_train_pipeline(mock_dataset_train, out_dir=out_dir, epochs=2, scorer=scorer)
+        train_pipeline(mock_dataset_train, mock_dataset_val)
+
+        # Same records in json lines format
+        sample_file = os.path.join(base_path, "sample_train.jsonl")
+        pd.read_json(self._get_train_file()).to_json(sample_file, orient="records", lines=True)
+
+        dataset, _ = self._get_ppidataset()
+        expected_df = InferencePipeline().run(artifactsdir=base_path, data_file=self._get_train_file(),
+                                              dataset=dataset, out_dir=base_path)
+
+        sut = InferencePipeline()
+
+        # Act
+        actual = sut.run_streaming(self._get_dataset(), sample_file, base_path, base_path, chunk_size=7)
+
+        # Assert
+        actual_df = pd.read_json(os.path.join(base_path, "sample_train_predicted.json"), lines=True)
+        self.assertEqual(expected_df.shape[0], actual)
+        self.assertSequenceEqual(expected_df["predicted"].tolist(), actual_df["predicted"].astype(str).tolist())
+
+    def test_run_interaction_types(self):
+        # Arrange
+        base_path = tempfile.mkdtemp()
+        out_dir = os.path.join(base_path, "model_artifacts")
+        os.mkdir(out_dir)
+
+        factory = DatasetFactory().get_datasetfactory("PpiMultiTypeDatasetFactory")
+        mock_dataset_train, scorer = factory.get_dataset(self._get_train_file()), factory.get_metric_factory().get()
+        mock_dataset_val = factory.get_dataset(self._get_train_file())
+        train_pipeline = self._get_sut_train_pipeline(
+            mock_dataset_train, out_dir=out_dir, epochs=2, scorer=scorer,
+            network_factory_name="RelationExtractorMultiTypeBiLstmNetworkFactory")
+        train_pipeline(mock_dataset_train, mock_dataset_val)
+
+        dataset = DatasetFactory().get_datasetfactory("PpiMultiTypeDatasetFactory",
+                                                      all_types=True).get_dataset(self._get_train_file())
+
+        sut = InferencePipeline()
+
+        # Act
+        actual = sut.run_interaction_types(dataset, self._get_train_file(), base_path, base_path)
+
+        # Assert, a record per pair with the score of every interaction type
+        actual_df = pd.read_json(os.path.join(base_path, "sample_train_interaction_types_predicted.json"), lines=True)
+        self.assertEqual(len(dataset), actual_df.shape[0])
+        self.assertEqual(len(dataset), actual.shape[0])
+        for t in dataset.interaction_types:
+            self.assertIn(t, actual_df.columns)
+        self.assertSequenceEqual(actual[list(dataset.interaction_types)].max(axis=1).tolist(),
+                                 actual["predicted_confidence"].tolist())
+
+    def _get_sut_train_pipeline(self, mock_dataset, out_dir=tempfile.mkdtemp(), epochs=5, scorer=None,
+                                network_factory_name="RelationExtractorSimpleResnetCnnPosNetworkFactory"):
         embedding = StringIO(
             "\n".join(["4 3", "hat 0.2 .34 0.8", "mat 0.5 .34 0.8", "entity1 0.5 .55 0.8", "entity2 0.3 .55 0.9"]))
         factory = TrainInferenceBuilder(dataset=mock_dataset, embedding_handle=embedding, embedding_dim=3,
-                                        output_dir=out_dir, model_dir=out_dir, epochs=epochs, results_scorer=scorer)
+                                        output_dir=out_dir, model_dir=out_dir, epochs=epochs, results_scorer=scorer,
+                                        network_factory_name=network_factory_name)
         sut = factory.get_trainpipeline()
         return sut
 
@@ -4,7 +4,10 @@ from io import StringIO
 from logging.config import fileConfig
 from unittest import TestCase
 
+import pandas as pd
+
 from algorithms.TrainInferenceBuilder import TrainInferenceBuilder
+from algorithms.TrainInferencePipeline import TrainInferencePipeline
 from algorithms.dataset_factory import DatasetFactory
 
 
@@ -42,11 +45,149 @@ class TestSitTrainInferencePipeline(TestCase):
         # Act
         actual = sut(mock_dataset_train, mock_dataset_val)
 
-    def _get_sut_train_pipeline(self, mock_dataset, out_dir=tempfile.mkdtemp(), epochs=5, scorer=None):
+    def test_predict_pos_network(self):
+        # Arrange
+        mock_dataset_train, scorer = self._get_ppidataset()
+        mock_dataset_val, _ = self._get_ppidataset()
+        out_dir = tempfile.mkdtemp()
+
+        sut = self._get_sut_train_pipeline(mock_dataset_train, out_dir=out_dir, epochs=2, scorer=scorer,
+                                           network_factory_name="RelationExtractorResnetCnnPosNetworkFactory")
+
+        expected_scores, target, expected_predicted = sut(mock_dataset_train, mock_dataset_val)
+        expected_predicted = expected_predicted.tolist()
+
+        # Act
+        predictor = sut.load(out_dir)
+        predicted, confidence_scores = predictor(mock_dataset_val)
+
+        # Assert
+        self.assertSequenceEqual(expected_predicted, predicted.tolist())
+
+    def test_predict_feature_cache(self):
+        # Arrange
+        mock_dataset_train, scorer = self._get_ppidataset()
+        mock_dataset_val, _ = self._get_ppidataset()
+        out_dir = tempfile.mkdtemp()
+        cache_dir = tempfile.mkdtemp()
+
+        sut = self._get_sut_train_pipeline(mock_dataset_train, out_dir=out_dir, epochs=2, scorer=scorer,
+                                           network_factory_name="RelationExtractorResnetCnnPosNetworkFactory")
+        sut(mock_dataset_train, mock_dataset_val)
+
+        predictor = sut.load(out_dir)
+        expected_predicted, _ = predictor(mock_dataset_val)
+
+        # Act
+        cached_predictor = sut.load(out_dir, feature_cache_dir=cache_dir)
+        cold_predicted, _ = cached_predictor(mock_dataset_val)
+        warm_predicted, _ = cached_predictor(mock_dataset_val)
+
+        # Assert
+        self.assertEqual(1, len(os.listdir(cache_dir)))
+        self.assertSequenceEqual(expected_predicted.tolist(), cold_predicted.tolist())
+        self.assertSequenceEqual(expected_predicted.tolist(), warm_predicted.tolist())
+
+    def test_call_feature_cache_validation_only(self):
+        # Arrange
+        mock_dataset_train, scorer = self._get_ppidataset()
+        cache_dir = tempfile.mkdtemp()
+        # A file with other records for validation
+        val_file = os.path.join(tempfile.mkdtemp(), "sample_val.json")
+        train_df = pd.read_json(os.path.join(os.path.dirname(__file__), "..", "data", "sample_train.json"))
+        train_df.iloc[1:].to_json(val_file, orient="records")
+        mock_dataset_val = DatasetFactory().get_datasetfactory("PpiDatasetFactory").get_dataset(val_file)
+
+        sut = self._get_sut_train_pipeline(mock_dataset_train, epochs=1, scorer=scorer,
+                                           additional_args={"feature_cache_dir": cache_dir})
+
+        # Act
+        sut(mock_dataset_train, mock_dataset_val)
+
+        # Assert, the shuffled train batches are not cached, only the validation batches
+        self.assertEqual(1, len(os.listdir(cache_dir)))
+
+    def test_predict_length_bucketing(self):
+        # Arrange
+        mock_dataset_train, scorer = self._get_ppidataset()
+        mock_dataset_val, _ = self._get_ppidataset()
+        out_dir = tempfile.mkdtemp()
+
+        sut = self._get_sut_train_pipeline(mock_dataset_train, out_dir=out_dir, epochs=2, scorer=scorer,
+                                           network_factory_name="RelationExtractorBiLstmNetworkFactory",
+                                           additional_args={"length_bucketing": "1"})
+        sut(mock_dataset_train, mock_dataset_val)
+
+        expected_predicted, expected_scores = sut.load(out_dir)(mock_dataset_val)
+
+        # Act
+        predicted, scores = sut.load(out_dir, length_bucketing=True)(mock_dataset_val)
+
+        # Assert
+        self.assertSequenceEqual(expected_predicted.tolist(), predicted.tolist())
+        for e, a in zip(expected_scores, scores):
+            for k in e:
+                self.assertAlmostEqual(e[k], a[k], places=5)
+
+    def test_predict_group_by_abstract(self):
+        # Arrange
+        train_file = os.path.join(os.path.dirname(__file__), "..", "data", "sample_train.json")
+        factory = DatasetFactory().get_datasetfactory("PpiMultiTypeDatasetFactory")
+        mock_dataset_train, scorer = factory.get_dataset(train_file), factory.get_metric_factory().get()
+        mock_dataset_val = factory.get_dataset(train_file)
+        unmasked_dataset_val = DatasetFactory().get_datasetfactory("PpiMultiTypeDatasetFactory",
+                                                                   materialise=False).get_dataset(train_file)
+        out_dir = tempfile.mkdtemp()
+
+        sut = self._get_sut_train_pipeline(mock_dataset_train, out_dir=out_dir, epochs=2, scorer=scorer)
+        sut(mock_dataset_train, mock_dataset_val)
+
+        expected_predicted, expected_scores = sut.load(out_dir)(mock_dataset_val)
+
+        # Act
+        predicted, scores = sut.load(out_dir, group_by_abstract=True)(unmasked_dataset_val)
+
+        # Assert
+        self.assertSequenceEqual(expected_predicted.tolist(), predicted.tolist())
+        for e, a in zip(expected_scores, scores):
+            for k in e:
+                self.assertAlmostEqual(e[k], a[k], places=5)
+
+    def test_predict_interaction_types(self):
+        # Arrange
+        train_file = os.path.join(os.path.dirname(__file__), "..", "data", "sample_train.json")
+        factory = DatasetFactory().get_datasetfactory("PpiMultiTypeDatasetFactory")
+        mock_dataset_train, scorer = factory.get_dataset(train_file), factory.get_metric_factory().get()
+        mock_dataset_val = factory.get_dataset(train_file)
+        all_types_dataset = DatasetFactory().get_datasetfactory("PpiMultiTypeDatasetFactory",
+                                                                all_types=True).get_dataset(train_file)
+        out_dir = tempfile.mkdtemp()
+
+        sut = self._get_sut_train_pipeline(mock_dataset_train, out_dir=out_dir, epochs=2, scorer=scorer,
+                                           network_factory_name="RelationExtractorMultiTypeBiLstmNetworkFactory")
+        sut(mock_dataset_train, mock_dataset_val)
+        data_pipeline, label_pipeline, model = TrainInferencePipeline._load_single_model(out_dir)
+        _, expected_scores = sut.load(out_dir)(mock_dataset_val)
+
+        # Act
+        actual = TrainInferencePipeline.predict_interaction_types(all_types_dataset, model, data_pipeline,
+                                                                  label_pipeline)
+
+        # Assert, each record scores all the interaction types, matching the score of the type of each val record
+        self.assertEqual(len(all_types_dataset), len(actual))
+        pair_scores = {tuple(all_types_dataset[i][0][0:3]): s for i, s in enumerate(actual)}
+        for i, e in enumerate(expected_scores):
+            x, _ = mock_dataset_val[i]
+            self.assertAlmostEqual(e[True], pair_scores[tuple(x[0:3])][x[3]], places=5)
+
+    def _get_sut_train_pipeline(self, mock_dataset, out_dir=tempfile.mkdtemp(), epochs=5, scorer=None,
+                                network_factory_name="RelationExtractorSimpleResnetCnnPosNetworkFactory",
+                                additional_args=None):
         embedding = StringIO(
             "\n".join(["4 3", "hat 0.2 .34 0.8", "mat 0.5 .34 0.8", "entity1 0.5 .55 0.8", "entity2 0.3 .55 0.9"]))
         factory = TrainInferenceBuilder(dataset=mock_dataset, embedding_handle=embedding, embedding_dim=3,
-                                        output_dir=out_dir, model_dir=out_dir, epochs=epochs, results_scorer=scorer)
+                                        output_dir=out_dir, model_dir=out_dir, epochs=epochs, results_scorer=scorer,
+                                        network_factory_name=network_factory_name, extra_args=additional_args)
         sut = factory.get_trainpipeline()
         return sut
 
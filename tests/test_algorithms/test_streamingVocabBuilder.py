@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+from ddt import ddt, data, unpack
+from sklearn.feature_extraction.text import CountVectorizer
+
+from algorithms.streaming_vocab_builder import StreamingVocabBuilder
+
+
+@ddt
+class TestStreamingVocabBuilder(TestCase):
+
+    @data((True, 1, 1, 2)
+        , (False, 1, 1, 2)
+        , (True, 2, 1, 3)
+        , (False, 2, 2, 2)
+        , (True, 0.3, 2, 1)
+        , (True, 3, 2, 100))
+    @unpack
+    def test_call_matches_count_vectoriser(self, case_insensitive, min_doc_frequency, num_workers, shard_size):
+        # Arrange
+        data_loader = [[[["This is sample text, Sample KLK3 text", "entity1 this"], ["KLK3", "CDK2"]], ["yes", "no"]],
+                       [[["Completey random text2 and random", "entity11 this"], ["CDK2", "KLK3"]], ["no", "no"]],
+                       [[["KLK3 phosphorylates This sample", "Entity1 entity2"], ["MAPK1", "KLK3"]], ["yes", "yes"]]]
+        texts = [t for b_x, _ in data_loader for c in b_x for t in c]
+        expected = list(
+            CountVectorizer(lowercase=case_insensitive, min_df=min_doc_frequency).fit(texts).vocabulary_.keys())
+
+        sut = StreamingVocabBuilder(case_insensitive=case_insensitive, min_doc_frequency=min_doc_frequency,
+                                    num_workers=num_workers, shard_size=shard_size)
+
+        # Act
+        actual = sut(data_loader)
+
+        # Assert
+        self.assertEqual(expected, actual)
+
+    def test_call_no_terms_remain(self):
+        # Arrange
+        data_loader = [[[["This is sample text"]], ["yes"]]]
+        sut = StreamingVocabBuilder(min_doc_frequency=2)
+
+        # Act + Assert
+        with self.assertRaises(ValueError):
+            sut(data_loader)
@@ -0,0 +1,52 @@
+import os
+import tempfile
+from unittest import TestCase
+
+import torch
+
+from algorithms.transform_berttext_token_to_index import TransformBertTextTokenToIndex
+from algorithms.transform_berttext_tokenise import TransformBertTextTokenise
+
+
+class TestTransformBertTextTokenToIndex(TestCase):
+
+    def setUp(self):
+        self.model_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.model_dir, "vocab.txt"), "w") as f:
+            f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "this", "is", "a", "map", "PROTEIN1"]))
+            f.write("\n")
+
+    def test_fit_transform_pads_to_longest_row_in_batch(self):
+        # Arrange
+        text_to_token = TransformBertTextTokenise(self.model_dir, [10, 4], dynamic_padding=True)
+        sut = TransformBertTextTokenToIndex(self.model_dir, text_col_index=0)
+
+        input = [[[["this is a map", "map"], ["PROTEIN1", "PROTEIN1"]], ["yes", "no"]],
+                 [[["this is"], ["PROTEIN1"]], ["no"]]]
+
+        expected = [[torch.tensor([[2, 4, 5, 6, 7, 3], [2, 7, 3, 0, 0, 0]]), ["yes", "no"]],
+                    [torch.tensor([[2, 4, 5, 3]]), ["no"]]]
+
+        # Act
+        actual = sut.fit_transform(text_to_token.fit_transform(input))
+
+        # Assert
+        self.assertEqual(len(expected), len(actual))
+        for (e_x, e_y), (a_x, a_y) in zip(expected, actual):
+            self.assertTrue(e_x.equal(a_x), "Expected {}, but found {}".format(e_x, a_x))
+            self.assertSequenceEqual(e_y, a_y)
+
+    def test_fit_transform_fixed_padding(self):
+        # Arrange
+        text_to_token = TransformBertTextTokenise(self.model_dir, [6, 4])
+        sut = TransformBertTextTokenToIndex(self.model_dir, text_col_index=0)
+
+        input = [[[["this is a map words truncated", "map"], ["PROTEIN1", "PROTEIN1"]], ["yes", "no"]]]
+
+        expected = torch.tensor([[2, 4, 5, 6, 7, 3], [2, 7, 0, 0, 0, 3]])
+
+        # Act
+        actual = sut.fit_transform(text_to_token.fit_transform(input))
+
+        # Assert
+        self.assertTrue(expected.equal(actual[0][0]), "Expected {}, but found {}".format(expected, actual[0][0]))
@@ -0,0 +1,47 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from ddt import ddt, data
+
+from algorithms.DataPipeline import DataPipeline
+from algorithms.transform_berttext_token_to_index import TransformBertTextTokenToIndex
+from algorithms.transform_berttext_tokenise import TransformBertTextTokenise
+from algorithms.transform_berttext_tokenise_to_index import TransformBertTextTokeniseToIndex
+
+
+@ddt
+class TestTransformBertTextTokeniseToIndex(TestCase):
+
+    def setUp(self):
+        self.model_dir = tempfile.mkdtemp()
+        with open(os.path.join(self.model_dir, "vocab.txt"), "w") as f:
+            f.write("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "this", "is", "a", "map", "PROTEIN1", "kinase",
+                               "##s"]))
+            f.write("\n")
+
+    @data(True, False)
+    def test_transform_matches_two_stage_pipeline(self, dynamic_padding):
+        # Arrange
+        max_feature_lens = [7, 4]
+        input = [[[["this is a map", "kinases unknown", "PROTEIN1 is a map of this kinase"], ["PROTEIN1"] * 3],
+                  ["yes", "no", "no"]],
+                 [[["", "map"], ["PROTEIN1"] * 2], ["no", "yes"]]]
+
+        two_stage = DataPipeline(text_to_index=None, processing_steps=[
+            ("token_Totext", TransformBertTextTokenise(self.model_dir, max_feature_lens,
+                                                       dynamic_padding=dynamic_padding)),
+            ("token_to_index", TransformBertTextTokenToIndex(self.model_dir, text_col_index=0))])
+        expected = two_stage.fit_transform(input)
+
+        sut = TransformBertTextTokeniseToIndex(self.model_dir, max_feature_lens, text_col_index=0,
+                                               dynamic_padding=dynamic_padding)
+
+        # Act
+        actual = sut.fit_transform(input)
+
+        # Assert
+        self.assertEqual(len(expected), len(actual))
+        for (e_x, e_y), (a_x, a_y) in zip(expected, actual):
+            self.assertTrue(e_x.equal(a_x), "Expected {}, but found {}".format(e_x, a_x))
+            self.assertSequenceEqual(e_y, a_y)
@@ -0,0 +1,50 @@
+from unittest import TestCase
+
+import torch
+
+from algorithms.transform_entity_distance import TransformEntityDistance
+
+
+class TestTransformEntityDistance(TestCase):
+    def test_transform_entity_markers(self):
+        # Arrange
+        text = torch.tensor([[2, 5, 5, 3, 5], [5, 5, 5, 5, 5]])
+        label = [1, 0]
+        input = [[[text], label]]
+
+        sut = TransformEntityDistance(text_column_index=0, max_distance=2, entity_markers=[2, 3])
+
+        expected_distances = [torch.tensor([[0, 1, 2, 2, 2], [2, 2, 2, 2, 2]]),
+                              torch.tensor([[2, 2, 1, 0, 1], [2, 2, 2, 2, 2]])]
+
+        # Act
+        actual = sut.fit_transform(input)
+
+        # Assert
+        actual_x, actual_y = actual[0]
+        self.assertEqual(3, len(actual_x))
+        self.assertTrue(actual_x[0].equal(text))
+        for e, a in zip(expected_distances, actual_x[1:]):
+            self.assertTrue(e.equal(a), "Expected {}, but found {}".format(e, a))
+        self.assertSequenceEqual(label, actual_y)
+
+    def test_transform_entity_columns(self):
+        # Arrange
+        text = torch.tensor([[7, 5, 5, 8], [5, 8, 5, 7]])
+        entity1 = torch.tensor([[7], [7]])
+        entity2 = torch.tensor([[8], [8]])
+        input = [[[text, entity1, entity2], [1, 0]]]
+
+        sut = TransformEntityDistance(text_column_index=0, max_distance=5, entity_column_indices=[1, 2])
+
+        expected_distances = [torch.tensor([[0, 1, 2, 3], [3, 2, 1, 0]]),
+                              torch.tensor([[3, 2, 1, 0], [1, 0, 1, 2]])]
+
+        # Act
+        actual = sut.fit_transform(input)
+
+        # Assert
+        actual_x, _ = actual[0]
+        self.assertEqual(5, len(actual_x))
+        for e, a in zip(expected_distances, actual_x[3:]):
+            self.assertTrue(e.equal(a), "Expected {}, but found {}".format(e, a))
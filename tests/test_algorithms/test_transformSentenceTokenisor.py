@@ -1,3 +1,4 @@
+import pickle
 from unittest import TestCase
 from unittest.mock import MagicMock
 
@@ -32,3 +33,51 @@ class TestTransformSentenceTokenisor(TestCase):
 
         # Assert
         self.assertSequenceEqual(expected, actual)
+
+    def test_transform_repeated_abstracts_segmented_once(self):
+        # Arrange
+        abstract = "This is a repeated abstract about entity1. It has two sentences"
+        input = [[[[abstract, abstract], ["entity1", "entity2"]], ["yes", "no"]],
+                 [[[abstract], ["entity2"]], ["no"]]]
+
+        sut = TransformSentenceTokenisor(text_column_index=0, eos_token="<EOS>", batch_size=2)
+        nlp = MagicMock(wraps=sut.nlp)
+        sut._nlp = nlp
+
+        expected = [[["This is a repeated abstract about entity1 <EOS> It has two sentences"] * 2,
+                     ["entity1", "entity2"]],
+                    [["This is a repeated abstract about entity1 <EOS> It has two sentences"], ["entity2"]]]
+
+        # Act
+        actual = sut.fit_transform(input)
+
+        # Assert
+        self.assertSequenceEqual(expected, [b_x for b_x, _ in actual])
+        segmented_texts = [t for c in nlp.pipe.call_args_list for t in c[0][0]]
+        self.assertEqual([abstract], segmented_texts)
+
+    def test_transform_rule_splitter(self):
+        # Arrange
+        input = [[[["Smith et al. Showed binding to entity1. It is new", "Short text"], ["entity1", "entity2"]],
+                  ["yes", "no"]]]
+        sut = TransformSentenceTokenisor(text_column_index=0, eos_token="<EOS>", splitter="rule")
+
+        expected = [[["Smith et al. Showed binding to entity1 <EOS> It is new", "Short text"], ["entity1", "entity2"]]]
+
+        # Act
+        actual = sut.fit_transform(input)
+
+        # Assert
+        self.assertSequenceEqual(expected, [b_x for b_x, _ in actual])
+
+    def test_pickle_excludes_spacy(self):
+        # Arrange
+        sut = TransformSentenceTokenisor(text_column_index=0)
+        expected = pickle.dumps(sut)
+        sut.fit_transform([[[["Another abstract. With sentences"]], ["yes"]]])
+
+        # Act
+        actual = pickle.dumps(sut)
+
+        # Assert
+        self.assertEqual(expected, actual)
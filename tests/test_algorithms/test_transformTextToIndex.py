@@ -1,11 +1,14 @@
 from unittest import TestCase
 from unittest.mock import MagicMock
 
+import torch
+from ddt import ddt, data
 from torch.utils.data import DataLoader
 
 from algorithms.transform_text_index import TransformTextToIndex
 
 
+@ddt
 class TestTransformTextToIndex(TestCase):
 
     def test_transform_no_vocab(self):
@@ -152,3 +155,48 @@ class TestTransformTextToIndex(TestCase):
 
         # Assert the max feature length matchs
         self.assertEqual(vocab_dict[sut.pad_token()], 0, "Index of pas token {} must be zero".format(sut.pad_token()))
+
+    @data(1, 2)
+    def test_transform_indices(self, index_workers):
+        # Arrange
+        vocab_dict = {"!@#": 0, "<eos>": 1, "<unk>": 2, "this": 3, "is": 4, "text": 5, "entity1": 6}
+        batches = [[[["This is a sample text, with text", "Is this"], ["entity1", "entity2"]], ["yes", "no"]],
+                   [[["text"], ["ENTITY1"]], ["no"]]]
+        max_feature_lens = [5, 2]
+
+        expected = [[[[3, 4, 2, 5, 2], [4, 3, 0, 0, 0]], [[6, 0], [2, 0]]],
+                    [[[5, 0, 0, 0, 0]], [[6, 0]]]]
+
+        sut = TransformTextToIndex(max_feature_lens, vocab_dict=vocab_dict, index_workers=index_workers)
+
+        # Act
+        actual = sut.transform(batches)
+
+        # Assert
+        self.assertEqual(expected, [[c.tolist() for c in b_x] for b_x, _ in actual])
+        self.assertEqual([b_y for _, b_y in batches], [b_y for _, b_y in actual])
+        self.assertTrue(all([c.dtype == torch.long for b_x, _ in actual for c in b_x]))
+
+    def test_iter_transform_reads_batches_lazily(self):
+        # Arrange
+        vocab_dict = {"!@#": 0, "<eos>": 1, "<unk>": 2, "this": 3, "is": 4, "text": 5}
+        index_workers = 2
+        read_batches = []
+
+        def batches():
+            for i in range(100):
+                read_batches.append(i)
+                yield [[["This is text {}".format(i)]], ["yes"]]
+
+        sut = TransformTextToIndex([5], vocab_dict=vocab_dict, index_workers=index_workers)
+
+        # Act
+        actual = sut.iter_transform(batches())
+        first = next(actual)
+        read_after_first = len(read_batches)
+        rest = list(actual)
+
+        # Assert
+        self.assertEqual([[3, 4, 5, 0, 0]], first[0][0].tolist())
+        self.assertLessEqual(read_after_first, index_workers * 2)
+        self.assertEqual(99, len(rest))
@@ -0,0 +1,50 @@
+from io import BytesIO
+from unittest import TestCase
+
+import numpy as np
+from ddt import ddt, data
+
+from algorithms.word2vec_binary_reader import Word2VecBinaryReader
+
+
+@ddt
+class TestWord2VecBinaryReader(TestCase):
+
+    @data(3, 1 << 20)
+    def test_iter_vectors(self, chunk_size):
+        # Arrange
+        embeddings = [("hat", [0.2, .34, 0.8]), ("mat", [0.5, .34, 0.8]), ("entity1", [0.5, .55, 0.8])]
+        handle = BytesIO(_to_word2vec_bin(embeddings))
+
+        sut = Word2VecBinaryReader(handle, chunk_size=chunk_size)
+
+        # Act
+        actual = list(sut.iter_vectors())
+
+        # Assert
+        self.assertEqual(3, sut.dim)
+        self.assertSequenceEqual([w for w, _ in embeddings], [w for w, _ in actual])
+        for (_, e), (_, a) in zip(embeddings, actual):
+            self.assertTrue(np.allclose(e, a))
+
+    def test_iter_vectors_words_filter(self):
+        # Arrange
+        embeddings = [("hat", [0.2, .34, 0.8]), ("mat", [0.5, .34, 0.8]), ("entity1", [0.5, .55, 0.8])]
+        handle = BytesIO(_to_word2vec_bin(embeddings))
+
+        sut = Word2VecBinaryReader(handle, chunk_size=5)
+
+        # Act
+        actual = list(sut.iter_vectors(words={b"entity1"}))
+
+        # Assert
+        self.assertEqual(1, len(actual))
+        self.assertEqual("entity1", actual[0][0])
+        self.assertTrue(np.allclose([0.5, .55, 0.8], actual[0][1]))
+
+
+def _to_word2vec_bin(embeddings):
+    result = "{} {}\n".format(len(embeddings), len(embeddings[0][1])).encode("utf-8")
+    for word, vector in embeddings:
+        result += word.encode("utf-8") + b" " + np.asarray(vector, dtype="<f4").tobytes() + b"\n"
+    return result
@@ -17,3 +17,17 @@ class TestInteractionTypePrefixer(TestCase):
 
         # Assert
         self.assertSequenceEqual(expected, actual)
+
+    def test_transform_rows(self):
+        # Arrange
+        data = [["This is sample entity1 entity1", "entity1", "entity2", "phosphorylation"],
+                ["Another entity2", "entity1", "entity2", "methylation"]]
+
+        sut = InteractionTypePrefixer(col_to_transform=0, prefixer_col_index=3)
+        expected = [sut(list(r)) for r in data]
+
+        # Act
+        actual = sut.transform_rows([list(r) for r in data])
+
+        # Assert
+        self.assertSequenceEqual(expected, actual)
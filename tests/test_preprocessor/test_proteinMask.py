@@ -1,8 +1,11 @@
 from unittest import TestCase
 
+from ddt import ddt, data, unpack
+
 from preprocessor.ProteinMasker import ProteinMasker
 
 
+@ddt
 class TestProteinMasker(TestCase):
     def test_transform(self):
         # Arrange
@@ -81,3 +84,70 @@ class TestProteinMasker(TestCase):
 
         # Assert
         self.assertSequenceEqual(expected, actual)
+
+    @data((["IL-2 (p55) binds IL2R. IL-2 (p55) again", "IL-2 (p55)", "IL2R"],
+           ["PROTEIN_1 binds PROTEIN_2. PROTEIN_1 again", "PROTEIN_1", "PROTEIN_2"])
+        , (["KLK3 and KLK", "KLK", "KLK3"], ["PROTEIN_13 and PROTEIN_1", "PROTEIN_1", "PROTEIN_2"])
+        , (["PROTEIN_1 binds KLK3", "KLK3", "PROTEIN_1"], ["PROTEIN_2 binds PROTEIN_2", "PROTEIN_1", "PROTEIN_2"])
+        , (["KLK3 binds KLK3", "KLK3", "KLK3"], ["PROTEIN_1 binds PROTEIN_1", "PROTEIN_1", "PROTEIN_2"]))
+    @unpack
+    def test_transform_multi_names_same_as_replace(self, data, expected):
+        # Arrange
+        sut = ProteinMasker(entity_column_indices=[1, 2], text_column_index=0, masks=["PROTEIN_1", "PROTEIN_2"])
+
+        # Act
+        actual = sut(data)
+
+        # Assert
+        self.assertSequenceEqual(expected, actual)
+
+    def test_transform_with_overlapping_offset(self):
+        # Arrange
+        data = ["This is sample KLK3 text", "LK3", 16, "KLK3", 15]
+
+        expected = ["This is sample PROTEIN_2 text", "PROTEIN_1", 16, "PROTEIN_2", 15]
+
+        sut = ProteinMasker(entity_column_indices=[1, 3], text_column_index=0, masks=["PROTEIN_1", "PROTEIN_2"],
+                            entity_offset_indices=[2, 4])
+
+        # Act
+        actual = sut(data)
+
+        # Assert
+        self.assertSequenceEqual(expected, actual)
+
+    def test_transform_many_names(self):
+        # Arrange
+        names = ["GENE{:02d}".format(i) for i in range(20)]
+        masks = ["PROTEIN_{}".format(i) for i in range(20)]
+        text = " binds ".join(names + list(reversed(names))) + ". GENE05 (GENE19)."
+        data = [text] + names
+
+        expected_text = text
+        for e, m in zip(names, masks):
+            expected_text = expected_text.replace(e, m)
+        expected = [expected_text] + masks
+
+        sut = ProteinMasker(entity_column_indices=list(range(1, 21)), text_column_index=0, masks=masks)
+
+        # Act
+        actual = sut(data)
+
+        # Assert
+        self.assertSequenceEqual(expected, actual)
+
+    @data(None, [2, 4])
+    def test_transform_rows(self, entity_offset_indices):
+        # Arrange
+        data = [["This is sample KLK3 text with KLK3", "LK3", 16, "KLK3", 15],
+                ["MAPK1 binds p53", "MAPK1", 0, "p53", 12]]
+
+        sut = ProteinMasker(entity_column_indices=[1, 3], text_column_index=0, masks=["PROTEIN_1", "PROTEIN_2"],
+                            entity_offset_indices=entity_offset_indices)
+        expected = [sut(list(r)) for r in data]
+
+        # Act
+        actual = sut.transform_rows([list(r) for r in data])
+
+        # Assert
+        self.assertSequenceEqual(expected, actual)